@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+Offline analysis of recorded footage for DSTPS
+
+Usage: python analyze.py recording.mp4 [--camera "Main Entrance"] [--stride 2]
+"""
+from src.batch_analysis import main
+
+if __name__ == "__main__":
+    main()
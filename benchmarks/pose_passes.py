@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Per-stage timing: legacy two-pass pose inference vs shared single pass
+
+Usage: python benchmarks/pose_passes.py [video_file] [--frames N]
+Without a video file, synthetic 1280x720 frames are used; these rarely yield
+landmarks, so use a clip with a person in view for a meaningful comparison.
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.detector import AdvancedPersonDetector
+from src.pose_analyzer import PoseAnalyzer, landmarks_to_array
+
+
+def load_frames(source, count, size=(1280, 720)):
+    if source:
+        cap = cv2.VideoCapture(source)
+        frames = []
+        while len(frames) < count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+        return frames
+
+    rng = np.random.default_rng(0)
+    w, h = size
+    return [rng.integers(0, 255, (h, w, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def _ms(samples):
+    return 1000 * sum(samples) / max(len(samples), 1)
+
+
+def run_two_pass(frames):
+    """Old behaviour: detector graph + a second PoseAnalyzer graph per frame"""
+    detector = AdvancedPersonDetector(enable_pose_analysis=False)
+    analyzer = PoseAnalyzer()
+    stages = {'cvtColor': [], 'pose.process': [], 'analyze_pose': []}
+
+    for frame in frames:
+        t0 = time.perf_counter()
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        t1 = time.perf_counter()
+        results = detector.pose.process(rgb_frame)
+        t2 = time.perf_counter()
+        if results.pose_landmarks:
+            analyzer.analyze_pose(frame)
+        t3 = time.perf_counter()
+        stages['cvtColor'].append(t1 - t0)
+        stages['pose.process'].append(t2 - t1)
+        stages['analyze_pose'].append(t3 - t2)
+
+    detector.release()
+    analyzer.release()
+    return stages
+
+
+def run_single_pass(frames):
+    """Shared inference: analyzer consumes the detector's landmarks"""
+    detector = AdvancedPersonDetector()
+    stages = {'cvtColor': [], 'pose.process': [], 'analyze_landmarks': []}
+
+    for frame in frames:
+        t0 = time.perf_counter()
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        t1 = time.perf_counter()
+        results = detector.pose.process(rgb_frame)
+        t2 = time.perf_counter()
+        if results.pose_landmarks:
+            h, w = frame.shape[:2]
+            landmarks = landmarks_to_array(results.pose_landmarks.landmark, w, h)
+            detector.pose_analyzer.analyze_landmarks(landmarks, frame)
+        t3 = time.perf_counter()
+        stages['cvtColor'].append(t1 - t0)
+        stages['pose.process'].append(t2 - t1)
+        stages['analyze_landmarks'].append(t3 - t2)
+
+    detector.release()
+    return stages
+
+
+def report(name, stages):
+    total = 0.0
+    print(f"\n{name}")
+    for stage, samples in stages.items():
+        ms = _ms(samples)
+        total += ms
+        print(f"   {stage:<20} {ms:8.2f} ms/frame")
+    print(f"   {'total':<20} {total:8.2f} ms/frame")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('video', nargs='?', help="Recorded video file (default: synthetic frames)")
+    parser.add_argument('--frames', type=int, default=200)
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames)
+    if not frames:
+        print("❌ No frames loaded")
+        return
+
+    two_pass = report("Two-pass (legacy)", run_two_pass(frames))
+    single_pass = report("Single-pass (shared landmarks)", run_single_pass(frames))
+    print(f"\n📊 Frame cost ratio single/two-pass: {single_pass / two_pass:.2f}")
+
+
+if __name__ == "__main__":
+    main()
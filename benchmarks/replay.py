@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Offline replay benchmark for the full detection pipeline
+
+Usage: python benchmarks/replay.py [video_file] [--frames N]
+                                   [--resolutions 640x480 1280x720 ...]
+                                   [--backend mediapipe|yolo] [--inference-width 640]
+                                   [--output results.json]
+
+Frames from a recorded clip (or synthetic noise) are replayed at each
+resolution through detection, pose analysis, zone checks, tracking,
+drawing, evidence and AlertLogger, with no camera or credentials needed.
+Prints one JSON document: frames/s and p50/p95/p99 per stage for each
+resolution, and the peak RSS of the whole process. The peak covers every
+resolution replayed, so pass a single --resolutions entry per invocation to
+compare memory between resolutions.
+
+Detector stages are timed by hooking the methods AdvancedPersonDetector.detect
+calls (inference_frame, the YOLO person_detect pass, pose.process on the
+frame or on each person crop, pose_analyzer.analyze_landmarks), so the code
+measured is the code the live pipeline runs.
+
+Noise frames rarely yield landmarks, so --synthetic-people (default 2)
+stands in placeholder detections whenever the detector finds nobody; the
+downstream stages are then still exercised. Use a real clip for detector
+numbers that mean anything.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.detector import AdvancedPersonDetector
+from src.pose_analyzer import SkeletonEvidence, SuspiciousAction
+from src.tracker import PersonTracker
+from src.action_classifier import TemporalActionClassifier
+from utils.evidence_writer import EvidenceWriter
+from utils.logger import AlertLogger
+from utils.video_utils import ZoneOverlay
+from utils.zones import ZoneMap
+
+# Upright figure in a unit box (x, y), MediaPipe landmark order
+_FIGURE = np.array([
+    (0.50, 0.08), (0.48, 0.06), (0.47, 0.06), (0.46, 0.06), (0.52, 0.06), (0.53, 0.06), (0.54, 0.06),
+    (0.43, 0.07), (0.57, 0.07), (0.48, 0.11), (0.52, 0.11), (0.38, 0.22), (0.62, 0.22), (0.33, 0.38),
+    (0.67, 0.38), (0.31, 0.52), (0.69, 0.52), (0.30, 0.55), (0.70, 0.55), (0.31, 0.55), (0.69, 0.55),
+    (0.32, 0.54), (0.68, 0.54), (0.43, 0.52), (0.57, 0.52), (0.43, 0.72), (0.57, 0.72), (0.43, 0.92),
+    (0.57, 0.92), (0.42, 0.95), (0.58, 0.95), (0.45, 0.98), (0.55, 0.98)
+], dtype=np.float32)
+
+
+def parse_resolution(text):
+    w, h = text.lower().split('x')
+    return int(w), int(h)
+
+
+def load_frames(source, count, size):
+    w, h = size
+    if source:
+        cap = cv2.VideoCapture(source)
+        frames = []
+        while len(frames) < count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if frame.shape[:2] != (h, w):
+                frame = cv2.resize(frame, (w, h), interpolation=cv2.INTER_AREA)
+            frames.append(frame)
+        cap.release()
+        return frames
+
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (h, w, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def synthetic_detections(frame_index, size, count):
+    """Placeholder people walking across the frame"""
+    w, h = size
+    box_h, box_w = h // 2, h // 4
+    detections = []
+    for person in range(count):
+        x1 = int((frame_index * 4 + person * w / max(count, 1)) % max(w - box_w, 1))
+        y1 = h - box_h - 10
+        landmarks = np.ones((33, 4), dtype=np.float32)
+        landmarks[:, :2] = _FIGURE * (box_w, box_h) + (x1, y1)
+        landmarks[:, 2] = 0.0
+        detections.append({
+            'bbox': (x1, y1, x1 + box_w, y1 + box_h),
+            'confidence': 0.8,
+            'class_name': 'person',
+            'center': (x1 + box_w // 2, y1 + box_h // 2),
+            'pose_analysis': {"action": SuspiciousAction.NORMAL, "confidence": 0.0, "landmarks": landmarks}
+        })
+    return detections
+
+
+class StageTimes:
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, stage, seconds):
+        self.samples.setdefault(stage, []).append(seconds * 1000)
+
+    def summary(self):
+        result = {}
+        for stage, samples in self.samples.items():
+            values = np.asarray(samples)
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            result[stage] = {
+                'count': len(values),
+                'mean_ms': round(float(values.mean()), 3),
+                'p50_ms': round(float(p50), 3),
+                'p95_ms': round(float(p95), 3),
+                'p99_ms': round(float(p99), 3),
+                'max_ms': round(float(values.max()), 3)
+            }
+        return result
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+@contextlib.contextmanager
+def timed_method(obj, name, times, stage):
+    """Time every call to obj.name under `stage` by shadowing it on the instance"""
+    if obj is None or not hasattr(obj, name):
+        yield
+        return
+    original = getattr(obj, name)
+
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            times.add(stage, time.perf_counter() - t0)
+
+    setattr(obj, name, wrapper)
+    try:
+        yield
+    finally:
+        delattr(obj, name)
+
+
+@contextlib.contextmanager
+def detector_hooks(detector, times):
+    """Per-stage timings from inside the real AdvancedPersonDetector.detect"""
+    # MediaPipe runs one full-frame pose; YOLO finds people first, then runs pose per crop
+    pose = getattr(detector, 'pose', None) or detector.crop_pose
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(timed_method(detector, 'inference_frame', times, 'inference_frame'))
+        stack.enter_context(timed_method(detector.person_detector, 'detect_batch', times, 'person_detect'))
+        stack.enter_context(timed_method(pose, 'process', times, 'pose.process'))
+        stack.enter_context(timed_method(detector.pose_analyzer, 'analyze_landmarks', times, 'pose_analysis'))
+        yield
+
+
+def run(frames, detector, args, workdir):
+    h, w = frames[0].shape[:2]
+    # One rectangle and one polygon zone covering the lower middle of the frame
+    zones = [
+        (w // 8, h // 2, w // 2, h - 1),
+        [(w // 2, h // 2), (7 * w // 8, h // 2), (3 * w // 4, h - 1), (w // 2, h - 1)]
+    ]
+    zone_map = ZoneMap("foot")
+    overlay = ZoneOverlay()
+    classifier = TemporalActionClassifier()
+    tracker = PersonTracker(history=classifier.history)
+    logger = AlertLogger(os.path.join(workdir, "alerts.jsonl"), os.path.join(workdir, "alerts.csv"),
+                         os.path.join(workdir, "alerts.json"))
+    writer = EvidenceWriter(os.path.join(workdir, "evidence"))
+    times = StageTimes()
+    alerts = 0
+
+    with detector_hooks(detector, times):
+        started = time.perf_counter()
+        for index, frame in enumerate(frames):
+            frame_start = time.perf_counter()
+            detections = detector.detect(frame)
+            times.add('detect', time.perf_counter() - frame_start)
+            if not detections and args.synthetic_people:
+                detections = synthetic_detections(index, (w, h), args.synthetic_people)
+
+            t0 = time.perf_counter()
+            breaches = zone_map.breaches(detections, zones, frame.shape)
+            for detection, breach in zip(detections, breaches):
+                detection['breach'] = bool(breach)
+            t1 = time.perf_counter()
+            now = time.time()
+            tracker.update(detections, now)
+            classifier.update(tracker, detections, now)
+            t2 = time.perf_counter()
+            times.add('zones', t1 - t0)
+            times.add('tracking', t2 - t1)
+
+            # Alert path without cooldown, every --alert-every frames with someone in a zone
+            if index % args.alert_every == 0:
+                for detection in detections:
+                    if not detection['breach']:
+                        continue
+                    t0 = time.perf_counter()
+                    landmarks = detection['pose_analysis'].get('landmarks')
+                    evidence = SkeletonEvidence(frame, landmarks)
+                    image_path, _ = writer.save(evidence.render(), "Replay", "zone_breach", landmarks)
+                    t1 = time.perf_counter()
+                    logger.log_alert("Replay", detection['bbox'], detection['confidence'], image_path or "")
+                    t2 = time.perf_counter()
+                    times.add('evidence', t1 - t0)
+                    times.add('alert_log', t2 - t1)
+                    alerts += 1
+                    break
+
+            t0 = time.perf_counter()
+            overlay.draw(frame, zones)
+            for detection in detections:
+                x1, y1, x2, y2 = detection['bbox']
+                color = (0, 0, 255) if detection['breach'] else (0, 255, 0)
+                cv2.rectangle(frame, (x1, y1), (x2, y2), color, 3)
+                cv2.putText(frame, f"#{detection.get('track_id')}", (x1, y1 - 10),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+            times.add('draw', time.perf_counter() - t0)
+            times.add('frame_total', time.perf_counter() - frame_start)
+
+    elapsed = time.perf_counter() - started
+    writer.close()
+    return {
+        'resolution': f"{w}x{h}",
+        'frames': len(frames),
+        'seconds': round(elapsed, 3),
+        'fps': round(len(frames) / elapsed, 2) if elapsed else None,
+        'alerts_logged': alerts,
+        'evidence': writer.get_stats(),
+        'stages': times.summary()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('video', nargs='?', help="Recorded video file (default: synthetic frames)")
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--resolutions', nargs='+', default=[(1280, 720)], type=parse_resolution,
+                        metavar='WxH')
+    parser.add_argument('--backend', choices=['mediapipe', 'yolo'], default='mediapipe')
+    parser.add_argument('--inference-width', type=int, default=640,
+                        help="Width frames are downscaled to for inference (0 = full resolution)")
+    parser.add_argument('--synthetic-people', type=int, default=2,
+                        help="Placeholder detections when the detector finds nobody (0 = off)")
+    parser.add_argument('--alert-every', type=int, default=30, help="Frames between logged alerts")
+    parser.add_argument('--output', help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    # Progress and alert messages go to stderr; stdout carries only the JSON
+    runs = []
+    with contextlib.redirect_stdout(sys.stderr):
+        detector = AdvancedPersonDetector(backend=args.backend, inference_width=args.inference_width)
+        try:
+            for size in args.resolutions:
+                frames = load_frames(args.video, args.frames, size)
+                if not frames:
+                    print(f"❌ No frames loaded for {size[0]}x{size[1]}")
+                    continue
+                with tempfile.TemporaryDirectory(prefix="dstps_replay_") as workdir:
+                    runs.append(run(frames, detector, args, workdir))
+        finally:
+            detector.release()
+
+    results = {
+        'source': args.video or 'synthetic',
+        'backend': detector.backend,
+        'inference_width': args.inference_width,
+        'python': platform.python_version(),
+        'opencv': cv2.__version__,
+        'cpu_count': os.cpu_count(),
+        'runs': runs,
+        # Process-lifetime high-water mark, across all runs above
+        'peak_rss_mb': peak_rss_mb()
+    }
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 import os
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import List, Tuple, Union
 
 
 @dataclass
@@ -8,8 +8,15 @@ class CameraConfig:
     name: str
     stream_url: str
     location: str
-    restricted_zones: List[Tuple[int, int, int, int]]
+    # Each zone is a rectangle (x1, y1, x2, y2) or a polygon [(x, y), (x, y), ...]
+    restricted_zones: List[Union[Tuple[int, int, int, int], List[Tuple[int, int]]]]
     alert_emails: List[str]
+    motion_gating: bool = True  # Skip inference while the scene is static
+    motion_sensitivity: float = 0.5  # 0.0 (large changes only) .. 1.0 (any flicker)
+    # What must be inside a zone: "center" (box center, the original check),
+    # "foot" (bottom center of the box, where the person stands) or "overlap"
+    breach_mode: str = "center"
+    breach_overlap: float = 0.3  # Fraction of the box inside zones, for "overlap"
 
 
 @dataclass
@@ -18,6 +25,121 @@ class DetectionConfig:
     pose_detection_enabled: bool = True
     sms_alerts_enabled: bool = True
     alert_cooldown: int = 60
+    # "mediapipe": single-person full-frame pose
+    # "yolo": two-stage, cv2.dnn person boxes first, then pose on each person crop
+    detector_backend: str = "mediapipe"
+    yolo_input_size: int = 416  # 320 is faster, 608 more accurate
+    # Frames are downscaled to this width (and converted to RGB once) before inference;
+    # boxes and landmarks are mapped back to full resolution. 0 = infer at full size
+    inference_width: int = 640
+
+
+@dataclass
+class CaptureConfig:
+    threaded: bool = True  # Background reader per camera
+    buffer_size: int = 2  # Newest frames kept per camera
+    reconnect_after: int = 50  # Consecutive read failures before reopening
+
+
+@dataclass
+class WorkerPoolConfig:
+    enabled: bool = False  # Run detection in worker processes instead of the main thread
+    num_workers: int = 0  # 0 = one per CPU core, capped at the number of cameras
+
+
+@dataclass
+class AlertDispatchConfig:
+    queue_size: int = 100  # Pending alerts before new ones are dropped
+    max_retries: int = 3
+    retry_backoff: float = 2.0  # Seconds, doubled per retry
+    smtp_idle_timeout: float = 60.0  # Close the reused SMTP session after this idle time
+
+
+@dataclass
+class EvidenceConfig:
+    directory: str = "data/evidence"
+    workers: int = 2  # Background encode/write threads
+    max_pending: int = 32  # Images waiting to be written before new ones are dropped
+    jpeg_quality: int = 90
+    max_width: int = 1920  # Larger frames are downscaled before encoding; 0 keeps full size
+
+
+@dataclass
+class ClipConfig:
+    enabled: bool = True  # Pre/post-event video clip per alert
+    directory: str = "data/clips"
+    pre_seconds: float = 10.0  # Footage kept in memory before an alert
+    post_seconds: float = 5.0  # Footage recorded after it
+    fps: float = 5.0  # Buffered and written frame rate
+    max_width: int = 960  # Frames are downscaled before buffering; 0 keeps full size
+    jpeg_quality: int = 70
+    max_buffer_mb: float = 24.0  # Per camera; the oldest frames go first beyond this
+    max_pending: int = 4  # Clips waiting to be written before new ones are dropped
+
+
+@dataclass
+class FrameBusConfig:
+    enabled: bool = True  # Publish annotated frames for the dashboard feed
+    # Owner-only (0600) Unix socket where supported; the dashboard must run as the same user
+    path: str = "data/frame_bus.sock"
+    # Required for the TCP fallback (Windows, or path empty); defaults to the control socket's
+    token: str = os.getenv('DSTPS_FRAME_BUS_TOKEN', os.getenv('DSTPS_CONTROL_TOKEN', ''))
+    host: str = "127.0.0.1"
+    port: int = 5555
+    max_fps: float = 10.0  # Per camera
+    jpeg_quality: int = 80
+
+
+@dataclass
+class RuntimeConfig:
+    # No windows or keyboard; frames are only annotated while a frame bus viewer is attached
+    headless: bool = os.getenv('DSTPS_HEADLESS', '').lower() in ('1', 'true', 'yes')
+    # Local socket taking the keyboard commands by name (including quit and test_sms); opt-in
+    control_socket: bool = os.getenv('DSTPS_CONTROL_SOCKET', '').lower() in ('1', 'true', 'yes')
+    control_path: str = "data/dstps.sock"  # Owner-only (0600) Unix socket where supported
+    control_token: str = os.getenv('DSTPS_CONTROL_TOKEN', '')  # Required for the TCP fallback
+    control_host: str = "127.0.0.1"  # TCP fallback (Windows, or control_path empty)
+    control_port: int = 5557
+
+
+@dataclass
+class MetricsConfig:
+    enabled: bool = True  # Prometheus text on http://host:port/metrics, relayed by the dashboard
+    host: str = "127.0.0.1"
+    port: int = 9108
+
+
+@dataclass
+class SchedulerConfig:
+    enabled: bool = True  # Per-camera inference budget by activity and load
+    idle_fps: float = 2.0  # No one in view
+    active_fps: float = 0.0  # Person tracked recently; 0 = every frame
+    active_hold: float = 5.0  # Seconds a camera stays active after its last detection
+    cpu_target: float = 0.85  # Load average per core before rates are reduced
+    min_fps: float = 0.5  # Floor when degrading under load
+
+
+@dataclass
+class TrackerConfig:
+    enabled: bool = True  # Persistent person IDs per camera
+    iou_threshold: float = 0.3
+    max_misses: int = 15  # Inferred frames a track survives without a match
+    max_age: float = 5.0  # Seconds a track survives without a match, however few frames were inferred
+    history: int = 30  # Landmark sets kept per track (raised to cover the action classifier window)
+    use_kalman: bool = True  # Smooth and predict boxes between frames
+    # True: alerts and evidence once per track event (entering a zone, a new suspicious
+    # action). False: the per-camera alert_cooldown on every frame with a breach, as before
+    alert_on_events: bool = True
+
+
+@dataclass
+class ActionClassifierConfig:
+    enabled: bool = True  # Windowed, debounced actions per track (needs the tracker)
+    window_seconds: float = 3.0  # Landmark history the features are computed over
+    min_frames: int = 5  # Landmark sets needed before a track is classified
+    debounce_frames: int = 5
+    min_votes: int = 3  # Frames out of debounce_frames before an action changes
+    max_fps: float = 30.0  # Highest per-camera inference rate; sizes each track's landmark window
 
 
 # Camera configuration
@@ -31,4 +153,15 @@ CAMERAS = [
     )
 ]
 
-DETECTION_CONFIG = DetectionConfig()
\ No newline at end of file
+DETECTION_CONFIG = DetectionConfig()
+CAPTURE_CONFIG = CaptureConfig()
+WORKER_POOL_CONFIG = WorkerPoolConfig()
+ALERT_DISPATCH_CONFIG = AlertDispatchConfig()
+EVIDENCE_CONFIG = EvidenceConfig()
+CLIP_CONFIG = ClipConfig()
+FRAME_BUS_CONFIG = FrameBusConfig()
+RUNTIME_CONFIG = RuntimeConfig()
+METRICS_CONFIG = MetricsConfig()
+SCHEDULER_CONFIG = SchedulerConfig()
+TRACKER_CONFIG = TrackerConfig()
+ACTION_CLASSIFIER_CONFIG = ActionClassifierConfig()
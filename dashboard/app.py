@@ -1,51 +1,125 @@
 from flask import Flask, render_template, jsonify, Response, send_file
 import json
 import os
-import cv2
 from datetime import datetime
 import glob
+import sys
+import queue
+import threading
+import time
+import urllib.request
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.alert_store import AlertStore
+from utils.alert_stats import AlertStats
+from utils.frame_bus import FrameBusSubscriber
+from utils.metrics import PROMETHEUS_CONTENT_TYPE
+from config.settings import CAMERAS, FRAME_BUS_CONFIG, METRICS_CONFIG
 
 app = Flask(__name__)
 
 
+class AlertFeed:
+    """Fans new alerts and stat updates out to every connected stream client"""
+
+    def __init__(self, poll_interval: float = 0.5, client_queue_size: int = 100):
+        self.poll_interval = poll_interval
+        self.client_queue_size = client_queue_size
+        self.clients = []
+        self.lock = threading.Lock()
+        self._watcher = None
+
+    def subscribe(self) -> queue.Queue:
+        client = queue.Queue(maxsize=self.client_queue_size)
+        with self.lock:
+            self.clients.append(client)
+        return client
+
+    def unsubscribe(self, client: queue.Queue):
+        with self.lock:
+            if client in self.clients:
+                self.clients.remove(client)
+
+    def publish(self, event: str, data):
+        message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        with self.lock:
+            clients = list(self.clients)
+        for client in clients:
+            try:
+                client.put_nowait(message)
+            except queue.Full:
+                # Slow client: drop its backlog and tell it to reload over REST
+                with client.mutex:
+                    client.queue.clear()
+                client.put_nowait("event: resync\ndata: {}\n\n")
+
+    def start(self, manager):
+        """One watcher thread for all clients, started on first use"""
+        with self.lock:
+            if self._watcher is not None:
+                return
+            self._watcher = threading.Thread(target=self._watch, args=(manager,), daemon=True)
+            self._watcher.start()
+
+    def _watch(self, manager):
+        while True:
+            try:
+                manager.poll()
+            except Exception as e:
+                print(f"❌ Alert feed error: {e}")
+            time.sleep(self.poll_interval)
+
+
 class DashboardManager:
     def __init__(self):
-        self.alert_file = "data/alerts.json"
+        self.alert_file = "data/alerts.jsonl"
         self.evidence_dir = "data/evidence/"
+        # The core owns the log (migration, repair); the dashboard only reads it
+        self.store = AlertStore(self.alert_file, readonly=True)
+        # Read-only view of the core's counters; catches up on new log lines only
+        self.stats = AlertStats(self.store, persist=False)
+        self.feed = AlertFeed()
+
+    def poll(self):
+        """Pick up newly logged alerts and push them to stream clients"""
+        new_alerts = self.stats.refresh()
+        if new_alerts:
+            for alert in new_alerts:
+                self.feed.publish('alert', alert)
+            self.feed.publish('stats', self.get_stats(refresh=False))
 
     def get_alerts(self):
-        """Get all alerts from JSON file"""
+        """Get all alerts from the alert log"""
+        try:
+            return list(self.store.iter_alerts())
+        except:
+            return []
+
+    def get_recent_alerts(self, limit=20):
+        """Get the newest alerts without reading the whole log"""
         try:
-            with open(self.alert_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('alerts', [])
+            return self.store.tail(limit)
         except:
             return []
 
-    def get_stats(self):
+    def get_stats(self, refresh=True):
         """Get comprehensive statistics"""
-        alerts = self.get_alerts()
-        now = datetime.now()
-        today_str = now.strftime("%Y-%m-%d")
+        if refresh:
+            self.poll()
+        counters = self.stats.get_stats()
 
-        # Calculate various statistics
         stats = {
-            'total_alerts': len(alerts),
-            'today_alerts': len([a for a in alerts if a.get('timestamp', '').startswith(today_str)]),
-            'zone_breaches': len([a for a in alerts if a.get('alert_type') == 'zone_breach']),
-            'suspicious_actions': len([a for a in alerts if a.get('alert_type') == 'suspicious_action']),
+            'total_alerts': counters['total_alerts'],
+            'today_alerts': counters['today_alerts'],
+            'zone_breaches': counters['zone_breaches'],
+            'suspicious_actions': counters['suspicious_actions'],
             'active_cameras': 1,  # You can expand this
             'system_uptime': 'Running',
-            'last_alert': alerts[-1] if alerts else None
+            'last_alert': counters['last_alert'],
+            'alert_breakdown': counters['alert_breakdown'],
+            'camera_breakdown': counters['camera_breakdown']
         }
-
-        # Alert breakdown by type
-        alert_types = {}
-        for alert in alerts:
-            alert_type = alert.get('alert_type', 'unknown')
-            alert_types[alert_type] = alert_types.get(alert_type, 0) + 1
-
-        stats['alert_breakdown'] = alert_types
         return stats
 
     def get_recent_evidence(self, limit=6):
@@ -60,6 +134,8 @@ class DashboardManager:
 
 
 dashboard = DashboardManager()
+frame_bus = FrameBusSubscriber(FRAME_BUS_CONFIG.host, FRAME_BUS_CONFIG.port,
+                               FRAME_BUS_CONFIG.path, FRAME_BUS_CONFIG.token)
 
 
 @app.route('/')
@@ -71,9 +147,8 @@ def index():
 @app.route('/api/alerts')
 def api_alerts():
     """API endpoint for alerts"""
-    alerts = dashboard.get_alerts()
-    # Return latest 20 alerts
-    return jsonify(alerts[-20:][::-1])  # Reverse to show newest first
+    alerts = dashboard.get_recent_alerts(20)
+    return jsonify(alerts[::-1])  # Reverse to show newest first
 
 
 @app.route('/api/stats')
@@ -82,6 +157,27 @@ def api_stats():
     return jsonify(dashboard.get_stats())
 
 
+@app.route('/api/stream')
+def api_stream():
+    """Server-sent events: new alerts and stat updates as they are logged"""
+    dashboard.feed.start(dashboard)
+    client = dashboard.feed.subscribe()
+
+    def generate():
+        try:
+            yield f"event: stats\ndata: {json.dumps(dashboard.get_stats(refresh=False))}\n\n"
+            while True:
+                try:
+                    yield client.get(timeout=15)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+        finally:
+            dashboard.feed.unsubscribe(client)
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 @app.route('/api/evidence')
 def api_evidence():
     """API endpoint for recent evidence"""
@@ -121,27 +217,64 @@ def acknowledge_alert(alert_id):
     return jsonify({'status': 'success', 'alert_id': alert_id})
 
 
-# Live camera feed (optional)
+@app.route('/api/cameras')
+def api_cameras():
+    """Cameras configured in the core"""
+    return jsonify([camera.name for camera in CAMERAS])
+
+
+# Live camera feed, relayed from the core's frame bus
 @app.route('/video_feed')
-def video_feed():
-    """Live camera feed (placeholder)"""
+@app.route('/video_feed/<camera_name>')
+def video_feed(camera_name=None):
+    """Annotated MJPEG feed; every viewer shares the core's single JPEG encode"""
+    camera_name = camera_name or CAMERAS[0].name
 
     def generate():
-        camera = cv2.VideoCapture(0)
-        while True:
-            success, frame = camera.read()
-            if not success:
-                break
-            else:
-                ret, buffer = cv2.imencode('.jpg', frame)
-                frame_bytes = buffer.tobytes()
+        frame_bus.add_viewer()
+        last_seq = 0
+        try:
+            while True:
+                latest = frame_bus.wait_for_frame(camera_name, last_seq, timeout=5.0)
+                if latest is None:
+                    continue
+                # A slow viewer simply jumps to the newest frame
+                last_seq, frame_bytes = latest
                 yield (b'--frame\r\n'
                        b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-        camera.release()
+        finally:
+            frame_bus.remove_viewer()
 
     return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
 
 
+@app.route('/metrics')
+def metrics():
+    """Prometheus text: the core's pipeline metrics plus this dashboard's own"""
+    core_up = 1
+    try:
+        url = f"http://{METRICS_CONFIG.host}:{METRICS_CONFIG.port}/metrics"
+        with urllib.request.urlopen(url, timeout=1.0) as response:
+            core_text = response.read().decode('utf-8')
+    except OSError:
+        core_text, core_up = "", 0
+
+    with dashboard.feed.lock:
+        stream_clients = len(dashboard.feed.clients)
+    lines = [
+        "# HELP dstps_core_up Whether the detection core's metrics endpoint answered",
+        "# TYPE dstps_core_up gauge",
+        f"dstps_core_up {core_up}",
+        "# HELP dstps_dashboard_stream_clients Connected /api/stream clients",
+        "# TYPE dstps_dashboard_stream_clients gauge",
+        f"dstps_dashboard_stream_clients {stream_clients}",
+        "# HELP dstps_dashboard_video_viewers Connected /video_feed viewers",
+        "# TYPE dstps_dashboard_video_viewers gauge",
+        f"dstps_dashboard_video_viewers {frame_bus.viewers}",
+    ]
+    return Response(core_text + "\n".join(lines) + "\n", content_type=PROMETHEUS_CONTENT_TYPE)
+
+
 if __name__ == '__main__':
     # Create necessary directories
     os.makedirs('dashboard/templates', exist_ok=True)
@@ -152,5 +285,8 @@ if __name__ == '__main__':
     print("📊 Statistics: http://localhost:5000/api/stats")
     print("🚨 Alerts API: http://localhost:5000/api/alerts")
     print("📸 Evidence API: http://localhost:5000/api/evidence")
+    print("📡 Live stream: http://localhost:5000/api/stream")
+    print("🎥 Camera feed: http://localhost:5000/video_feed/<camera name>")
+    print("📈 Metrics: http://localhost:5000/metrics")
 
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=True, host='0.0.0.0', port=5000, threaded=True)
\ No newline at end of file
@@ -0,0 +1,157 @@
+import math
+import numpy as np
+from collections import Counter, deque
+from typing import List, Dict, Any, Tuple
+from src.pose_analyzer import SuspiciousAction
+from src.tracker import PersonTracker
+
+# MediaPipe pose indices
+NOSE = 0
+SHOULDERS = [11, 12]
+WRISTS = [15, 16]
+HIPS = [23, 24]
+
+
+class TemporalActionClassifier:
+    """
+    Debounced per-track actions from a window of landmark history
+
+    Works on the landmark ring buffers PersonTracker keeps per track. Torso
+    angle, hip displacement and wrist speed are computed over the whole
+    window at once and normalized by torso length, so the thresholds do not
+    depend on distance to the camera. A label is only emitted once it wins
+    `min_votes` of the last `debounce_frames` frames.
+
+    `history` is the landmark window length a track needs to hold
+    `window_seconds` at up to `max_fps`; trackers are sized from it.
+    """
+
+    def __init__(self, window_seconds: float = 3.0, min_frames: int = 5,
+                 debounce_frames: int = 5, min_votes: int = 3, max_fps: float = 30.0):
+        self.window_seconds = window_seconds
+        self.history = int(math.ceil(window_seconds * max_fps)) + 1
+        self.min_frames = min_frames
+        self.debounce_frames = debounce_frames
+        self.min_votes = min_votes
+        self.votes: Dict[int, deque] = {}
+        self.emitted: Dict[int, Tuple[SuspiciousAction, float]] = {}
+
+    def update(self, tracker: PersonTracker, detections: List[Dict[str, Any]], timestamp: float):
+        """Replace each tracked detection's single-frame action with the debounced one"""
+        live = {track.track_id for track in tracker.tracks}
+        for track_id in list(self.votes):
+            if track_id not in live:
+                del self.votes[track_id]
+                self.emitted.pop(track_id, None)
+
+        features = {}
+        for detection in detections:
+            track = tracker.get_track(detection.get('track_id'))
+            if track is None:
+                continue
+            window = track.landmarks
+            # No new landmarks this frame: keep the last decision
+            if window.count == 0 or window.times[window.next - 1] != timestamp:
+                continue
+            points, times = window.ordered()
+            recent = times >= timestamp - self.window_seconds
+            if np.count_nonzero(recent) >= self.min_frames:
+                features[track.track_id] = self._features(points[recent], times[recent])
+
+        raw = {track_id: self._classify(f) for track_id, f in features.items()}
+        for track_id in self._fighting(features):
+            raw[track_id] = (SuspiciousAction.FIGHTING, 0.75)
+
+        for detection in detections:
+            track_id = detection.get('track_id')
+            if track_id is None:
+                continue
+            if track_id in raw:
+                self._vote(track_id, *raw[track_id])
+
+            pose_analysis = detection.setdefault('pose_analysis', {})
+            pose_analysis['frame_action'] = pose_analysis.get('action', SuspiciousAction.NORMAL)
+            pose_analysis['action'], pose_analysis['confidence'] = self.emitted.get(
+                track_id, (SuspiciousAction.NORMAL, 0.0)
+            )
+        return detections
+
+    @staticmethod
+    def _features(points: np.ndarray, times: np.ndarray) -> Dict[str, Any]:
+        """Window features from (T, 33, 2) pixel landmarks, oldest first"""
+        shoulders = points[:, SHOULDERS].mean(axis=1)
+        hips = points[:, HIPS].mean(axis=1)
+        wrists = points[:, WRISTS]
+
+        torso = shoulders - hips
+        torso_len = np.linalg.norm(torso, axis=1)
+        scale = max(float(np.median(torso_len)), 1.0)
+
+        # 0 degrees = upright, 90 = horizontal
+        angle = np.degrees(np.arctan2(np.abs(torso[:, 0]), np.maximum(-torso[:, 1], 1e-6)))
+
+        dt = np.maximum(np.diff(times), 1e-3)[:, None]
+        hip_velocity = np.diff(hips, axis=0) / dt / scale
+        wrist_speed = (np.linalg.norm(np.diff(wrists, axis=0), axis=2) / dt / scale).max(axis=1)
+
+        return {
+            'scale': scale,
+            'center': (shoulders[-1] + hips[-1]) / 2,
+            'angle': angle,
+            'hip_drop': (hips[-1, 1] - hips[:, 1].min()) / scale,
+            'hip_rise': (hips[0, 1] - hips[-1, 1]) / scale,
+            'hip_velocity': hip_velocity,
+            'hands_up': np.mean(wrists[:, :, 1].min(axis=1) < shoulders[:, 1]),
+            'hands_low': np.mean(wrists[:, :, 1].min(axis=1) > shoulders[:, 1]),
+            'wrist_speed': wrist_speed,
+        }
+
+    @staticmethod
+    def _classify(f: Dict[str, Any]) -> Tuple[SuspiciousAction, float]:
+        angle = f['angle']
+        half = max(1, len(angle) // 2)
+        horizontal_now = np.median(angle[-3:]) > 60
+
+        # Upright -> horizontal with a fast drop of the hips; lying down slowly stays normal
+        if (horizontal_now and angle[:half].min() < 35 and f['hip_drop'] > 0.8
+                and f['hip_velocity'][:, 1].max() > 1.5):
+            return SuspiciousAction.FALLING, 0.85
+
+        # Body rising with the hands above the shoulders; stretching in place stays normal
+        if f['hip_rise'] > 0.6 and f['hands_up'] > 0.5:
+            return SuspiciousAction.CLIMBING, 0.8
+
+        # Horizontal torso moving along the ground on hands
+        if (np.median(angle) > 55 and f['hands_low'] > 0.5
+                and np.median(np.abs(f['hip_velocity'][:, 0])) > 0.3):
+            return SuspiciousAction.CRAWLING, 0.7
+
+        return SuspiciousAction.NORMAL, 0.0
+
+    @staticmethod
+    def _fighting(features: Dict[int, Dict[str, Any]]) -> List[int]:
+        """Tracks close to another person while swinging their arms fast"""
+        if len(features) < 2:
+            return []
+
+        ids = list(features)
+        centers = np.array([features[i]['center'] for i in ids], dtype=np.float32)
+        scales = np.array([features[i]['scale'] for i in ids], dtype=np.float32)
+        # Fast limbs on at least two of the last five frames
+        striking = np.array([np.count_nonzero(features[i]['wrist_speed'][-5:] > 3.0) >= 2 for i in ids])
+
+        distance = np.linalg.norm(centers[:, None, :] - centers[None, :, :], axis=2)
+        close = distance < 2.0 * np.maximum(scales[:, None], scales[None, :])
+        np.fill_diagonal(close, False)
+
+        involved = close & (striking[:, None] | striking[None, :])
+        return [ids[i] for i in np.nonzero(involved.any(axis=1))[0]]
+
+    def _vote(self, track_id: int, action: SuspiciousAction, confidence: float):
+        votes = self.votes.setdefault(track_id, deque(maxlen=self.debounce_frames))
+        votes.append((action, confidence))
+
+        label, count = Counter(a for a, _ in votes).most_common(1)[0]
+        current = self.emitted.get(track_id, (SuspiciousAction.NORMAL, 0.0))[0]
+        if count >= self.min_votes and label != current:
+            self.emitted[track_id] = (label, max(c for a, c in votes if a == label))
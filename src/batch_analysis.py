@@ -0,0 +1,327 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import shutil
+import subprocess
+import time
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config.settings import CAMERAS, DETECTION_CONFIG, TRACKER_CONFIG, ACTION_CLASSIFIER_CONFIG
+
+# Per worker process, built once by _init_worker
+_detector = None
+
+
+def probe_video(path: str) -> Tuple[float, int]:
+    """(fps, frame count) as reported by the container"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"cannot open {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return fps, frames
+
+
+def keyframe_times(path: str) -> List[float]:
+    """Keyframe timestamps in seconds via ffprobe; empty if ffprobe is unavailable"""
+    if shutil.which('ffprobe') is None:
+        return []
+    try:
+        output = subprocess.run(
+            ['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-skip_frame', 'nokey',
+             '-show_entries', 'frame=pts_time', '-of', 'csv=p=0', path],
+            capture_output=True, text=True, timeout=300, check=True
+        ).stdout
+    except (subprocess.SubprocessError, OSError):
+        return []
+    return sorted(float(line.strip().strip(',')) for line in output.splitlines()
+                  if line.strip().strip(',') not in ('', 'N/A'))
+
+
+def plan_chunks(duration: float, count: int, keyframes: List[float]) -> List[Tuple[float, float]]:
+    """(start, end) seconds; boundaries snap to the nearest keyframe when known"""
+    count = max(1, count)
+    bounds = [duration * i / count for i in range(count + 1)]
+    if keyframes:
+        keys = np.asarray(keyframes)
+        # Seeking to a keyframe is exact and cheap: no decoding forward from the previous one
+        bounds[1:-1] = [float(keys[np.abs(keys - b).argmin()]) for b in bounds[1:-1]]
+    bounds = sorted(set(bounds))
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def _init_worker(detector_kwargs: Dict[str, Any]):
+    global _detector
+    from src.detector import AdvancedPersonDetector
+    _detector = AdvancedPersonDetector(**detector_kwargs)
+
+
+def _analyze_chunk(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Decode one chunk and return its alerts with footage offsets and encoded evidence
+
+    Decoding starts `warmup` seconds before the chunk so tracks and action
+    windows crossing the boundary carry the same state as in one continuous
+    pass; alerts are only raised from the chunk start on.
+    """
+    from src.tracker import PersonTracker, event_alert_type
+    from src.action_classifier import TemporalActionClassifier
+    from src.pose_analyzer import SkeletonEvidence, SuspiciousAction
+    from src.detector import AdvancedPersonDetector
+    from utils.motion_gate import MotionGate
+    from utils.zones import ZoneMap
+
+    camera = task['camera']
+    cap = cv2.VideoCapture(task['path'])
+    cap.set(cv2.CAP_PROP_POS_MSEC, max(0.0, task['start'] - task['warmup']) * 1000)
+
+    gate = MotionGate(camera['motion_sensitivity']) if task['motion_gating'] else None
+    zone_map = ZoneMap(camera['breach_mode'], camera['breach_overlap'])
+    classifier = TemporalActionClassifier(
+        ACTION_CLASSIFIER_CONFIG.window_seconds, ACTION_CLASSIFIER_CONFIG.min_frames,
+        ACTION_CLASSIFIER_CONFIG.debounce_frames, ACTION_CLASSIFIER_CONFIG.min_votes,
+        ACTION_CLASSIFIER_CONFIG.max_fps
+    ) if ACTION_CLASSIFIER_CONFIG.enabled else None
+    history = max(TRACKER_CONFIG.history, classifier.history) if classifier else TRACKER_CONFIG.history
+    tracker = PersonTracker(TRACKER_CONFIG.iou_threshold, TRACKER_CONFIG.max_misses,
+                            history, TRACKER_CONFIG.use_kalman, max_age=TRACKER_CONFIG.max_age)
+
+    alerts, decoded, analyzed, index = [], 0, 0, 0
+    last_alert = None  # Footage offset of the chunk's last alert, for the cooldown fallback
+    while True:
+        # Skipped frames are only grabbed, never converted to BGR images
+        if not cap.grab():
+            break
+        offset = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        if offset >= task['end']:
+            break
+        decoded += 1
+        index += 1
+        if (index - 1) % task['stride']:
+            continue
+        ok, frame = cap.retrieve()
+        if not ok:
+            continue
+        if gate is not None and not gate.should_detect(frame):
+            continue
+
+        analyzed += 1
+        detections = _detector.detect(frame)
+        if gate is not None:
+            gate.report_detections(len(detections))
+
+        # Empty frames still age tracks out, and the classifier drops their votes
+        breaches = zone_map.breaches(detections, camera['restricted_zones'], frame.shape)
+        for detection, breach in zip(detections, breaches):
+            detection['breach'] = bool(breach)
+        tracker.update(detections, offset)
+        if classifier:
+            classifier.update(tracker, detections, offset)
+        tracker.record_actions(detections, AdvancedPersonDetector.is_suspicious_action)
+
+        for detection in detections:
+            is_breach = detection['breach']
+            if offset < task['start'] or not (is_breach or AdvancedPersonDetector.is_suspicious_action(detection)):
+                continue
+            alert_type = "zone_breach" if is_breach else "suspicious_action"
+            action = detection['pose_analysis'].get('action', SuspiciousAction.NORMAL).value
+
+            # Same rule as the live pipeline: once per track event, or a cooldown
+            if TRACKER_CONFIG.alert_on_events:
+                alert_type = event_alert_type(detection)
+                if alert_type is None:
+                    continue
+            else:
+                # Per-camera footage-time cooldown like merge_alerts, so evidence is not encoded for every frame
+                if last_alert is not None and offset - last_alert < task['cooldown']:
+                    continue
+                last_alert = offset
+
+            # Encoded here, in parallel; written by analyze_video only for alerts that survive the merge
+            evidence, landmarks = None, detection['pose_analysis'].get('landmarks')
+            if task['save_evidence']:
+                ok, encoded = cv2.imencode('.jpg', SkeletonEvidence(frame, landmarks).render())
+                evidence = encoded.tobytes() if ok else None
+
+            alerts.append({
+                'offset': offset,
+                'alert_type': alert_type,
+                'action': action,
+                'confidence': detection['confidence'],
+                'bbox': tuple(int(v) for v in detection['bbox']),
+                'track_id': detection['track_id'],
+                'evidence': evidence,
+                'landmarks': landmarks if evidence is not None else None
+            })
+
+    cap.release()
+    return {'start': task['start'], 'decoded': decoded, 'analyzed': analyzed, 'alerts': alerts}
+
+
+def merge_alerts(alerts: List[Dict[str, Any]], cooldown: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Chunk alerts in footage order, with the live core's per-camera cooldown when one is given
+
+    Track-event alerts need no cooldown: chunk warm-up already keeps a
+    track crossing a boundary from raising its events twice.
+    """
+    merged, last = [], None
+    for alert in sorted(alerts, key=lambda a: a['offset']):
+        if cooldown is not None:
+            if last is not None and alert['offset'] - last < cooldown:
+                continue
+            last = alert['offset']
+        merged.append(alert)
+    return merged
+
+
+def _format_offset(seconds: float) -> str:
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:06.3f}"
+
+
+def analyze_video(path: str, camera_name: Optional[str] = None, start_time: Optional[datetime] = None,
+                  workers: int = 0, chunks: int = 0, stride: int = 1, motion_gating: bool = True,
+                  save_evidence: bool = True, dry_run: bool = False) -> Dict[str, Any]:
+    camera_config = next((c for c in CAMERAS if c.name == camera_name), None) if camera_name else CAMERAS[0]
+    if camera_config is None:
+        raise ValueError(f"unknown camera {camera_name!r}; configured: {[c.name for c in CAMERAS]}")
+
+    fps, frame_count = probe_video(path)
+    duration = frame_count / fps if frame_count > 0 else 0.0
+    if duration <= 0:
+        raise ValueError(f"{path}: no frames or unknown duration")
+    if start_time is None:
+        # Recorders usually close the file when the recording ends
+        start_time = datetime.fromtimestamp(os.path.getmtime(path)) - timedelta(seconds=duration)
+
+    workers = workers or os.cpu_count() or 1
+    keyframes = keyframe_times(path)
+    plan = plan_chunks(duration, chunks or workers * 4, keyframes)
+    print(f"🎞️  {os.path.basename(path)}: {duration / 60:.1f} min at {fps:.1f} fps, "
+          f"{len(plan)} chunks ({'keyframe-aligned' if keyframes else 'even split'}), {workers} workers")
+
+    camera = {
+        'name': camera_config.name,
+        'restricted_zones': camera_config.restricted_zones,
+        'motion_sensitivity': camera_config.motion_sensitivity,
+        'breach_mode': camera_config.breach_mode,
+        'breach_overlap': camera_config.breach_overlap
+    }
+    video_name = os.path.splitext(os.path.basename(path))[0]
+    # Track-event alerts replace the cooldown, as in the live core
+    cooldown = None if TRACKER_CONFIG.alert_on_events else DETECTION_CONFIG.alert_cooldown
+    # Long enough for a track to be re-found and an action window to fill before the chunk starts
+    warmup = max(TRACKER_CONFIG.max_age, ACTION_CLASSIFIER_CONFIG.window_seconds)
+    tasks = [{'path': path, 'start': start, 'end': end, 'warmup': warmup if start > 0 else 0.0,
+              'stride': max(1, stride), 'motion_gating': motion_gating, 'camera': camera,
+              'save_evidence': save_evidence and not dry_run, 'cooldown': cooldown} for start, end in plan]
+    detector_kwargs = {
+        'min_detection_confidence': DETECTION_CONFIG.min_detection_confidence,
+        'enable_pose_analysis': DETECTION_CONFIG.pose_detection_enabled,
+        'backend': DETECTION_CONFIG.detector_backend,
+        'yolo_input_size': DETECTION_CONFIG.yolo_input_size,
+        'inference_width': DETECTION_CONFIG.inference_width
+    }
+
+    started = time.time()
+    results = []
+    ctx = mp.get_context('spawn')
+    with ctx.Pool(min(workers, len(tasks)), initializer=_init_worker, initargs=(detector_kwargs,)) as pool:
+        for result in pool.imap_unordered(_analyze_chunk, tasks):
+            results.append(result)
+            print(f"   chunk @ {_format_offset(result['start'])}: {result['analyzed']}/{result['decoded']} "
+                  f"frames analyzed, {len(result['alerts'])} alerts ({len(results)}/{len(tasks)})")
+    elapsed = time.time() - started
+
+    alerts = merge_alerts([a for r in results for a in r['alerts']], cooldown)
+    if not dry_run and alerts:
+        from utils.logger import AlertLogger
+        from utils.evidence_writer import write_landmarks
+        logger = AlertLogger()
+        evidence_dir = os.path.join("data", "evidence")
+        os.makedirs(evidence_dir, exist_ok=True)
+        for alert in alerts:
+            # Evidence only for alerts that are logged, so no image is left without a record
+            image_path = ""
+            if alert['evidence'] is not None:
+                image_path = os.path.join(
+                    evidence_dir,
+                    f"{camera_config.name}_{alert['alert_type']}_{video_name}_{alert['offset']:010.3f}_"
+                    f"{alert['track_id']}.jpg"
+                )
+                try:
+                    with open(image_path, 'wb') as f:
+                        f.write(alert['evidence'])
+                    if alert['landmarks'] is not None:
+                        write_landmarks(image_path, alert['landmarks'])
+                except OSError as e:
+                    print(f"❌ Evidence write error ({image_path}): {e}")
+                    image_path = ""
+            logger.log_alert(
+                camera_name=camera_config.name,
+                zone=alert['bbox'],
+                confidence=alert['confidence'],
+                image_path=image_path,
+                alert_type=alert['alert_type'],
+                action_type=alert['action'],
+                location=camera_config.location,
+                sms_sent=False,
+                email_sent=False,
+                timestamp=(start_time + timedelta(seconds=alert['offset'])).isoformat(),
+                extra={
+                    'source': 'batch',
+                    'video_file': os.path.abspath(path),
+                    'video_offset': _format_offset(alert['offset']),
+                    'track_id': alert['track_id']
+                }
+            )
+        logger.close()
+
+    summary = {
+        'video': path,
+        'duration_s': round(duration, 1),
+        'elapsed_s': round(elapsed, 1),
+        'speedup': round(duration / elapsed, 1) if elapsed else None,
+        'frames_decoded': sum(r['decoded'] for r in results),
+        'frames_analyzed': sum(r['analyzed'] for r in results),
+        'alerts': len(alerts)
+    }
+    print(f"✅ {summary['alerts']} alerts from {summary['duration_s'] / 60:.1f} min of footage "
+          f"in {summary['elapsed_s']:.0f}s ({summary['speedup']}x real time)")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze recorded footage faster than real time")
+    parser.add_argument('videos', nargs='+', help="Recorded video files")
+    parser.add_argument('--camera', help="Camera in config/settings.py whose zones apply (default: first)")
+    parser.add_argument('--start', help="Wall-clock time of the first frame, e.g. '2026-10-16 00:00:00'; "
+                                        "single video only (default: file modification time minus duration)")
+    parser.add_argument('--workers', type=int, default=0, help="Processes (default: CPU count)")
+    parser.add_argument('--chunks', type=int, default=0, help="Chunks per video (default: 4 per worker)")
+    parser.add_argument('--stride', type=int, default=1, help="Analyze every Nth frame")
+    parser.add_argument('--no-motion-gating', action='store_true', help="Run the detector on static scenes too")
+    parser.add_argument('--no-evidence', action='store_true', help="Don't write evidence images")
+    parser.add_argument('--dry-run', action='store_true', help="Report alerts without writing the alert store")
+    args = parser.parse_args()
+
+    if args.start and len(args.videos) > 1:
+        parser.error("--start applies to a single video")
+    start_time = datetime.fromisoformat(args.start) if args.start else None
+    summaries = []
+    for video in args.videos:
+        try:
+            summaries.append(analyze_video(
+                video, args.camera, start_time, args.workers, args.chunks, args.stride,
+                motion_gating=not args.no_motion_gating, save_evidence=not args.no_evidence,
+                dry_run=args.dry_run
+            ))
+        except (IOError, ValueError) as e:
+            print(f"❌ {video}: {e}")
+    print(json.dumps(summaries, indent=2))
@@ -1,56 +1,195 @@
 import cv2
 import mediapipe as mp
 import numpy as np
-from typing import List, Dict, Any
-from src.pose_analyzer import PoseAnalyzer, SuspiciousAction
+from typing import List, Dict, Any, Optional
+from src.pose_analyzer import PoseAnalyzer, SkeletonEvidence, SuspiciousAction, landmarks_to_array
+from src.yolo_detector import YoloPersonDetector
+from utils.zones import zone_polygon
+
+POSE_INPUT_SIZE = 256  # BlazePose landmark model input
+CROP_PADDING = 0.15  # Context around each person box, as a fraction of its long side
+MIN_VISIBILITY = 0.5  # Landmarks below this (occluded or guessed) do not shape the bbox
+
+
+class InferenceFrame:
+    """
+    Downscaled RGB copy of a camera frame, written into preallocated buffers
+
+    Both backends resize internally (BlazePose to 256, YOLO to its input
+    size) and return normalized coordinates, so inference needs no more
+    than `max_width` pixels. Resizing first means the BGR->RGB conversion
+    touches the small frame only, and landmarks and boxes map back to full
+    resolution by scaling with the original frame size. The returned array
+    is a read-only view (MediaPipe then passes it by reference instead of
+    copying it) and is overwritten by the next prepare() call.
+    """
+
+    def __init__(self, max_width: int = 640):
+        self.max_width = max_width
+        self.small = None
+        self.rgb = None
+
+    def prepare(self, frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        if self.max_width and w > self.max_width:
+            size = (self.max_width, max(1, round(h * self.max_width / w)))
+        else:
+            size = (w, h)
+
+        if self.rgb is None or self.rgb.shape[:2] != (size[1], size[0]):
+            self.rgb = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            self.small = np.empty_like(self.rgb) if size != (w, h) else None
+
+        source = frame
+        if self.small is not None:
+            # Bilinear: several times cheaper than INTER_AREA at 1080p/4K, and the
+            # models resample to their own (smaller) input size anyway
+            source = cv2.resize(frame, size, dst=self.small, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(source, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        # Only the view is read-only; the buffer stays writable for the next frame
+        view = self.rgb.view()
+        view.flags.writeable = False
+        return view
 
 
 class AdvancedPersonDetector:
-    def __init__(self, min_detection_confidence: float = 0.5, enable_pose_analysis: bool = True):
+    def __init__(self, min_detection_confidence: float = 0.5, enable_pose_analysis: bool = True,
+                 backend: str = "mediapipe", yolo_input_size: int = 416, inference_width: int = 640):
         print("🚀 Loading Advanced DSTPS Detection...")
+        self.backend = backend
+        self.inference_width = inference_width
+        # One buffer set per position in a batch, so batched frames never share one
+        self.inference_frames: List[InferenceFrame] = []
+        self.person_detector = None
+        if backend == "yolo":
+            try:
+                self.person_detector = YoloPersonDetector(
+                    input_size=yolo_input_size,
+                    confidence_threshold=min_detection_confidence
+                )
+            except Exception as e:
+                print(f"❌ YOLO backend unavailable ({e}) - falling back to MediaPipe")
+                self.backend = "mediapipe"
+
         self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
-            min_detection_confidence=min_detection_confidence,
-            min_tracking_confidence=0.5
-        )
+        self.crop_pose = None
+        if self.backend == "mediapipe":
+            self.pose = self.mp_pose.Pose(
+                min_detection_confidence=min_detection_confidence,
+                min_tracking_confidence=0.5
+            )
+        elif enable_pose_analysis:
+            # Two-stage mode: pose only on person crops. Crops come from many
+            # people and cameras, so frame-to-frame tracking is disabled
+            self.crop_pose = self.mp_pose.Pose(
+                static_image_mode=True,
+                min_detection_confidence=min_detection_confidence
+            )
 
         self.pose_analyzer = PoseAnalyzer() if enable_pose_analysis else None
-        self.detection_history = []
 
         print("✅ Advanced Detection System Ready!")
 
+    def inference_frame(self, frame: np.ndarray, slot: int = 0) -> np.ndarray:
+        """Downscaled RGB frame for inference (see InferenceFrame)"""
+        while len(self.inference_frames) <= slot:
+            self.inference_frames.append(InferenceFrame(self.inference_width))
+        return self.inference_frames[slot].prepare(frame)
+
+    def detect_batch(self, frames: List[np.ndarray]) -> List[List[Dict[str, Any]]]:
+        """Detect on frames from several cameras; YOLO runs them as one blob"""
+        if self.person_detector is None:
+            return [self.detect(frame) for frame in frames]
+
+        try:
+            # Boxes are normalized, so they are scaled straight to the full-resolution frames
+            batch = self.person_detector.detect_batch(
+                [self.inference_frame(frame, slot) for slot, frame in enumerate(frames)],
+                frame_shapes=[frame.shape[:2] for frame in frames],
+                swap_rb=False
+            )
+        except Exception as e:
+            print(f"Detection error: {e}")
+            return [[] for _ in frames]
+
+        for frame, detections in zip(frames, batch):
+            # Empty frames cost no pose inference at all
+            crops = [self._crop_person(frame, detection['bbox']) for detection in detections]
+            for detection, (crop, origin, side) in zip(detections, crops):
+                pose_analysis = {"action": SuspiciousAction.NORMAL, "confidence": 0.0}
+                if self.crop_pose is not None and self.pose_analyzer:
+                    landmarks = self._crop_landmarks(crop, origin, side)
+                    if landmarks is not None:
+                        pose_analysis = self.pose_analyzer.analyze_landmarks(landmarks, frame)
+
+                detection['pose_analysis'] = pose_analysis
+                detection['evidence'] = SkeletonEvidence(frame, pose_analysis.get('landmarks'))
+        return batch
+
+    @staticmethod
+    def _crop_person(frame: np.ndarray, bbox) -> tuple:
+        """Padded square crop around a person box, resized to the pose model input"""
+        h, w = frame.shape[:2]
+        x_min, y_min, x_max, y_max = bbox
+        side = int(max(x_max - x_min, y_max - y_min) * (1 + 2 * CROP_PADDING)) or 1
+        x0 = (x_min + x_max) // 2 - side // 2
+        y0 = (y_min + y_max) // 2 - side // 2
+
+        # Clip to the frame and pad back to a square so aspect ratio is preserved
+        cx0, cy0 = max(0, x0), max(0, y0)
+        cx1, cy1 = min(w, x0 + side), min(h, y0 + side)
+        crop = frame[cy0:cy1, cx0:cx1]
+        crop = cv2.copyMakeBorder(crop, cy0 - y0, y0 + side - cy1, cx0 - x0, x0 + side - cx1,
+                                  cv2.BORDER_CONSTANT, value=0)
+        crop = cv2.resize(crop, (POSE_INPUT_SIZE, POSE_INPUT_SIZE), interpolation=cv2.INTER_AREA)
+        return crop, (x0, y0), side
+
+    def _crop_landmarks(self, crop: np.ndarray, origin, side: int) -> Optional[np.ndarray]:
+        """Run pose on one crop and map the landmark array back to frame pixels"""
+        rgb_crop = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+        rgb_crop.flags.writeable = False
+        results = self.crop_pose.process(rgb_crop)
+        if not results.pose_landmarks:
+            return None
+
+        landmarks = landmarks_to_array(results.pose_landmarks.landmark, side, side)
+        landmarks[:, :2] += origin
+        return landmarks
+
+    @staticmethod
+    def _landmark_bbox(landmarks: np.ndarray, frame_shape, padding: int = 20) -> tuple:
+        """Padded box around the visible landmarks of a (33, 4) array"""
+        h, w = frame_shape
+        visible = landmarks[:, 3] >= MIN_VISIBILITY
+        # A mostly occluded person still gets a box from all landmarks
+        points = landmarks[visible, :2] if np.count_nonzero(visible) >= 4 else landmarks[:, :2]
+
+        x_min, y_min = points.min(axis=0).astype(int) - padding
+        x_max, y_max = points.max(axis=0).astype(int) + padding
+        return max(0, int(x_min)), max(0, int(y_min)), min(w, int(x_max)), min(h, int(y_max))
+
     def detect(self, frame: np.ndarray) -> List[Dict[str, Any]]:
         """Advanced detection with pose analysis"""
+        if self.person_detector is not None:
+            return self.detect_batch([frame])[0]
+
         detections = []
 
         try:
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            rgb_frame.flags.writeable = False
-
-            results = self.pose.process(rgb_frame)
+            results = self.pose.process(self.inference_frame(frame))
 
             if results.pose_landmarks:
+                # Normalized landmarks scale straight to the full-resolution frame
                 h, w = frame.shape[:2]
-                landmarks = results.pose_landmarks.landmark
-
-                # Calculate bounding box from pose landmarks
-                x_coords = [lm.x * w for lm in landmarks]
-                y_coords = [lm.y * h for lm in landmarks]
-
-                x_min, x_max = int(min(x_coords)), int(max(x_coords))
-                y_min, y_max = int(min(y_coords)), int(max(y_coords))
+                landmarks = landmarks_to_array(results.pose_landmarks.landmark, w, h)
 
-                # Add padding
-                padding = 20
-                x_min = max(0, x_min - padding)
-                y_min = max(0, y_min - padding)
-                x_max = min(w, x_max + padding)
-                y_max = min(h, y_max + padding)
+                # Calculate bounding box from the visible pose landmarks
+                x_min, y_min, x_max, y_max = self._landmark_bbox(landmarks, (h, w))
 
                 # Pose analysis
                 pose_analysis = {"action": SuspiciousAction.NORMAL, "confidence": 0.0}
                 if self.pose_analyzer:
-                    pose_analysis = self.pose_analyzer.analyze_pose(frame)
+                    pose_analysis = self.pose_analyzer.analyze_landmarks(landmarks, frame)
 
                 center_x = (x_min + x_max) // 2
                 center_y = (y_min + y_max) // 2
@@ -61,7 +200,7 @@ class AdvancedPersonDetector:
                     'class_name': 'person',
                     'center': (center_x, center_y),
                     'pose_analysis': pose_analysis,
-                    'skeleton_image': pose_analysis.get('skeleton_image', frame)
+                    'evidence': SkeletonEvidence(frame, landmarks)
                 }
                 detections.append(detection)
 
@@ -70,16 +209,18 @@ class AdvancedPersonDetector:
 
         return detections
 
-    def check_restricted_zone_breach(self, detection: Dict, restricted_zones: List) -> bool:
+    @staticmethod
+    def check_restricted_zone_breach(detection: Dict, restricted_zones: List) -> bool:
+        """Single-detection center check; DSTPSCore uses a per-camera ZoneMap instead"""
         cx, cy = detection['center']
 
         for zone in restricted_zones:
-            x1, y1, x2, y2 = zone
-            if x1 <= cx <= x2 and y1 <= cy <= y2:
+            if cv2.pointPolygonTest(zone_polygon(zone), (float(cx), float(cy)), False) >= 0:
                 return True
         return False
 
-    def is_suspicious_action(self, detection: Dict) -> bool:
+    @staticmethod
+    def is_suspicious_action(detection: Dict) -> bool:
         """Check if detection involves suspicious actions"""
         pose_analysis = detection.get('pose_analysis', {})
         action = pose_analysis.get('action', SuspiciousAction.NORMAL)
@@ -89,4 +230,8 @@ class AdvancedPersonDetector:
 
     def release(self):
         if hasattr(self, 'pose'):
-            self.pose.close()
\ No newline at end of file
+            self.pose.close()
+        if self.crop_pose is not None:
+            self.crop_pose.close()
+        if self.pose_analyzer:
+            self.pose_analyzer.release()
\ No newline at end of file
@@ -2,30 +2,154 @@ import cv2
 import time
 import sys
 import os
+import signal
 from datetime import datetime, timedelta
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.settings import CAMERAS, DETECTION_CONFIG
-from utils.video_utils import VideoHandler
+from config.settings import (
+    CAMERAS, DETECTION_CONFIG, CAPTURE_CONFIG, WORKER_POOL_CONFIG,
+    ALERT_DISPATCH_CONFIG, EVIDENCE_CONFIG, CLIP_CONFIG, FRAME_BUS_CONFIG, SCHEDULER_CONFIG,
+    TRACKER_CONFIG, ACTION_CLASSIFIER_CONFIG, RUNTIME_CONFIG, METRICS_CONFIG
+)
+from utils.video_utils import VideoHandler, ZoneOverlay
+from utils.zones import ZoneMap
 from src.detector import AdvancedPersonDetector
 from utils.logger import AlertLogger
 from utils.notifier import EmailNotifier
 from utils.sms_notifier import SMSNotifier
-from src.pose_analyzer import SuspiciousAction
+from utils.alert_dispatcher import AlertDispatcher
+from utils.evidence_writer import EvidenceWriter
+from utils.clip_recorder import ClipRecorder
+from utils.frame_bus import FrameBusPublisher
+from utils.motion_gate import MotionGate
+from utils.scheduler import InferenceScheduler
+from utils.control_server import ControlServer
+from utils.metrics import Metrics, MetricsServer
+from src.pose_analyzer import SkeletonEvidence, SuspiciousAction
+from src.worker_pool import DetectionWorkerPool
+from src.tracker import PersonTracker, event_alert_type
+from src.action_classifier import TemporalActionClassifier
+
+
+# Keyboard shortcuts and their control socket command names
+KEY_COMMANDS = {
+    ord('q'): 'quit',
+    ord('s'): 'screenshot',
+    ord('d'): 'dashboard',
+    ord('r'): 'reset',
+    ord('t'): 'test_sms'
+}
 
 
 class DSTPSCore:
     def __init__(self):
-        self.detector = AdvancedPersonDetector(
-            min_detection_confidence=DETECTION_CONFIG.min_detection_confidence,
-            enable_pose_analysis=DETECTION_CONFIG.pose_detection_enabled
-        )
+        detector_kwargs = {
+            'min_detection_confidence': DETECTION_CONFIG.min_detection_confidence,
+            'enable_pose_analysis': DETECTION_CONFIG.pose_detection_enabled,
+            'backend': DETECTION_CONFIG.detector_backend,
+            'yolo_input_size': DETECTION_CONFIG.yolo_input_size,
+            'inference_width': DETECTION_CONFIG.inference_width
+        }
+        # In worker-pool mode each worker process owns its own detector
+        self.worker_pool = None
+        self.detector = None
+        if WORKER_POOL_CONFIG.enabled:
+            self.worker_pool = DetectionWorkerPool(
+                num_cameras=len(CAMERAS),
+                num_workers=WORKER_POOL_CONFIG.num_workers,
+                detector_kwargs=detector_kwargs
+            )
+        else:
+            self.detector = AdvancedPersonDetector(**detector_kwargs)
         self.video_handlers = []
+        self.motion_gates = []  # Aligned with video_handlers; None = always detect
+        self.scheduler = None
+        if SCHEDULER_CONFIG.enabled:
+            self.scheduler = InferenceScheduler(
+                idle_fps=SCHEDULER_CONFIG.idle_fps,
+                active_fps=SCHEDULER_CONFIG.active_fps,
+                active_hold=SCHEDULER_CONFIG.active_hold,
+                cpu_target=SCHEDULER_CONFIG.cpu_target,
+                min_fps=SCHEDULER_CONFIG.min_fps
+            )
         self.alerts = []
+        self.metrics = Metrics()
+        self.metrics.describe('stage_seconds', 'histogram', "Per-camera time spent in each pipeline stage")
+        self.metrics.describe('frames_total', 'counter', "Frames read from each camera")
+        self.metrics.describe('frames_skipped_total', 'counter', "Frames that skipped inference, by reason")
+        self.metrics.describe('detections_total', 'counter', "People detected on inferred frames")
+        self.metrics.describe('alerts_total', 'counter', "Alerts raised, by type")
+        self.metrics.describe('alert_dispatch_seconds', 'histogram', "Alert queueing to successful delivery")
         self.logger = AlertLogger()
         self.email_notifier = EmailNotifier()
         self.sms_notifier = SMSNotifier()
+        self.dispatcher = AlertDispatcher(
+            self.email_notifier,
+            self.sms_notifier,
+            max_queue=ALERT_DISPATCH_CONFIG.queue_size,
+            max_retries=ALERT_DISPATCH_CONFIG.max_retries,
+            retry_backoff=ALERT_DISPATCH_CONFIG.retry_backoff,
+            smtp_idle_timeout=ALERT_DISPATCH_CONFIG.smtp_idle_timeout,
+            metrics=self.metrics
+        )
+        self.dispatcher.start()
+        self.evidence_writer = EvidenceWriter(
+            EVIDENCE_CONFIG.directory,
+            workers=EVIDENCE_CONFIG.workers,
+            max_pending=EVIDENCE_CONFIG.max_pending,
+            jpeg_quality=EVIDENCE_CONFIG.jpeg_quality,
+            max_width=EVIDENCE_CONFIG.max_width
+        )
+        self.clip_recorder = None
+        if CLIP_CONFIG.enabled:
+            self.clip_recorder = ClipRecorder(
+                CLIP_CONFIG.directory,
+                pre_seconds=CLIP_CONFIG.pre_seconds,
+                post_seconds=CLIP_CONFIG.post_seconds,
+                fps=CLIP_CONFIG.fps,
+                max_width=CLIP_CONFIG.max_width,
+                jpeg_quality=CLIP_CONFIG.jpeg_quality,
+                max_buffer_mb=CLIP_CONFIG.max_buffer_mb,
+                max_pending=CLIP_CONFIG.max_pending
+            )
+        self.frame_bus = None
+        if FRAME_BUS_CONFIG.enabled:
+            self.frame_bus = FrameBusPublisher(
+                FRAME_BUS_CONFIG.host,
+                FRAME_BUS_CONFIG.port,
+                max_fps=FRAME_BUS_CONFIG.max_fps,
+                jpeg_quality=FRAME_BUS_CONFIG.jpeg_quality,
+                path=FRAME_BUS_CONFIG.path,
+                token=FRAME_BUS_CONFIG.token
+            )
+            if not self.frame_bus.start():
+                self.frame_bus = None
+        self.headless = RUNTIME_CONFIG.headless
+        self.control = None
+        if RUNTIME_CONFIG.control_socket:
+            self.control = ControlServer(
+                KEY_COMMANDS.values(),
+                RUNTIME_CONFIG.control_host,
+                RUNTIME_CONFIG.control_port,
+                path=RUNTIME_CONFIG.control_path,
+                token=RUNTIME_CONFIG.control_token
+            )
+            if not self.control.start():
+                self.control = None
+        self.stop_requested = False
+        self.submitted_at = {}  # Worker pool: camera index -> submit time
+        self.metrics_server = None
+        if METRICS_CONFIG.enabled:
+            self.register_gauges()
+            self.metrics_server = MetricsServer(self.metrics, METRICS_CONFIG.host, METRICS_CONFIG.port)
+            if not self.metrics_server.start():
+                self.metrics_server = None
+        self.pending_commands = []  # Queued by signal handlers
+        self.trackers = {}  # Per camera name
+        self.action_classifiers = {}
+        self.zone_overlays = {}
+        self.zone_maps = {}
         self.alert_cooldowns = {}
         self.alert_cooldown_time = DETECTION_CONFIG.alert_cooldown
 
@@ -33,15 +157,45 @@ class DSTPSCore:
         print("📹 Initializing multi-camera system...")
         success_count = 0
         for camera_config in CAMERAS:
-            handler = VideoHandler(camera_config.stream_url)
+            handler = VideoHandler(
+                camera_config.stream_url,
+                threaded=CAPTURE_CONFIG.threaded,
+                buffer_size=CAPTURE_CONFIG.buffer_size,
+                reconnect_after=CAPTURE_CONFIG.reconnect_after
+            )
             if handler.start_stream():
                 self.video_handlers.append((handler, camera_config))
+                self.motion_gates.append(
+                    MotionGate(camera_config.motion_sensitivity) if camera_config.motion_gating else None
+                )
+                if TRACKER_CONFIG.enabled:
+                    history = TRACKER_CONFIG.history
+                    if ACTION_CLASSIFIER_CONFIG.enabled:
+                        classifier = TemporalActionClassifier(
+                            window_seconds=ACTION_CLASSIFIER_CONFIG.window_seconds,
+                            min_frames=ACTION_CLASSIFIER_CONFIG.min_frames,
+                            debounce_frames=ACTION_CLASSIFIER_CONFIG.debounce_frames,
+                            min_votes=ACTION_CLASSIFIER_CONFIG.min_votes,
+                            max_fps=ACTION_CLASSIFIER_CONFIG.max_fps
+                        )
+                        self.action_classifiers[camera_config.name] = classifier
+                        # Landmark windows must span the classifier's window_seconds
+                        history = max(history, classifier.history)
+                    self.trackers[camera_config.name] = PersonTracker(
+                        iou_threshold=TRACKER_CONFIG.iou_threshold,
+                        max_misses=TRACKER_CONFIG.max_misses,
+                        history=history,
+                        use_kalman=TRACKER_CONFIG.use_kalman,
+                        max_age=TRACKER_CONFIG.max_age
+                    )
                 print(f"✅ Camera '{camera_config.name}' at {camera_config.location}")
                 success_count += 1
             else:
                 print(f"❌ Failed: {camera_config.name}")
 
         print(f"📊 {success_count}/{len(CAMERAS)} cameras initialized")
+        if success_count > 0 and self.worker_pool:
+            self.worker_pool.start()
         return success_count > 0
 
     def can_send_alert(self, camera_name: str) -> bool:
@@ -53,18 +207,17 @@ class DSTPSCore:
     def update_cooldown(self, camera_name: str):
         self.alert_cooldowns[camera_name] = time.time()
 
-    def save_alert_image(self, frame, camera_name, alert_type):
-        os.makedirs('data/evidence', exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"data/evidence/{camera_name}_{alert_type}_{timestamp}.jpg"
-        cv2.imwrite(filename, frame)
-        return filename
+    def save_alert_image(self, frame, camera_name, alert_type, landmarks=None):
+        """Queue evidence for the background writer; returns (path, future)"""
+        return self.evidence_writer.save(frame, camera_name, alert_type, landmarks)
 
     def draw_enhanced_detections(self, frame, detections, restricted_zones, camera_name):
         """Draw detections with color coding based on threat level"""
-        # Draw restricted zones
-        video_handler = VideoHandler("0")
-        video_handler.draw_restricted_zones(frame, restricted_zones)
+        # Draw restricted zones from the camera's cached overlay
+        overlay = self.zone_overlays.get(camera_name)
+        if overlay is None:
+            overlay = self.zone_overlays[camera_name] = ZoneOverlay()
+        overlay.draw(frame, restricted_zones)
 
         for detection in detections:
             x1, y1, x2, y2 = detection['bbox']
@@ -87,7 +240,9 @@ class DSTPSCore:
             # Draw bounding box
             cv2.rectangle(frame, (x1, y1), (x2, y2), color, 3)
 
-            # Draw status text
+            # Draw status text, prefixed with the persistent track ID
+            if 'track_id' in detection:
+                status = f"#{detection['track_id']} {status}"
             cv2.putText(frame, status, (x1, y1 - 10),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
 
@@ -100,128 +255,411 @@ class DSTPSCore:
             center_x, center_y = detection['center']
             cv2.circle(frame, (center_x, center_y), 5, (255, 255, 255), -1)
 
-    def process_streams(self):
-        print("🚀 Starting Advanced DSTPS System...")
-        print("💡 Features: Multi-cam, Pose Analysis, SMS, Web Dashboard")
-        print("🎮 Controls: Q=Quit, S=Screenshot, D=Dashboard, R=Reset Alerts")
+    def register_gauges(self):
+        """Scrape-time views of queue depths and component counters"""
+        def per_camera(stat):
+            return lambda: [({'camera': config.name}, handler.get_stats()[stat])
+                            for handler, config in self.video_handlers]
+
+        def stat_values(get_stats, label, keys, scale=1):
+            return lambda: [({label: k} if label else {}, get_stats()[k] * scale) for k in keys]
+
+        metrics = self.metrics
+        metrics.counter('capture_frames_dropped_total', "Frames overwritten in the capture ring buffer",
+                        per_camera('frames_dropped'))
+        metrics.counter('capture_read_failures_total', "Failed camera reads", per_camera('read_failures'))
+
+        dispatcher_stats = self.dispatcher.get_stats
+        metrics.counter('alert_dispatch_total', "Alert deliveries by outcome",
+                        stat_values(dispatcher_stats, 'event', ('queued', 'sent', 'failed', 'dropped', 'disabled')))
+        metrics.counter('alert_dispatch_retries_total', "Delivery attempts retried after a transient error",
+                        stat_values(dispatcher_stats, None, ('retries',)))
+        metrics.gauge('alert_dispatch_queue_depth', "Alerts waiting for delivery",
+                      stat_values(dispatcher_stats, None, ('queue_depth',)))
+
+        evidence_stats = self.evidence_writer.get_stats
+        metrics.counter('evidence_images_total', "Evidence images by outcome",
+                        stat_values(evidence_stats, 'event', ('queued', 'written', 'failed', 'dropped')))
+        metrics.counter('evidence_bytes_total', "Encoded evidence bytes written",
+                        stat_values(evidence_stats, None, ('bytes',)))
+        metrics.gauge('evidence_pending', "Evidence images queued or being written",
+                      stat_values(evidence_stats, None, ('pending',)))
+        metrics.gauge('evidence_max_pending', "Most evidence images pending at once",
+                      stat_values(evidence_stats, None, ('max_pending',)))
+        metrics.gauge('evidence_last_write_seconds', "Encode and write time of the latest evidence image",
+                      stat_values(evidence_stats, None, ('last_write_ms',), scale=0.001))
+        metrics.gauge('evidence_max_write_seconds', "Slowest evidence image encode and write",
+                      stat_values(evidence_stats, None, ('max_write_ms',), scale=0.001))
+
+        if self.clip_recorder:
+            clip_stats = self.clip_recorder.get_stats
+            metrics.counter('clips_total', "Alert clips by outcome",
+                            stat_values(clip_stats, 'event', ('triggered', 'written', 'failed', 'dropped')))
+            metrics.counter('clip_bytes_total', "Clip bytes written", stat_values(clip_stats, None, ('bytes',)))
+            metrics.gauge('clips_pending', "Clips queued or being written",
+                          stat_values(clip_stats, None, ('pending',)))
+            metrics.gauge('clips_recording', "Clips still collecting post-roll",
+                          stat_values(clip_stats, None, ('recording',)))
+            metrics.gauge('clip_buffer_bytes', "Encoded pre-roll held in memory",
+                          lambda: [({'camera': name}, size)
+                                   for name, size in self.clip_recorder.buffered_bytes().items()])
+        metrics.gauge('frame_bus_subscribers', "Connected frame bus viewers",
+                      lambda: [({}, self.frame_bus.subscribers if self.frame_bus else 0)])
+        if self.scheduler:
+            metrics.gauge('inference_rate_fps', "Current inference budget (0 = every frame)",
+                          lambda: [({'camera': name}, rate) for name, rate in self.scheduler.get_rates().items()])
+        if self.worker_pool:
+            metrics.gauge('worker_frames_in_flight', "Frames submitted to detection workers",
+                          lambda: [({}, len(self.worker_pool.in_flight))])
+
+    def read_active_frames(self):
+        """Yield (camera_index, frame, active); inactive frames skip the detector"""
+        metrics = self.metrics
+        for camera_index, (handler, camera_config) in enumerate(self.video_handlers):
+            t0 = time.perf_counter()
+            frame = handler.read_frame()
+            if frame is None:
+                continue
+            t1 = time.perf_counter()
+            name = camera_config.name
+            metrics.observe('stage_seconds', t1 - t0, camera=name, stage='capture')
+            metrics.inc('frames_total', camera=name)
+
+            gate = self.motion_gates[camera_index]
+            if gate is not None:
+                moving = gate.should_detect(frame)
+                metrics.observe('stage_seconds', time.perf_counter() - t1, camera=name, stage='motion_gate')
+                if not moving:
+                    # Static scene: show the frame but skip inference
+                    metrics.inc('frames_skipped_total', camera=name, reason='motion')
+                    yield camera_index, frame, False
+                    continue
 
-        while True:
-            for handler, camera_config in self.video_handlers:
-                frame = handler.read_frame()
-                if frame is None:
+            # Within budget: idle cameras run at a low rate, active ones at full rate
+            if self.scheduler and not self.scheduler.should_run(name):
+                metrics.inc('frames_skipped_total', camera=name, reason='schedule')
+                yield camera_index, frame, False
+                continue
+            yield camera_index, frame, True
+
+    def detect_frames(self):
+        """Yield (frame, detections, camera_config) for every frame read this pass
+
+        detections is None for frames that skipped inference.
+        """
+        if self.worker_pool is None:
+            frames, indices = [], []
+            for camera_index, frame, active in self.read_active_frames():
+                if not active:
+                    yield frame, None, self.video_handlers[camera_index][1]
                     continue
+                frames.append(frame)
+                indices.append(camera_index)
+
+            # Batch-capable backends run every camera's frame in one pass
+            t0 = time.perf_counter()
+            batch = self.detector.detect_batch(frames) if frames else []
+            # Batch time is shared evenly between the cameras in it
+            per_frame = (time.perf_counter() - t0) / max(len(frames), 1)
+            for frame, detections, camera_index in zip(frames, batch, indices):
+                self.metrics.observe('stage_seconds', per_frame,
+                                     camera=self.video_handlers[camera_index][1].name, stage='inference')
+                self._report_detections(camera_index, detections)
+                yield frame, detections, self.video_handlers[camera_index][1]
+            return
+
+        for camera_index, frame, active in self.read_active_frames():
+            if not active:
+                yield frame, None, self.video_handlers[camera_index][1]
+                continue
+            if self.worker_pool.submit(camera_index, frame):
+                self.submitted_at[camera_index] = time.perf_counter()
+
+        for camera_index, frame, detections in self.worker_pool.collect(timeout=0.005):
+            # Submit-to-result latency, including shared-memory and queue hops
+            submitted = self.submitted_at.pop(camera_index, None)
+            if submitted is not None:
+                self.metrics.observe('stage_seconds', time.perf_counter() - submitted,
+                                     camera=self.video_handlers[camera_index][1].name, stage='inference')
+            self._report_detections(camera_index, detections)
+            yield frame, detections, self.video_handlers[camera_index][1]
+
+    def _report_detections(self, camera_index, detections):
+        self.metrics.inc('detections_total', len(detections), camera=self.video_handlers[camera_index][1].name)
+        gate = self.motion_gates[camera_index]
+        if gate is not None:
+            gate.report_detections(len(detections))
+        if self.scheduler:
+            self.scheduler.report_detections(self.video_handlers[camera_index][1].name, len(detections))
+
+    def process_frame(self, frame, detections, camera_config):
+        """Alerting and visualization for one frame's detections"""
+        alerts_in_frame = []
+        inferred = detections is not None
+        detections = detections or []
+        metrics = self.metrics
+        name = camera_config.name
+        t0 = time.perf_counter()
+
+        # Clip pre-roll: raw frames, buffered before anything is drawn on them
+        if self.clip_recorder and self.clip_recorder.add_frame(name, frame):
+            t1 = time.perf_counter()
+            metrics.observe('stage_seconds', t1 - t0, camera=name, stage='clip_buffer')
+            t0 = t1
+
+        # Zone breach detection: one mask lookup for all detections
+        zone_map = self.zone_maps.get(camera_config.name)
+        if zone_map is None:
+            zone_map = self.zone_maps[camera_config.name] = ZoneMap(
+                camera_config.breach_mode, camera_config.breach_overlap
+            )
+        breaches = zone_map.breaches(detections, camera_config.restricted_zones, frame.shape)
+        for detection, breach in zip(detections, breaches):
+            detection['breach'] = bool(breach)
+        t1 = time.perf_counter()
+        metrics.observe('stage_seconds', t1 - t0, camera=name, stage='zones')
+
+        # Persistent IDs; only frames that ran inference advance the tracker
+        tracker = self.trackers.get(camera_config.name)
+        if tracker and inferred:
+            now = time.time()
+            tracker.update(detections, now)
+            # Debounced actions over each track's landmark window replace the single-frame rules
+            classifier = self.action_classifiers.get(camera_config.name)
+            if classifier:
+                classifier.update(tracker, detections, now)
+            tracker.record_actions(detections, AdvancedPersonDetector.is_suspicious_action)
+            metrics.observe('stage_seconds', time.perf_counter() - t1, camera=name, stage='tracking')
+        on_events = tracker is not None and TRACKER_CONFIG.alert_on_events
 
-                # Detect people with advanced features
-                detections = self.detector.detect(frame)
-                alerts_in_frame = []
+        for detection in detections:
+            is_breach = detection['breach']
+
+            # Suspicious action detection
+            is_suspicious = AdvancedPersonDetector.is_suspicious_action(detection)
+
+            # Check if we should trigger alerts
+            if is_breach or is_suspicious:
+                alerts_in_frame.append(detection)
+
+                alert_type = "zone_breach" if is_breach else "suspicious_action"
+                action = detection['pose_analysis'].get('action', SuspiciousAction.NORMAL).value
+
+                if on_events:
+                    # Once per track event (entering a zone, a new suspicious action),
+                    # not on every frame the person stays in view
+                    alert_type = event_alert_type(detection)
+                    due = alert_type is not None
+                else:
+                    # Only send alerts if cooldown period has passed
+                    due = self.can_send_alert(camera_config.name)
+
+                if due:
+                    alert_start = time.perf_counter()
+                    metrics.inc('alerts_total', camera=name, type=alert_type)
+
+                    # Skeleton is drawn only now; worker processes return landmarks only
+                    evidence = detection.get('evidence') or SkeletonEvidence(
+                        frame, detection['pose_analysis'].get('landmarks')
+                    )
 
-                for detection in detections:
-                    # Zone breach detection
-                    is_breach = self.detector.check_restricted_zone_breach(
-                        detection, camera_config.restricted_zones
+                    # Save evidence image (encoded and written in the background)
+                    image_path, image_ready = self.save_alert_image(
+                        evidence.render(),
+                        camera_config.name,
+                        alert_type,
+                        landmarks=detection['pose_analysis'].get('landmarks')
+                    )
+
+                    # Pre-roll plus the next few seconds, written once the post-roll is in
+                    clip_path = None
+                    if self.clip_recorder:
+                        clip_path = self.clip_recorder.trigger(camera_config.name, alert_type)
+
+                    # Log alert to file system
+                    alert_id = self.logger.log_alert(
+                        camera_name=camera_config.name,
+                        zone=detection['bbox'],
+                        confidence=detection['confidence'],
+                        image_path=image_path or "",
+                        alert_type=alert_type,
+                        action_type=action,
+                        location=camera_config.location,
+                        sms_sent=DETECTION_CONFIG.sms_alerts_enabled,
+                        email_sent=True,
+                        extra={'clip_path': clip_path} if clip_path else None
+                    )
+                    if clip_path:
+                        # Whether the clip was written, dropped or failed goes to the clip index
+                        self.clip_recorder.add_alert(camera_config.name, alert_id)
+
+                    # Queue one EMAIL to all configured addresses (sent in the background)
+                    self.dispatcher.dispatch_email(
+                        camera_config.alert_emails,
+                        f"{alert_type.replace('_', ' ').title()} - {action}",
+                        f"Detected at {camera_config.location}. Confidence: {detection['confidence']:.2f}",
+                        image_path,
+                        image_ready=image_ready
                     )
-                    detection['breach'] = is_breach
-
-                    # Suspicious action detection
-                    is_suspicious = self.detector.is_suspicious_action(detection)
-
-                    # Check if we should trigger alerts
-                    if is_breach or is_suspicious:
-                        alerts_in_frame.append(detection)
-
-                        # Only send alerts if cooldown period has passed
-                        if self.can_send_alert(camera_config.name):
-                            alert_type = "zone_breach" if is_breach else "suspicious_action"
-                            action = detection['pose_analysis'].get('action', SuspiciousAction.NORMAL).value
-
-                            # Save evidence image
-                            image_path = self.save_alert_image(
-                                detection.get('skeleton_image', frame),
-                                camera_config.name,
-                                alert_type
-                            )
-
-                            # Log alert to file system
-                            self.logger.log_alert(
-                                camera_name=camera_config.name,
-                                zone=detection['bbox'],
-                                confidence=detection['confidence'],
-                                image_path=image_path,
-                                alert_type=alert_type,
-                                action_type=action,
-                                location=camera_config.location,
-                                sms_sent=DETECTION_CONFIG.sms_alerts_enabled,
-                                email_sent=True
-                            )
-
-                            # Send EMAIL alerts to all configured addresses
-                            for email in camera_config.alert_emails:
-                                self.email_notifier.send_alert(
-                                    email,
-                                    f"{alert_type.replace('_', ' ').title()} - {action}",
-                                    f"Detected at {camera_config.location}. Confidence: {detection['confidence']:.2f}",
-                                    image_path
-                                )
-
-                            # Send SMS for critical alerts
-                            if DETECTION_CONFIG.sms_alerts_enabled:
-                                sms_success = self.sms_notifier.send_alert(
-                                    camera_name=camera_config.name,
-                                    alert_type=alert_type,
-                                    location=camera_config.location,
-                                    confidence=detection['confidence']
-                                )
-                                if sms_success:
-                                    print(f"📱 SMS alert sent!")
-
-                            # Update cooldown to prevent spam
-                            self.update_cooldown(camera_config.name)
-                            print(f" {camera_config.name}: {alert_type} - {action}")
-
-                # Draw enhanced visualization on frame
-                self.draw_enhanced_detections(frame, detections, camera_config.restricted_zones, camera_config.name)
-
-                # Display camera feed with status information
-                active_alerts = len([a for a in self.alerts if not a.get('acknowledged', False)])
-                status_text = f"Cam: {camera_config.name} | Alerts: {active_alerts} | Pose: Active"
-                cv2.putText(frame, status_text, (10, 30),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-
-                # Show frame count for performance monitoring
-                frame_count = getattr(self, 'frame_count', 0) + 1
-                self.frame_count = frame_count
-                cv2.putText(frame, f"Frames: {frame_count}", (10, 60),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-
-                cv2.imshow(f"DSTPS - {camera_config.name}", frame)
-
-            # Enhanced keyboard controls
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
-                break
-            elif key == ord('s'):
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                cv2.imwrite(f"data/screenshot_{timestamp}.jpg", frame)
-                print(f" Screenshot saved: data/screenshot_{timestamp}.jpg")
-            elif key == ord('d'):
-                print(" Web dashboard feature - run 'python dashboard/app.py' separately")
-            elif key == ord('r'):
-                self.alert_cooldowns = {}  # Reset all cooldowns
-                print(" Alert cooldowns reset")
-            elif key == ord('t'):
-                # Test SMS manually
-                self.sms_notifier.send_alert(
-                    camera_name="Test Camera",
-                    alert_type="zone_breach",
-                    location="Test Location",
-                    confidence=0.95
-                )
 
-        # Cleanup resources
-        for handler, _ in self.video_handlers:
-            handler.release()
-        cv2.destroyAllWindows()
-        print(" Camera resources released")
+                    # Queue SMS for critical alerts
+                    if DETECTION_CONFIG.sms_alerts_enabled:
+                        self.dispatcher.dispatch_sms(
+                            camera_name=camera_config.name,
+                            alert_type=alert_type,
+                            location=camera_config.location,
+                            confidence=detection['confidence']
+                        )
+
+                    # Update cooldown to prevent spam
+                    self.update_cooldown(camera_config.name)
+                    metrics.observe('stage_seconds', time.perf_counter() - alert_start, camera=name, stage='alert')
+                    print(f" {camera_config.name}: {alert_type} - {action}")
+
+        # Headless with nobody watching: no drawing, encoding or display at all
+        if not self.wants_annotated_frames():
+            self.frame_count = getattr(self, 'frame_count', 0) + 1
+            return
+
+        draw_start = time.perf_counter()
+
+        # Draw enhanced visualization on frame
+        self.draw_enhanced_detections(frame, detections, camera_config.restricted_zones, camera_config.name)
+
+        # Display camera feed with status information
+        active_alerts = len([a for a in self.alerts if not a.get('acknowledged', False)])
+        status_text = f"Cam: {camera_config.name} | Alerts: {active_alerts} | Pose: Active"
+        if self.scheduler:
+            rate = self.scheduler.get_rate(camera_config.name)
+            status_text += f" | Rate: {f'{rate:.1f} fps' if rate else 'full'}"
+        cv2.putText(frame, status_text, (10, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+
+        # Show frame count for performance monitoring
+        frame_count = getattr(self, 'frame_count', 0) + 1
+        self.frame_count = frame_count
+        cv2.putText(frame, f"Frames: {frame_count}", (10, 60),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+        t0 = time.perf_counter()
+        metrics.observe('stage_seconds', t0 - draw_start, camera=name, stage='draw')
+
+        # Dashboard viewers get the annotated frame through the frame bus
+        if self.frame_bus and self.frame_bus.publish(camera_config.name, frame):
+            t1 = time.perf_counter()
+            metrics.observe('stage_seconds', t1 - t0, camera=name, stage='publish')
+            t0 = t1
+
+        if not self.headless:
+            cv2.imshow(f"DSTPS - {camera_config.name}", frame)
+            metrics.observe('stage_seconds', time.perf_counter() - t0, camera=name, stage='display')
+
+    def wants_annotated_frames(self) -> bool:
+        """Annotation is only worth doing for a window or a frame bus viewer"""
+        return not self.headless or bool(self.frame_bus and self.frame_bus.subscribers)
+
+    def handle_command(self, command, frame):
+        """Run one keyboard or control socket command"""
+        if command == 'quit':
+            self.stop_requested = True
+        elif command == 'screenshot' and frame is not None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            cv2.imwrite(f"data/screenshot_{timestamp}.jpg", frame)
+            print(f" Screenshot saved: data/screenshot_{timestamp}.jpg")
+        elif command == 'dashboard':
+            print(" Web dashboard feature - run 'python dashboard/app.py' separately")
+        elif command == 'reset':
+            self.alert_cooldowns = {}  # Reset all cooldowns
+            print(" Alert cooldowns reset")
+        elif command == 'test_sms':
+            # Test SMS manually
+            self.dispatcher.dispatch_sms(
+                camera_name="Test Camera",
+                alert_type="zone_breach",
+                location="Test Location",
+                confidence=0.95
+            )
+
+    def install_signal_handlers(self):
+        """SIGINT/SIGTERM stop the loop cleanly; SIGUSR1 takes a screenshot where available"""
+        def request_stop(signum, _frame):
+            print(f"\n Received {signal.Signals(signum).name}, stopping...")
+            self.stop_requested = True
+
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGTERM, request_stop)
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, lambda *_: self.pending_commands.append('screenshot'))
+
+    def process_streams(self):
+        print("🚀 Starting Advanced DSTPS System...")
+        print("💡 Features: Multi-cam, Pose Analysis, SMS, Web Dashboard")
+        if self.headless:
+            print("🖥️  Headless mode: no windows, frames annotated only for dashboard viewers")
+        else:
+            print("🎮 Controls: Q=Quit, S=Screenshot, D=Dashboard, R=Reset Alerts")
+
+        self.install_signal_handlers()
+
+        frame = None
+        try:
+            while not self.stop_requested:
+                processed = 0
+                for frame, detections, camera_config in self.detect_frames():
+                    self.process_frame(frame, detections, camera_config)
+                    processed += 1
+
+                commands, self.pending_commands = self.pending_commands, []
+                if not self.headless:
+                    # Enhanced keyboard controls
+                    t0 = time.perf_counter()
+                    key = cv2.waitKey(1) & 0xFF
+                    self.metrics.observe('stage_seconds', time.perf_counter() - t0, camera='all', stage='gui_events')
+                    if key in KEY_COMMANDS:
+                        commands.append(KEY_COMMANDS[key])
+                elif not processed:
+                    # No GUI wait to pace the loop; don't spin while cameras are idle
+                    time.sleep(0.005)
+                if self.control:
+                    commands += self.control.poll()
+                if self.clip_recorder:
+                    # Post-roll otherwise only ends when the camera's next frame arrives
+                    self.clip_recorder.tick()
+
+                for command in commands:
+                    self.handle_command(command, frame)
+        finally:
+            # Cleanup resources, also when the loop dies (e.g. detection workers keep crashing)
+            for (handler, camera_config), gate in zip(self.video_handlers, self.motion_gates):
+                stats = handler.get_stats()
+                print(f" {camera_config.name}: {stats['frames_captured']} captured, "
+                      f"{stats['frames_dropped']} dropped, {stats['read_failures']} read failures")
+                if gate is not None:
+                    print(f"   Motion gate skipped {gate.frames_skipped}/{gate.frames_checked} frames")
+                handler.release()
+            if self.worker_pool:
+                self.worker_pool.shutdown()
+            elif self.detector:
+                self.detector.release()
+            self.evidence_writer.close()
+            if self.clip_recorder:
+                self.clip_recorder.close()
+                clips = self.clip_recorder.get_stats()
+                print(f" Clips: {clips['written']} written, {clips['dropped']} dropped, {clips['failed']} failed")
+            evidence = self.evidence_writer.get_stats()
+            print(f" Evidence: {evidence['written']} written, {evidence['dropped']} dropped, "
+                  f"{evidence['failed']} failed, max write {evidence['max_write_ms']} ms")
+            self.dispatcher.stop()
+            self.logger.close()
+            if self.frame_bus:
+                self.frame_bus.close()
+            if self.control:
+                self.control.close()
+            if self.metrics_server:
+                self.metrics_server.close()
+            if not self.headless:
+                cv2.destroyAllWindows()
+            print(" Camera resources released")
 
 
 def main():
@@ -1,7 +1,7 @@
 import cv2
 import mediapipe as mp
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, Optional, Tuple
 from enum import Enum
 
 
@@ -13,61 +13,75 @@ class SuspiciousAction(Enum):
     CRAWLING = "crawling"
 
 
+# MediaPipe pose connections drawn on evidence images
+SKELETON_CONNECTIONS = np.array([
+    (0, 1), (1, 2), (2, 3), (3, 7), (0, 4), (4, 5), (5, 6), (6, 8),
+    (9, 10), (11, 12), (11, 13), (13, 15), (12, 14), (14, 16),
+    (11, 23), (12, 24), (23, 24), (23, 25), (24, 26), (25, 27), (26, 28)
+])
+
+
+def landmarks_to_array(landmarks, width: int, height: int) -> np.ndarray:
+    """
+    Convert MediaPipe landmarks once into a (33, 4) float32 array
+
+    Columns are x, y (pixels), z and visibility. Everything downstream
+    (bbox, action rules, tracking, drawing, logging) uses this array.
+    """
+    array = np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks], dtype=np.float32)
+    array[:, :2] *= (width, height)
+    return array
+
+
 class PoseAnalyzer:
-    def __init__(self):
+    def __init__(self, pose=None):
         self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5
-        )
-        self.action_history = []
+        # Own Pose graph is only built if analyze_pose() is called standalone;
+        # AdvancedPersonDetector shares its landmarks via analyze_landmarks()
+        self.pose = pose
+
+    def _get_pose(self):
+        if self.pose is None:
+            self.pose = self.mp_pose.Pose(
+                min_detection_confidence=0.7,
+                min_tracking_confidence=0.5
+            )
+        return self.pose
 
     def analyze_pose(self, frame: np.ndarray) -> Dict:
         """Analyze human pose for suspicious actions"""
-        results = self.pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        results = self._get_pose().process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
 
         if not results.pose_landmarks:
             return {"action": SuspiciousAction.NORMAL, "confidence": 0.0}
 
-        landmarks = results.pose_landmarks.landmark
         h, w = frame.shape[:2]
+        return self.analyze_landmarks(landmarks_to_array(results.pose_landmarks.landmark, w, h), frame)
 
-        # Extract key points
-        points = {}
-        for idx, lm in enumerate(landmarks):
-            points[idx] = (int(lm.x * w), int(lm.y * h))
-
-        # Analyze poses
-        action, confidence = self._detect_suspicious_actions(points, h)
+    def analyze_landmarks(self, landmarks: np.ndarray, frame: np.ndarray) -> Dict:
+        """Analyze an already-computed (33, 4) landmark array without running inference"""
+        action, confidence = self._detect_suspicious_actions(landmarks, frame.shape[0])
 
         return {
             "action": action,
             "confidence": confidence,
-            "landmarks": points,
-            "skeleton_image": self._draw_skeleton(frame, points)
+            "landmarks": landmarks
         }
 
-    def _detect_suspicious_actions(self, points: Dict, image_height: int) -> Tuple[SuspiciousAction, float]:
+    def _detect_suspicious_actions(self, landmarks: np.ndarray, image_height: int) -> Tuple[SuspiciousAction, float]:
         """Detect specific suspicious actions"""
+        y = landmarks[:, 1]
 
-        # Get key points (MediaPipe indices)
-        nose = points[0]
-        left_shoulder = points[11]
-        right_shoulder = points[12]
-        left_hip = points[23]
-        right_hip = points[24]
-        left_ankle = points[27]
-        right_ankle = points[28]
-
-        # Calculate body angles and positions
-        shoulder_avg_y = (left_shoulder[1] + right_shoulder[1]) / 2
-        hip_avg_y = (left_hip[1] + right_hip[1]) / 2
-        ankle_avg_y = (left_ankle[1] + right_ankle[1]) / 2
+        # Key points (MediaPipe indices): nose, shoulders 11/12, hips 23/24, ankles 27/28
+        nose_y = y[0]
+        shoulder_avg_y = (y[11] + y[12]) / 2
+        hip_avg_y = (y[23] + y[24]) / 2
+        ankle_avg_y = (y[27] + y[28]) / 2
 
         body_height = ankle_avg_y - shoulder_avg_y
 
         # Climbing detection (arms above shoulders, crouched position)
-        if (nose[1] < shoulder_avg_y and
+        if (nose_y < shoulder_avg_y and
                 hip_avg_y > shoulder_avg_y + body_height * 0.3):
             return SuspiciousAction.CLIMBING, 0.8
 
@@ -82,26 +96,46 @@ class PoseAnalyzer:
 
         return SuspiciousAction.NORMAL, 0.0
 
-    def _draw_skeleton(self, frame: np.ndarray, points: Dict) -> np.ndarray:
+    @staticmethod
+    def _draw_skeleton(frame: np.ndarray, landmarks: np.ndarray) -> np.ndarray:
         """Draw pose skeleton on frame"""
         skeleton_frame = frame.copy()
+        points = landmarks[:, :2].astype(np.int32)
 
-        # Define connections (MediaPipe pose connections)
-        connections = [
-            (0, 1), (1, 2), (2, 3), (3, 7), (0, 4), (4, 5), (5, 6), (6, 8),
-            (9, 10), (11, 12), (11, 13), (13, 15), (12, 14), (14, 16),
-            (11, 23), (12, 24), (23, 24), (23, 25), (24, 26), (25, 27), (26, 28)
-        ]
-
-        # Draw connections
-        for connection in connections:
-            if connection[0] in points and connection[1] in points:
-                pt1 = points[connection[0]]
-                pt2 = points[connection[1]]
-                cv2.line(skeleton_frame, pt1, pt2, (0, 255, 0), 2)
+        # All connections in one polylines call, one (2, 2) segment each
+        cv2.polylines(skeleton_frame, list(points[SKELETON_CONNECTIONS]), False, (0, 255, 0), 2)
 
         # Draw points
-        for point in points.values():
-            cv2.circle(skeleton_frame, point, 5, (0, 0, 255), -1)
+        for x, y in points.tolist():
+            cv2.circle(skeleton_frame, (x, y), 5, (0, 0, 255), -1)
+
+        return skeleton_frame
+
+    def release(self):
+        if self.pose is not None:
+            self.pose.close()
+
+
+class SkeletonEvidence:
+    """
+    Deferred evidence image: a frame reference plus its landmarks
+
+    The frame copy and skeleton drawing only happen in render(), i.e. for
+    frames that actually become alert evidence. Render before the frame
+    is annotated in place for display.
+    """
+
+    __slots__ = ('frame', 'landmarks', '_image')
+
+    def __init__(self, frame: np.ndarray, landmarks: Optional[np.ndarray] = None):
+        self.frame = frame
+        self.landmarks = landmarks
+        self._image = None
 
-        return skeleton_frame
\ No newline at end of file
+    def render(self) -> np.ndarray:
+        if self._image is None:
+            if self.landmarks is None:
+                self._image = self.frame.copy()
+            else:
+                self._image = PoseAnalyzer._draw_skeleton(self.frame, self.landmarks)
+        return self._image
@@ -0,0 +1,233 @@
+import time
+import numpy as np
+from typing import Callable, List, Dict, Any, Optional
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of (N, 4) and (M, 4) x1y1x2y2 boxes as an (N, M) matrix"""
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return inter / np.maximum(union, 1e-6)
+
+
+def _greedy_match(score: np.ndarray, valid: np.ndarray, higher_is_better: bool = True):
+    """Greedy one-to-one assignment, best pairs first"""
+    rows, cols = np.nonzero(valid)
+    order = np.argsort(-score[rows, cols] if higher_is_better else score[rows, cols], kind='stable')
+    used_rows, used_cols, matches = set(), set(), []
+    for r, c in zip(rows[order], cols[order]):
+        if r in used_rows or c in used_cols:
+            continue
+        used_rows.add(r)
+        used_cols.add(c)
+        matches.append((int(r), int(c)))
+    return matches
+
+
+class BoxKalman:
+    """Constant-velocity Kalman filter over box center and size"""
+
+    def __init__(self, bbox: np.ndarray):
+        cx, cy, w, h = self._to_cxcywh(bbox)
+        self.x = np.array([cx, cy, w, h, 0, 0, 0, 0], dtype=np.float64)
+        self.P = np.diag([10, 10, 10, 10, 1000, 1000, 1000, 1000]).astype(np.float64)
+        self.F = np.eye(8)
+        self.F[:4, 4:] = np.eye(4)
+        self.H = np.eye(4, 8)
+        self.Q = np.diag([1, 1, 1, 1, 0.5, 0.5, 0.5, 0.5])
+        self.R = np.diag([10, 10, 20, 20]).astype(np.float64)
+
+    @staticmethod
+    def _to_cxcywh(bbox):
+        x1, y1, x2, y2 = bbox
+        return (x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1
+
+    def _to_bbox(self) -> np.ndarray:
+        cx, cy, w, h = self.x[:4]
+        return np.array([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], dtype=np.float32)
+
+    def predict(self) -> np.ndarray:
+        self.x = self.F @ self.x
+        self.P = self.F @ self.P @ self.F.T + self.Q
+        return self._to_bbox()
+
+    def update(self, bbox: np.ndarray) -> np.ndarray:
+        z = np.array(self._to_cxcywh(bbox))
+        y = z - self.H @ self.x
+        S = self.H @ self.P @ self.H.T + self.R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(8) - K @ self.H) @ self.P
+        return self._to_bbox()
+
+
+class LandmarkWindow:
+    """Fixed-size ring buffer of (33, 2) landmark sets with their timestamps"""
+
+    def __init__(self, size: int, num_landmarks: int = 33):
+        self.points = np.zeros((size, num_landmarks, 2), dtype=np.float32)
+        self.times = np.zeros(size, dtype=np.float64)
+        self.size = size
+        self.count = 0
+        self.next = 0
+
+    def append(self, points: np.ndarray, timestamp: float):
+        self.points[self.next] = points
+        self.times[self.next] = timestamp
+        self.next = (self.next + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def ordered(self):
+        """(points, times) oldest first, as one fancy-indexed copy"""
+        index = (self.next - self.count + np.arange(self.count)) % self.size
+        return self.points[index], self.times[index]
+
+
+class Track:
+    def __init__(self, track_id: int, bbox: np.ndarray, history: int, use_kalman: bool, timestamp: float):
+        self.track_id = track_id
+        self.bbox = bbox
+        self.kalman = BoxKalman(bbox) if use_kalman else None
+        self.hits = 1
+        self.misses = 0
+        self.last_seen = timestamp
+        # Compact per-track history: one landmark set per matched frame
+        self.landmarks = LandmarkWindow(history)
+        self.in_breach = False
+        self.action = None  # Suspicious action the track last reported, None while normal
+
+    def predict(self) -> np.ndarray:
+        if self.kalman is not None:
+            self.bbox = self.kalman.predict()
+        return self.bbox
+
+    def update(self, bbox: np.ndarray, timestamp: float):
+        self.bbox = self.kalman.update(bbox) if self.kalman is not None else bbox
+        self.hits += 1
+        self.misses = 0
+        self.last_seen = timestamp
+
+
+def event_alert_type(detection: Dict[str, Any]) -> Optional[str]:
+    """Alert a detection's track events call for: entering a zone, then a new suspicious action"""
+    events = detection.get('track_events', ())
+    if 'enter' in events:
+        return "zone_breach"
+    if 'action' in events:
+        return "suspicious_action"
+    return None
+
+
+class PersonTracker:
+    """
+    Per-camera multi-person tracker with persistent IDs
+
+    Detections are associated to tracks by IoU first and centroid distance
+    second, both from vectorized cost matrices. Each detection gets a
+    'track_id' and a list of 'track_events': 'new', 'enter' and 'leave'
+    (zone breach state changed) and, once record_actions() has run,
+    'action' (a new suspicious action). Alerting and evidence run once per
+    event instead of on every frame the person stays in view.
+
+    Tracks end after `max_misses` unmatched updates or, since motion gating
+    and frame strides skip updates entirely, after `max_age` seconds
+    without a match.
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_misses: int = 15, history: int = 30,
+                 use_kalman: bool = True, centroid_threshold: float = 0.75, max_age: Optional[float] = None):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.max_age = max_age
+        self.history = history
+        self.use_kalman = use_kalman
+        self.centroid_threshold = centroid_threshold
+        self.tracks: List[Track] = []
+        self.next_id = 1
+
+    def update(self, detections: List[Dict[str, Any]], timestamp: Optional[float] = None) -> List[Dict[str, Any]]:
+        if timestamp is None:
+            timestamp = time.time()
+        predicted = np.array([track.predict() for track in self.tracks], dtype=np.float32).reshape(-1, 4)
+        boxes = np.array([d['bbox'] for d in detections], dtype=np.float32).reshape(-1, 4)
+
+        matches = []
+        if len(predicted) and len(boxes):
+            iou = iou_matrix(predicted, boxes)
+            matches = _greedy_match(iou, iou >= self.iou_threshold)
+
+            # Fast movers can lose all overlap; fall back to centroid distance
+            matched_tracks = {t for t, _ in matches}
+            matched_dets = {d for _, d in matches}
+            centers_t = (predicted[:, :2] + predicted[:, 2:]) / 2
+            centers_d = (boxes[:, :2] + boxes[:, 2:]) / 2
+            diag = np.linalg.norm(predicted[:, 2:] - predicted[:, :2], axis=1)
+            dist = np.linalg.norm(centers_t[:, None, :] - centers_d[None, :, :], axis=2) / np.maximum(diag[:, None], 1.0)
+            valid = dist < self.centroid_threshold
+            valid[list(matched_tracks), :] = False
+            valid[:, list(matched_dets)] = False
+            matches += _greedy_match(dist, valid, higher_is_better=False)
+
+        matched_dets = set()
+        for track_index, det_index in matches:
+            track = self.tracks[track_index]
+            track.update(boxes[det_index], timestamp)
+            self._annotate(track, detections[det_index], timestamp)
+            matched_dets.add(det_index)
+
+        matched_tracks = {t for t, _ in matches}
+        for track_index, track in enumerate(self.tracks):
+            if track_index not in matched_tracks:
+                track.misses += 1
+
+        for det_index, detection in enumerate(detections):
+            if det_index in matched_dets:
+                continue
+            track = Track(self.next_id, boxes[det_index], self.history, self.use_kalman, timestamp)
+            self.next_id += 1
+            self.tracks.append(track)
+            self._annotate(track, detection, timestamp, is_new=True)
+
+        oldest = timestamp - self.max_age if self.max_age is not None else None
+        self.tracks = [t for t in self.tracks
+                       if t.misses <= self.max_misses and (oldest is None or t.last_seen >= oldest)]
+        return detections
+
+    def _annotate(self, track: Track, detection: Dict[str, Any], timestamp: float, is_new: bool = False):
+        events = ['new'] if is_new else []
+
+        landmarks = detection.get('pose_analysis', {}).get('landmarks')
+        if landmarks is not None:
+            track.landmarks.append(landmarks[:, :2], timestamp)
+
+        breach = detection.get('breach', False)
+        if breach != track.in_breach:
+            events.append('enter' if breach else 'leave')
+        track.in_breach = breach
+
+        detection['track_id'] = track.track_id
+        detection['track_events'] = events
+
+    def record_actions(self, detections: List[Dict[str, Any]], is_suspicious: Callable[[Dict[str, Any]], bool]):
+        """Add an 'action' event where a track's (final) action became a new suspicious one"""
+        for detection in detections:
+            track = self.get_track(detection.get('track_id'))
+            if track is None:
+                continue
+            action = detection.get('pose_analysis', {}).get('action') if is_suspicious(detection) else None
+            if action is not None and action != track.action:
+                detection['track_events'].append('action')
+            track.action = action
+
+    def get_track(self, track_id: int) -> Optional[Track]:
+        for track in self.tracks:
+            if track.track_id == track_id:
+                return track
+        return None
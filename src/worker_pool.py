@@ -0,0 +1,166 @@
+import multiprocessing as mp
+import os
+import queue
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple, Any, Optional
+
+
+def _worker_main(worker_id: int, detector_kwargs: Dict, task_queue, result_queue):
+    """Worker process: owns one AdvancedPersonDetector, reads frames from shared memory"""
+    from src.detector import AdvancedPersonDetector
+
+    detector = AdvancedPersonDetector(**detector_kwargs)
+    attached = {}
+
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+
+            camera_index, seq, shm_name, shape, dtype = task
+            shm = attached.get(camera_index)
+            if shm is None or shm.name != shm_name:
+                # Camera resolution changed and the parent allocated a new block
+                if shm is not None:
+                    shm.close()
+                shm = shared_memory.SharedMemory(name=shm_name)
+                attached[camera_index] = shm
+
+            frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            detections = detector.detect(frame)
+
+            # Evidence references the shared-memory frame; the parent rebuilds it
+            for detection in detections:
+                detection.pop('evidence', None)
+
+            result_queue.put((camera_index, seq, detections))
+            del frame
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for shm in attached.values():
+            shm.close()
+        detector.release()
+
+
+class DetectionWorkerPool:
+    """Shards cameras across processes, each running its own detector"""
+
+    def __init__(self, num_cameras: int, num_workers: int = 0, detector_kwargs: Optional[Dict] = None,
+                 max_restarts: int = 5):
+        self.num_cameras = num_cameras
+        self.num_workers = min(num_workers or os.cpu_count() or 1, num_cameras)
+        self.detector_kwargs = detector_kwargs or {}
+        self.ctx = mp.get_context('spawn')
+        self.result_queue = self.ctx.Queue()
+        self.task_queues = []
+        self.workers = []
+        self.max_restarts = max_restarts
+        self.restarts = 0
+
+        # One shared-memory slot per camera; a camera has at most one frame in flight,
+        # tagged with a per-camera sequence number its result must carry back
+        self.slots: Dict[int, shared_memory.SharedMemory] = {}
+        self.in_flight: Dict[int, Tuple[int, np.ndarray]] = {}
+        self.sequence: Dict[int, int] = {}
+        self.frames_skipped = 0
+        self.stale_results = 0
+
+    def start(self):
+        print(f"⚙️ Starting {self.num_workers} detection workers for {self.num_cameras} cameras...")
+        for worker_id in range(self.num_workers):
+            task_queue, worker = self._spawn(worker_id)
+            self.task_queues.append(task_queue)
+            self.workers.append(worker)
+
+    def _spawn(self, worker_id: int):
+        task_queue = self.ctx.Queue()
+        worker = self.ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self.detector_kwargs, task_queue, self.result_queue),
+            daemon=True
+        )
+        worker.start()
+        return task_queue, worker
+
+    def _check_workers(self):
+        """Respawn dead workers and release their cameras' in-flight frames"""
+        for worker_id, worker in enumerate(self.workers):
+            if worker.is_alive():
+                continue
+            # Its frames will never come back; without this the cameras stay blocked in submit()
+            lost = [i for i in self.in_flight if self.worker_for(i) == worker_id]
+            for camera_index in lost:
+                del self.in_flight[camera_index]
+
+            self.restarts += 1
+            if self.restarts > self.max_restarts:
+                raise RuntimeError(f"Detection worker {worker_id} died (exit code {worker.exitcode}); "
+                                   f"giving up after {self.max_restarts} restarts")
+            print(f"❌ Detection worker {worker_id} died (exit code {worker.exitcode}) - "
+                  f"restarting, {len(lost)} frames lost")
+            self.task_queues[worker_id], self.workers[worker_id] = self._spawn(worker_id)
+
+    def worker_for(self, camera_index: int) -> int:
+        return camera_index % self.num_workers
+
+    def submit(self, camera_index: int, frame: np.ndarray) -> bool:
+        """Hand a frame to the camera's worker; skipped if the previous one is still in flight"""
+        if camera_index in self.in_flight:
+            self.frames_skipped += 1
+            return False
+
+        shm = self.slots.get(camera_index)
+        if shm is None or shm.size < frame.nbytes:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+            shm = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+            self.slots[camera_index] = shm
+
+        shared_frame = np.ndarray(frame.shape, dtype=frame.dtype, buffer=shm.buf)
+        np.copyto(shared_frame, frame)
+        seq = self.sequence.get(camera_index, 0) + 1
+        self.sequence[camera_index] = seq
+        self.in_flight[camera_index] = (seq, frame)
+        self.task_queues[self.worker_for(camera_index)].put(
+            (camera_index, seq, shm.name, frame.shape, frame.dtype.str)
+        )
+        return True
+
+    def collect(self, timeout: float = 0.0) -> List[Tuple[int, np.ndarray, List[Dict[str, Any]]]]:
+        """Return (camera_index, frame, detections) for every finished frame"""
+        self._check_workers()
+        results = []
+        block = timeout > 0
+        while True:
+            try:
+                camera_index, seq, detections = self.result_queue.get(block=block, timeout=timeout if block else None)
+            except queue.Empty:
+                break
+            block = False
+            pending = self.in_flight.get(camera_index)
+            if pending is None or pending[0] != seq:
+                # A worker that queued its result and then died: the camera has
+                # moved on, and these detections belong to an older frame
+                self.stale_results += 1
+                continue
+            del self.in_flight[camera_index]
+            results.append((camera_index, pending[1], detections))
+        return results
+
+    def shutdown(self):
+        for task_queue in self.task_queues:
+            task_queue.put(None)
+        for worker in self.workers:
+            worker.join(timeout=5.0)
+            if worker.is_alive():
+                worker.terminate()
+        for shm in self.slots.values():
+            shm.close()
+            shm.unlink()
+        self.slots = {}
+        print(f" Detection workers stopped ({self.frames_skipped} frames skipped while busy, "
+              f"{self.stale_results} stale results dropped)")
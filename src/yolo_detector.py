@@ -0,0 +1,90 @@
+import os
+import cv2
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class YoloPersonDetector:
+    """Multi-person detector on cv2.dnn using the bundled YOLOv3 files"""
+
+    def __init__(self, cfg_path: str = os.path.join(ROOT_DIR, "yolov3.cfg"),
+                 weights_path: str = os.path.join(ROOT_DIR, "yolov3.weights"),
+                 names_path: str = os.path.join(ROOT_DIR, "coco.names"),
+                 input_size: int = 416, confidence_threshold: float = 0.5, nms_threshold: float = 0.4):
+        print(f"🚀 Loading YOLO person detector ({input_size}x{input_size})...")
+        # Smaller inputs (320) trade accuracy for speed; must be a multiple of 32
+        self.input_size = input_size - input_size % 32
+        self.confidence_threshold = confidence_threshold
+        self.nms_threshold = nms_threshold
+
+        with open(names_path, 'r', encoding='utf-8') as f:
+            class_names = [line.strip() for line in f if line.strip()]
+        self.person_class_id = class_names.index('person')
+
+        self.net = cv2.dnn.readNetFromDarknet(cfg_path, weights_path)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self.output_names = self.net.getUnconnectedOutLayersNames()
+
+        print("✅ YOLO person detector ready!")
+
+    def detect(self, frame: np.ndarray) -> List[Dict[str, Any]]:
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames: List[np.ndarray], frame_shapes: Optional[List[Tuple[int, int]]] = None,
+                     swap_rb: bool = True) -> List[List[Dict[str, Any]]]:
+        """One blob forward pass for frames from several cameras
+
+        frame_shapes gives the (h, w) boxes are scaled to when the frames
+        are downscaled copies; swap_rb=False for frames already in RGB.
+        """
+        if not frames:
+            return []
+
+        blob = cv2.dnn.blobFromImages(frames, 1 / 255.0, (self.input_size, self.input_size),
+                                      swapRB=swap_rb, crop=False)
+        self.net.setInput(blob)
+        outputs = self.net.forward(self.output_names)
+
+        # Each YOLO head gives (rows, 85) for one image or (batch, rows, 85) for several
+        outputs = np.concatenate(
+            [out.reshape(len(frames), -1, out.shape[-1]) for out in outputs], axis=1
+        )
+
+        if frame_shapes is None:
+            frame_shapes = [frame.shape[:2] for frame in frames]
+        return [self._parse(output, shape) for output, shape in zip(outputs, frame_shapes)]
+
+    def _parse(self, output: np.ndarray, frame_shape: Tuple[int, int]) -> List[Dict[str, Any]]:
+        h, w = frame_shape
+
+        # Class scores already include objectness; keep only confident person rows
+        scores = output[:, 5 + self.person_class_id]
+        keep = scores > self.confidence_threshold
+        if not np.any(keep):
+            return []
+
+        rows = output[keep]
+        scores = scores[keep]
+        boxes_wh = rows[:, 2:4] * (w, h)
+        boxes_xy = rows[:, 0:2] * (w, h) - boxes_wh / 2
+        boxes = np.hstack([boxes_xy, boxes_wh]).round().astype(np.int32)
+
+        indices = cv2.dnn.NMSBoxes(boxes.tolist(), scores.tolist(),
+                                   self.confidence_threshold, self.nms_threshold)
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+
+        detections = []
+        for i in indices:
+            x, y, bw, bh = boxes[i]
+            x_min, y_min = max(0, int(x)), max(0, int(y))
+            x_max, y_max = min(w, int(x + bw)), min(h, int(y + bh))
+            detections.append({
+                'bbox': (x_min, y_min, x_max, y_max),
+                'confidence': float(scores[i]),
+                'class_name': 'person',
+                'center': ((x_min + x_max) // 2, (y_min + y_max) // 2)
+            })
+        return detections
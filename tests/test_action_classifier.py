@@ -0,0 +1,105 @@
+import numpy as np
+
+from src.action_classifier import HIPS, SHOULDERS, WRISTS, TemporalActionClassifier
+from src.pose_analyzer import SuspiciousAction
+from src.tracker import PersonTracker
+
+FPS = 30.0
+TORSO = 100.0
+
+
+def pose(hip, angle=0.0, wrist_offset=(0.0, 60.0)):
+    """(33, 4) landmarks: torso of length TORSO at `angle` degrees from upright"""
+    hip = np.asarray(hip, dtype=np.float32)
+    theta = np.radians(angle)
+    shoulder = hip + TORSO * np.array([np.sin(theta), -np.cos(theta)], dtype=np.float32)
+    landmarks = np.ones((33, 4), dtype=np.float32)
+    landmarks[:, :2] = (hip + shoulder) / 2
+    landmarks[SHOULDERS, :2] = shoulder
+    landmarks[HIPS, :2] = hip
+    landmarks[WRISTS, :2] = shoulder + np.asarray(wrist_offset, dtype=np.float32)
+    return landmarks
+
+
+def detection(landmarks, bbox):
+    return {'bbox': bbox, 'confidence': 0.9,
+            'pose_analysis': {'action': SuspiciousAction.NORMAL, 'confidence': 0.0, 'landmarks': landmarks}}
+
+
+def run(frames, classifier=None):
+    """Feed per-frame lists of landmarks (one per person); returns the final actions"""
+    classifier = classifier or TemporalActionClassifier()
+    tracker = PersonTracker(history=classifier.history)
+    actions = []
+    for index, people in enumerate(frames):
+        detections = [detection(lm, (100 + 200 * i, 100, 250 + 200 * i, 500)) for i, lm in enumerate(people)]
+        timestamp = index / FPS
+        tracker.update(detections, timestamp)
+        classifier.update(tracker, detections, timestamp)
+        actions.append([d['pose_analysis']['action'] for d in detections])
+    return actions
+
+
+def test_window_covers_window_seconds_at_max_fps():
+    classifier = TemporalActionClassifier(window_seconds=3.0, max_fps=FPS)
+    tracker = PersonTracker(history=classifier.history)
+    for index in range(150):
+        tracker.update([detection(pose((300, 400)), (200, 250, 400, 450))], index / FPS)
+
+    _, times = tracker.tracks[0].landmarks.ordered()
+    assert times[-1] - times[0] >= 3.0
+
+
+def test_standing_still_is_normal():
+    actions = run([[pose((300, 400))] for _ in range(60)])
+    assert actions[-1] == [SuspiciousAction.NORMAL]
+
+
+def test_fast_fall_is_falling():
+    upright = [[pose((300, 300))] for _ in range(20)]
+    # Hips drop a full torso length while the torso tips over within 0.1 s
+    falling = [[pose((300, 300 + 33 * i), angle=30 * i)] for i in range(1, 4)]
+    lying = [[pose((300, 400), angle=90)] for _ in range(10)]
+
+    actions = run(upright + falling + lying)
+    assert actions[-1] == [SuspiciousAction.FALLING]
+
+
+def test_lying_down_slowly_is_normal():
+    upright = [[pose((300, 300))] for _ in range(20)]
+    # Same end pose reached over 2 s: hip velocity stays low
+    lowering = [[pose((300, 300 + 100 * i / 60), angle=90 * i / 60)] for i in range(1, 61)]
+
+    actions = run(upright + lowering)
+    assert actions[-1] == [SuspiciousAction.NORMAL]
+
+
+def test_rising_with_hands_up_is_climbing():
+    hands_up = (0.0, -40.0)
+    frames = [[pose((300, 400 - 80 * i / 30), wrist_offset=hands_up)] for i in range(31)]
+    frames += [[pose((300, 320), wrist_offset=hands_up)] for _ in range(5)]
+
+    actions = run(frames)
+    assert actions[-1] == [SuspiciousAction.CLIMBING]
+
+
+def test_fast_arms_next_to_someone_is_fighting():
+    frames = []
+    for index in range(40):
+        swing = 50.0 if index % 2 else -50.0
+        frames.append([pose((300, 400), wrist_offset=(swing, 20.0)), pose((420, 400))])
+
+    actions = run(frames)
+    assert actions[-1] == [SuspiciousAction.FIGHTING, SuspiciousAction.FIGHTING]
+
+
+def test_label_changes_only_after_min_votes():
+    classifier = TemporalActionClassifier(debounce_frames=5, min_votes=3)
+    for action in [SuspiciousAction.FALLING, SuspiciousAction.NORMAL, SuspiciousAction.FALLING,
+                   SuspiciousAction.NORMAL, SuspiciousAction.NORMAL]:
+        classifier._vote(1, action, 0.85 if action == SuspiciousAction.FALLING else 0.0)
+    assert 1 not in classifier.emitted
+
+    for _ in range(3):
+        classifier._vote(1, SuspiciousAction.FALLING, 0.85)
+    assert classifier.emitted[1] == (SuspiciousAction.FALLING, 0.85)
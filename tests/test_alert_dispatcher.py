@@ -0,0 +1,162 @@
+import socketserver
+from email import message_from_string, policy
+import threading
+import time
+
+import pytest
+
+from utils.alert_dispatcher import AlertDispatcher
+from utils.notifier import EmailNotifier
+from utils.sms_notifier import SMSNotifier
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib; replies can be overridden per command"""
+
+    def reply(self, text):
+        self.wfile.write(text.encode() + b"\r\n")
+
+    def handle(self):
+        self.reply("220 dstps-test ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip().split(' ')[0].split(':')[0].upper()
+            overrides = self.server.replies.get(command)
+            if overrides:
+                self.reply(overrides.pop(0))
+                continue
+
+            if command in ('EHLO', 'HELO'):
+                self.reply("250 dstps-test")
+            elif command in ('MAIL', 'RCPT', 'RSET', 'NOOP'):
+                self.reply("250 OK")
+            elif command == 'DATA':
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b""
+                while not data.endswith(b"\r\n.\r\n"):
+                    chunk = self.rfile.readline()
+                    if not chunk:
+                        return
+                    data += chunk
+                self.server.messages.append(data.decode(errors='replace'))
+                self.reply("250 Queued")
+            elif command == 'QUIT':
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Not implemented")
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _SMTPHandler)
+        self.messages = []
+        self.replies = {}
+
+
+class FakeTwilioError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+class FakeSMSClient:
+    """Stands in for twilio.rest.Client; fails with the queued errors first"""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.sent = []
+        self.messages = self
+
+    def create(self, body, from_, to):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append(body)
+        return object()
+
+
+@pytest.fixture
+def smtp_server():
+    server = LocalSMTPServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_dispatcher(smtp_server=None, sms_client=None, **kwargs):
+    port = smtp_server.server_address[1] if smtp_server else 1
+    email = EmailNotifier('127.0.0.1', port, 'dstps@example.com', password='', use_tls=False, timeout=5)
+    sms = SMSNotifier(client=sms_client or FakeSMSClient())
+    kwargs.setdefault('retry_backoff', 0.01)
+    dispatcher = AlertDispatcher(email, sms, **kwargs)
+    dispatcher.start()
+    return dispatcher
+
+
+def test_email_delivered_through_local_smtp(smtp_server):
+    dispatcher = make_dispatcher(smtp_server)
+    assert dispatcher.dispatch_email(["guard@example.com"], "Zone Breach - normal", "Detected at gate")
+    dispatcher.stop()
+
+    assert dispatcher.get_stats()['sent'] == 1
+    assert len(smtp_server.messages) == 1
+    message = message_from_string(smtp_server.messages[0], policy=policy.default)
+    assert message['Subject'].endswith("Zone Breach - normal")
+    assert message['To'] == "guard@example.com"
+
+
+def test_transient_smtp_error_is_retried(smtp_server):
+    smtp_server.replies['DATA'] = ["451 Try again later"]
+    dispatcher = make_dispatcher(smtp_server)
+    dispatcher.dispatch_email(["guard@example.com"], "Zone Breach", "Detected")
+    dispatcher.stop()
+
+    stats = dispatcher.get_stats()
+    assert (stats['sent'], stats['retries'], stats['failed']) == (1, 1, 0)
+    assert len(smtp_server.messages) == 1
+
+
+def test_permanent_smtp_error_is_not_retried(smtp_server):
+    smtp_server.replies['RCPT'] = ["550 No such user"]
+    dispatcher = make_dispatcher(smtp_server, retry_backoff=5.0)
+    started = time.time()
+    dispatcher.dispatch_email(["nobody@example.com"], "Zone Breach", "Detected")
+    dispatcher.stop()
+
+    stats = dispatcher.get_stats()
+    assert (stats['sent'], stats['retries'], stats['failed']) == (0, 0, 1)
+    assert time.time() - started < 2.0
+
+
+def test_disabled_email_is_not_queued():
+    email = EmailNotifier('127.0.0.1', 1, email=None, password=None)
+    dispatcher = AlertDispatcher(email, SMSNotifier(client=FakeSMSClient()))
+    dispatcher.start()
+
+    assert not dispatcher.dispatch_email(["guard@example.com"], "Zone Breach", "Detected")
+    dispatcher.stop()
+    stats = dispatcher.get_stats()
+    assert (stats['queued'], stats['disabled'], stats['failed']) == (0, 1, 0)
+
+
+def test_sms_retries_only_transient_errors():
+    client = FakeSMSClient(errors=[FakeTwilioError(503)])
+    dispatcher = make_dispatcher(sms_client=client)
+    dispatcher.dispatch_sms("Main Entrance", "zone_breach", "Front Door", 0.9)
+    dispatcher.stop()
+    assert len(client.sent) == 1
+    assert dispatcher.get_stats()['retries'] == 1
+
+    client = FakeSMSClient(errors=[FakeTwilioError(400)])
+    dispatcher = make_dispatcher(sms_client=client)
+    dispatcher.dispatch_sms("Main Entrance", "zone_breach", "Front Door", 0.9)
+    dispatcher.stop()
+    assert client.sent == []
+    stats = dispatcher.get_stats()
+    assert (stats['failed'], stats['retries']) == (1, 0)
@@ -0,0 +1,25 @@
+from utils.logger import AlertLogger
+
+
+def make_logger(tmp_path):
+    return AlertLogger(str(tmp_path / "alerts.jsonl"), str(tmp_path / "alerts.csv"),
+                       str(tmp_path / "alerts.json"))
+
+
+def test_alert_ids_unique_across_loggers_sharing_a_log(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # e.g. the live core and analyze.py, both starting from the same count
+    core, batch = make_logger(tmp_path), make_logger(tmp_path)
+    ids = [logger.log_alert("Cam", (0, 0, 1, 1), 0.9) for logger in (core, batch, core, batch)]
+
+    assert len(set(ids)) == 4
+    assert [a['alert_id'] for a in core.store.iter_alerts()] == ids
+
+
+def test_numbering_continues_after_restart(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    first = make_logger(tmp_path).log_alert("Cam", (0, 0, 1, 1), 0.9)
+    second = make_logger(tmp_path).log_alert("Cam", (0, 0, 1, 1), 0.9)
+
+    assert first.endswith("-000001")
+    assert second.endswith("-000002")
@@ -0,0 +1,90 @@
+import json
+import os
+
+from utils.alert_stats import AlertStats
+from utils.alert_store import AlertStore
+
+
+def make_stats(tmp_path, **kwargs):
+    store = AlertStore(str(tmp_path / "alerts.jsonl"), legacy_json=str(tmp_path / "alerts.json"),
+                       legacy_csv=str(tmp_path / "alerts.csv"))
+    store.setup()
+    return store, AlertStats(store, **kwargs)
+
+
+def alert(alert_type="zone_breach"):
+    return {'alert_type': alert_type, 'camera_name': "Cam", 'timestamp': "2026-01-01T00:00:00"}
+
+
+def snapshot_total(tmp_path):
+    path = tmp_path / "alerts.stats.json"
+    return json.loads(path.read_text(encoding='utf-8'))['total'] if path.exists() else None
+
+
+def test_snapshot_writes_are_throttled_and_flushed_on_close(tmp_path):
+    store, stats = make_stats(tmp_path, snapshot_interval=3600, snapshot_every=3)
+    for _ in range(2):
+        store.append(alert())
+        stats.refresh()
+    assert snapshot_total(tmp_path) is None
+
+    store.append(alert())
+    stats.refresh()
+    assert snapshot_total(tmp_path) == 3
+
+    store.append(alert())
+    stats.refresh()
+    assert snapshot_total(tmp_path) == 3
+    stats.close()
+    assert snapshot_total(tmp_path) == 4
+
+
+def test_restart_catches_up_from_a_stale_snapshot(tmp_path):
+    store, stats = make_stats(tmp_path, snapshot_every=2)
+    for _ in range(3):
+        store.append(alert())
+        stats.refresh()
+    # Killed before close(): the snapshot covers two records, the log three
+    assert snapshot_total(tmp_path) == 2
+
+    _, restarted = make_stats(tmp_path)
+    restarted.refresh()
+    assert restarted.get_stats()['total_alerts'] == 3
+
+
+def test_replaced_log_at_least_as_long_is_rebuilt(tmp_path):
+    store, stats = make_stats(tmp_path)
+    store.append(alert())
+    stats.refresh()
+
+    # A different file, longer than the old offset, moved into place
+    replacement = tmp_path / "replacement.jsonl"
+    replacement.write_text("".join(json.dumps(alert("suspicious_action")) + "\n" for _ in range(3)),
+                           encoding='utf-8')
+    os.replace(replacement, store.path)
+
+    stats.refresh()
+    counters = stats.get_stats()
+    assert counters['total_alerts'] == 3
+    assert counters['zone_breaches'] == 0
+
+
+def test_log_rewritten_in_place_to_the_same_length_is_rebuilt(tmp_path):
+    store, stats = make_stats(tmp_path)
+    store.append(dict(alert(), camera_name="Entrance camera"))
+    stats.refresh()
+
+    record = dict(alert("suspicious_action"), camera_name="")
+    # Pad the camera name so the new record has exactly the old length
+    record['camera_name'] = "x" * (store.size() - len(json.dumps(record)) - 1)
+    line = json.dumps(record) + "\n"
+    st = os.stat(store.path)
+    with open(store.path, 'w', encoding='utf-8') as f:
+        f.write(line)
+    # Make the rewrite visible even on filesystems with coarse timestamps
+    os.utime(store.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert store.size() == stats.offset
+
+    stats.refresh()
+    assert stats.get_stats()['suspicious_actions'] == 1
+    assert stats.get_stats()['zone_breaches'] == 0
@@ -0,0 +1,93 @@
+import csv
+import json
+
+from utils.alert_store import AlertStore
+
+
+def make_store(tmp_path, **kwargs):
+    return AlertStore(str(tmp_path / "alerts.jsonl"), legacy_json=str(tmp_path / "alerts.json"),
+                      legacy_csv=str(tmp_path / "alerts.csv"), **kwargs)
+
+
+def write_lines(path, *lines):
+    path.write_bytes("".join(lines).encode('utf-8'))
+
+
+def test_migrates_legacy_json_once(tmp_path):
+    legacy = [{'alert_id': 'ALT000001', 'confidence': 0.9}, {'alert_id': 'ALT000002', 'confidence': 0.7}]
+    (tmp_path / "alerts.json").write_text(json.dumps({'alerts': legacy}), encoding='utf-8')
+
+    store = make_store(tmp_path)
+    store.setup()
+
+    assert list(store.iter_alerts()) == legacy
+    assert not (tmp_path / "alerts.json").exists()
+    assert (tmp_path / "alerts.json.migrated").exists()
+    assert not (tmp_path / "alerts.jsonl.tmp").exists()
+
+    # A second start finds the log and leaves it alone
+    store.append({'alert_id': 'ALT000003'})
+    make_store(tmp_path).setup()
+    assert [a['alert_id'] for a in store.iter_alerts()] == ['ALT000001', 'ALT000002', 'ALT000003']
+
+
+def test_migrates_from_csv_when_json_is_missing(tmp_path):
+    with open(tmp_path / "alerts.csv", 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['alert_id', 'confidence', 'sms_sent', 'email_sent'])
+        writer.writerow(['ALT000001', '0.85', 'True', 'False'])
+
+    store = make_store(tmp_path)
+    store.setup()
+
+    assert list(store.iter_alerts()) == [
+        {'alert_id': 'ALT000001', 'confidence': 0.85, 'sms_sent': True, 'email_sent': False}
+    ]
+
+
+def test_writer_repairs_torn_last_line(tmp_path):
+    path = tmp_path / "alerts.jsonl"
+    write_lines(path, '{"alert_id": "ALT000001"}\n', '{"alert_id": "ALT0')
+
+    store = make_store(tmp_path)
+    store.setup()
+    store.append({'alert_id': 'ALT000002'})
+
+    assert path.read_bytes().endswith(b'"ALT0\n{"alert_id": "ALT000002"}\n')
+    assert [a['alert_id'] for a in store.iter_alerts()] == ['ALT000001', 'ALT000002']
+    assert [a['alert_id'] for a in store.tail(5)] == ['ALT000001', 'ALT000002']
+
+
+def test_reader_never_modifies_the_log(tmp_path):
+    path = tmp_path / "alerts.jsonl"
+    write_lines(path, '{"alert_id": "ALT000001"}\n', '{"alert_id": "ALT0')
+    (tmp_path / "alerts.json").write_text(json.dumps({'alerts': []}), encoding='utf-8')
+    before = path.read_bytes()
+
+    reader = make_store(tmp_path, readonly=True)
+    reader.setup()
+
+    assert path.read_bytes() == before
+    assert (tmp_path / "alerts.json").exists()
+
+
+def test_reader_skips_record_still_being_appended(tmp_path):
+    path = tmp_path / "alerts.jsonl"
+    # A partial line that happens to parse must not be read before its newline lands
+    write_lines(path, '{"alert_id": "ALT000001"}\n', '{"alert_id": "ALT000002"}')
+
+    reader = make_store(tmp_path, readonly=True)
+    assert [a['alert_id'] for a in reader.iter_alerts()] == ['ALT000001']
+    assert [a['alert_id'] for a in reader.tail(5)] == ['ALT000001']
+
+    records, offset = reader.read_from(0)
+    assert [a['alert_id'] for a in records] == ['ALT000001']
+    assert offset == len('{"alert_id": "ALT000001"}\n')
+
+
+def test_missing_log_reads_empty(tmp_path):
+    reader = make_store(tmp_path, readonly=True)
+    reader.setup()
+    assert list(reader.iter_alerts()) == []
+    assert reader.tail(3) == []
+    assert not (tmp_path / "alerts.jsonl").exists()
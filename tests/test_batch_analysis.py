@@ -0,0 +1,19 @@
+from src.batch_analysis import merge_alerts, plan_chunks
+
+
+def alert(offset, alert_type="zone_breach"):
+    return {'offset': offset, 'alert_type': alert_type, 'action': 'normal'}
+
+
+def test_track_event_alerts_are_all_kept_in_footage_order():
+    merged = merge_alerts([alert(30.0), alert(1.0), alert(2.0, "suspicious_action")])
+    assert [a['offset'] for a in merged] == [1.0, 2.0, 30.0]
+
+
+def test_cooldown_is_per_camera_like_the_live_core():
+    alerts = [alert(0.0), alert(5.0, "suspicious_action"), alert(31.0), alert(40.0)]
+    assert [a['offset'] for a in merge_alerts(alerts, cooldown=30.0)] == [0.0, 31.0]
+
+
+def test_chunks_snap_to_keyframes():
+    assert plan_chunks(10.0, 2, [0.0, 4.0, 8.0]) == [(0.0, 4.0), (4.0, 10.0)]
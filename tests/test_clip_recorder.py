@@ -0,0 +1,74 @@
+import json
+import os
+
+import numpy as np
+
+from utils.clip_recorder import ClipRecorder
+
+
+def frame(value):
+    return np.full((120, 160, 3), value, dtype=np.uint8)
+
+
+def make_recorder(tmp_path, **kwargs):
+    return ClipRecorder(str(tmp_path / "clips"), pre_seconds=2.0, post_seconds=1.0, fps=5.0, **kwargs)
+
+
+def alert(recorder, alert_id, timestamp):
+    """What DSTPSCore does per alert: trigger, log the path, attach the alert ID"""
+    path = recorder.trigger("cam", "zone_breach", timestamp=timestamp)
+    recorder.add_alert("cam", alert_id)
+    return path
+
+
+def index(recorder):
+    with open(recorder.index_file, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_written_clip_recorded_against_its_alerts(tmp_path):
+    recorder = make_recorder(tmp_path)
+    for i in range(5):
+        recorder.add_frame("cam", frame(i * 40), timestamp=i * 0.2)
+    path = alert(recorder, "ALT1", 1.0)
+    # A second alert during the post-roll shares the clip
+    assert alert(recorder, "ALT2", 1.2) == path
+    for i in range(6, 12):
+        recorder.add_frame("cam", frame(i * 20), timestamp=i * 0.2)
+    recorder.close()
+
+    [entry] = index(recorder)
+    assert entry['status'] == 'written'
+    assert entry['alert_ids'] == ['ALT1', 'ALT2']
+    assert entry['path'] == path and os.path.exists(path)
+
+
+def test_dropped_clip_recorded_against_its_alerts(tmp_path):
+    recorder = make_recorder(tmp_path, max_pending=0)
+    recorder.add_frame("cam", frame(0), timestamp=0.0)
+    path = alert(recorder, "ALT1", 0.0)
+    recorder.close()
+
+    [entry] = index(recorder)
+    assert entry['status'] == 'dropped' and entry['path'] == path
+    assert entry['alert_ids'] == ['ALT1']
+    assert not os.path.exists(path)
+    assert recorder.get_stats()['dropped'] == 1
+
+
+def test_stale_recording_finishes_without_new_frames(tmp_path):
+    recorder = make_recorder(tmp_path)
+    recorder.add_frame("cam", frame(0), timestamp=0.0)
+    alert(recorder, "ALT1", 0.0)
+
+    # The camera stopped: tick() ends the clip once the post-roll has passed
+    recorder.tick(timestamp=0.5)
+    assert recorder.get_stats()['recording'] == 1
+    recorder.tick(timestamp=1.5)
+    assert recorder.get_stats()['recording'] == 0
+
+    # A late alert starts a new clip instead of joining the finished one
+    alert(recorder, "ALT2", 0.0)
+    alert(recorder, "ALT3", 5.0)
+    recorder.close()
+    assert [entry['alert_ids'] for entry in index(recorder)] == [['ALT1'], ['ALT2'], ['ALT3']]
@@ -0,0 +1,78 @@
+import os
+import stat
+import time
+
+import numpy as np
+
+from utils.frame_bus import FrameBusPublisher, FrameBusSubscriber
+
+FRAME = np.zeros((48, 64, 3), dtype=np.uint8)
+
+
+def publish_until(publisher, subscriber, camera="cam", last_seq=0, timeout=5.0):
+    """Publish until the subscriber has a frame newer than last_seq (the viewer connects asynchronously)"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        publisher.publish(camera, FRAME)
+        latest = subscriber.wait_for_frame(camera, last_seq, timeout=0.1)
+        if latest is not None:
+            return latest
+    return None
+
+
+def test_unix_socket_is_owner_only_and_delivers_frames(tmp_path):
+    path = str(tmp_path / "bus.sock")
+    publisher = FrameBusPublisher(max_fps=0, path=path)
+    assert publisher.start()
+    try:
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        subscriber = FrameBusSubscriber(path=path)
+        subscriber.add_viewer()
+        assert publish_until(publisher, subscriber) is not None
+        subscriber.remove_viewer()
+    finally:
+        publisher.close()
+    assert not os.path.exists(path)
+
+
+def test_new_viewer_never_gets_a_frame_from_an_earlier_session(tmp_path):
+    path = str(tmp_path / "bus.sock")
+    publisher = FrameBusPublisher(max_fps=0, path=path)
+    publisher.start()
+    try:
+        subscriber = FrameBusSubscriber(path=path)
+        subscriber.add_viewer()
+        first_seq, _ = publish_until(publisher, subscriber)
+        subscriber.remove_viewer()
+
+        # Reader notices within its 1 s receive timeout and drops what it had
+        deadline = time.time() + 5.0
+        while subscriber._reader is not None and time.time() < deadline:
+            time.sleep(0.05)
+        assert subscriber.wait_for_frame("cam", 0, timeout=0) is None
+
+        subscriber.add_viewer()
+        seq, _ = publish_until(publisher, subscriber)
+        assert seq > first_seq
+        subscriber.remove_viewer()
+    finally:
+        publisher.close()
+
+
+def test_tcp_fallback_requires_the_token():
+    assert not FrameBusPublisher(port=5591).start()
+
+    publisher = FrameBusPublisher(port=5591, max_fps=0, token="secret")
+    assert publisher.start()
+    try:
+        intruder = FrameBusSubscriber(port=5591, token="wrong")
+        intruder.add_viewer()
+        assert publish_until(publisher, intruder, timeout=1.0) is None
+        intruder.remove_viewer()
+
+        viewer = FrameBusSubscriber(port=5591, token="secret")
+        viewer.add_viewer()
+        assert publish_until(publisher, viewer) is not None
+        viewer.remove_viewer()
+    finally:
+        publisher.close()
@@ -0,0 +1,58 @@
+from src.tracker import PersonTracker
+
+
+def person(x):
+    return {'bbox': (x, 100, x + 100, 400)}
+
+
+def test_ids_persist_across_frames():
+    tracker = PersonTracker()
+    first = tracker.update([person(100)], 0.0)[0]['track_id']
+    assert tracker.update([person(110)], 0.1)[0]['track_id'] == first
+
+
+def test_empty_updates_age_tracks_out():
+    tracker = PersonTracker(max_misses=2)
+    tracker.update([person(100)], 0.0)
+    for step in range(1, 3):
+        tracker.update([], step * 0.1)
+    assert len(tracker.tracks) == 1
+    tracker.update([], 0.3)
+    assert tracker.tracks == []
+
+
+def test_tracks_expire_by_time_between_sparse_updates():
+    # Motion gating or a frame stride can leave long gaps with no update at all
+    tracker = PersonTracker(max_misses=15, max_age=5.0)
+    old = tracker.update([person(100)], 0.0)[0]['track_id']
+    tracker.update([], 4.0)
+    assert tracker.get_track(old) is not None
+
+    tracker.update([], 6.0)
+    assert tracker.get_track(old) is None
+    assert tracker.update([person(100)], 6.1)[0]['track_id'] != old
+
+
+def suspicious(detection):
+    return detection['pose_analysis']['action'] != 'normal'
+
+
+def test_zone_events_fire_on_state_changes_only():
+    tracker = PersonTracker()
+    events = []
+    for breach in (False, True, True, False, True):
+        detection = dict(person(100), breach=breach)
+        tracker.update([detection], len(events) * 0.1)
+        events.append(detection['track_events'])
+    assert events == [['new'], ['enter'], [], ['leave'], ['enter']]
+
+
+def test_action_event_once_per_new_suspicious_action():
+    tracker = PersonTracker()
+    events = []
+    for action in ('normal', 'climbing', 'climbing', 'fighting', 'normal', 'fighting'):
+        detection = dict(person(100), pose_analysis={'action': action})
+        tracker.update([detection], len(events) * 0.1)
+        tracker.record_actions([detection], suspicious)
+        events.append('action' in detection['track_events'])
+    assert events == [False, True, False, True, False, True]
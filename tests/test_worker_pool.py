@@ -0,0 +1,29 @@
+import queue
+
+import numpy as np
+
+from src.worker_pool import DetectionWorkerPool
+
+
+def test_result_from_a_dead_workers_old_frame_is_dropped():
+    pool = DetectionWorkerPool(num_cameras=1, num_workers=1)
+    pool.task_queues = [queue.Queue()]  # Tasks only; no worker processes needed
+    try:
+        old, new = np.zeros((4, 4, 3), np.uint8), np.ones((4, 4, 3), np.uint8)
+        assert pool.submit(0, old)
+        old_seq = pool.task_queues[0].get()[1]
+
+        # The worker queued its result and died; _check_workers released the camera
+        del pool.in_flight[0]
+        assert pool.submit(0, new)
+        new_seq = pool.task_queues[0].get()[1]
+
+        pool.result_queue.put((0, old_seq, ['old detections']))
+        assert pool.collect(timeout=2.0) == []
+        assert pool.stale_results == 1
+
+        pool.result_queue.put((0, new_seq, ['new detections']))
+        [(camera_index, frame, detections)] = pool.collect(timeout=2.0)
+        assert camera_index == 0 and frame is new and detections == ['new detections']
+    finally:
+        pool.shutdown()
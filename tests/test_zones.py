@@ -0,0 +1,93 @@
+import cv2
+import numpy as np
+import pytest
+
+from utils.video_utils import ZoneOverlay
+from utils.zones import ZoneMap, zone_polygon, zones_key
+
+SHAPE = (100, 200, 3)
+
+
+def person(x1, y1, x2, y2):
+    return {'bbox': (x1, y1, x2, y2), 'center': ((x1 + x2) // 2, (y1 + y2) // 2)}
+
+
+def test_zone_polygon_accepts_rectangles_and_point_lists():
+    rect = zone_polygon((10, 20, 30, 40))
+    assert rect.tolist() == [[10, 20], [30, 20], [30, 40], [10, 40]]
+    assert rect.dtype == np.int32
+
+    poly = zone_polygon([(0, 0), (5, 0), (5, 5)])
+    assert poly.shape == (3, 2)
+    assert zones_key([(10, 20, 30, 40)]) == zones_key([[(10, 20), (30, 20), (30, 40), (10, 40)]])
+
+
+def test_center_is_the_default_mode():
+    assert ZoneMap().mode == "center"
+    with pytest.raises(ValueError):
+        ZoneMap("head")
+
+
+def test_center_and_foot_modes_differ():
+    # Zone covers the bottom half; the box's center is above it, its feet inside
+    zones = [(0, 50, 200, 99)]
+    standing = [person(10, 10, 30, 80)]
+    assert not ZoneMap("center").breaches(standing, zones, SHAPE)[0]
+    assert ZoneMap("foot").breaches(standing, zones, SHAPE)[0]
+
+
+def test_polygon_zone_mask():
+    triangle = [[(0, 0), (100, 0), (0, 99)]]
+    zone_map = ZoneMap("center")
+    inside, outside = person(10, 10, 20, 20), person(80, 60, 100, 80)
+    assert zone_map.breaches([inside, outside], triangle, SHAPE).tolist() == [True, False]
+
+
+def test_overlap_mode_uses_the_fraction_of_the_box():
+    zones = [(0, 0, 100, 99)]
+    half_in = [person(50, 10, 150, 30)]
+    assert ZoneMap("overlap", 0.4).breaches(half_in, zones, SHAPE)[0]
+    assert not ZoneMap("overlap", 0.6).breaches(half_in, zones, SHAPE)[0]
+
+
+def test_points_outside_the_frame_never_breach():
+    zones = [(0, 0, 199, 99)]
+    assert not ZoneMap("center").breaches([person(250, 150, 270, 170)], zones, SHAPE)[0]
+
+
+def test_mask_rebuilds_when_zones_change():
+    zone_map = ZoneMap("center")
+    target = [person(10, 10, 20, 20)]
+    assert zone_map.breaches(target, [(0, 0, 50, 50)], SHAPE)[0]
+    assert not zone_map.breaches(target, [(100, 0, 199, 99)], SHAPE)[0]
+    assert zone_map.breaches(target, [], SHAPE).tolist() == [False]
+
+
+def draw_one_by_one(frame, zones, color=(0, 0, 255), alpha=0.3):
+    for zone in zones:
+        polygon = zone_polygon(zone)
+        overlay = frame.copy()
+        cv2.fillPoly(overlay, [polygon], color)
+        cv2.addWeighted(overlay, alpha, frame, 1.0 - alpha, 0, frame)
+        cv2.polylines(frame, [polygon], True, color, 2)
+        x, y = polygon[np.argmin(polygon[:, 1])]
+        cv2.putText(frame, "RESTRICTED", (int(x), int(y) - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+    return frame
+
+
+def test_overlay_matches_drawing_each_zone():
+    frame = np.random.default_rng(0).integers(0, 256, SHAPE, dtype=np.uint8)
+    zones = [(20, 30, 80, 90), [(120, 20), (190, 40), (150, 90)]]
+    expected = draw_one_by_one(frame.copy(), zones)
+    assert np.array_equal(ZoneOverlay().draw(frame.copy(), zones), expected)
+
+
+def test_overlapping_zones_within_one_level():
+    frame = np.random.default_rng(1).integers(0, 256, SHAPE, dtype=np.uint8)
+    zones = [(20, 30, 120, 90), (60, 40, 180, 95)]
+    expected = draw_one_by_one(frame.copy(), zones)
+    overlay = ZoneOverlay()
+    drawn = overlay.draw(frame.copy(), zones)
+    assert np.abs(drawn.astype(int) - expected).max() <= 1
+    # Removing the zones clears the layer
+    assert np.array_equal(overlay.draw(frame.copy(), []), frame)
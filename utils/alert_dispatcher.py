@@ -0,0 +1,158 @@
+import queue
+import smtplib
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Any, List, Optional
+
+
+def is_permanent_error(error: Exception) -> bool:
+    """Errors a retry cannot fix: rejected credentials, recipients or requests"""
+    if isinstance(error, (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        # 5xx (e.g. 535 bad credentials) is permanent, 4xx is a temporary refusal
+        return 500 <= error.smtp_code < 600
+    # Twilio REST errors carry the HTTP status; 429 is rate limiting
+    status = getattr(error, 'status', None)
+    return isinstance(status, int) and 400 <= status < 500 and status != 429
+
+
+class AlertDispatcher:
+    """
+    Background email/SMS delivery so alerting never blocks frame processing
+
+    Only transient failures (timeouts, dropped connections, 4xx SMTP
+    replies) are retried with backoff. Permanent ones fail at once, and
+    email is not queued at all while the notifier has no credentials, so
+    one misconfigured channel cannot hold up the alerts queued behind it.
+    """
+
+    def __init__(self, email_notifier, sms_notifier, max_queue: int = 100,
+                 max_retries: int = 3, retry_backoff: float = 2.0, smtp_idle_timeout: float = 60.0,
+                 metrics=None):
+        self.email_notifier = email_notifier
+        self.sms_notifier = sms_notifier
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.smtp_idle_timeout = smtp_idle_timeout
+        self.metrics = metrics
+        # Updated from the caller (queueing) and the worker thread (delivery)
+        self.stats = {'queued': 0, 'sent': 0, 'failed': 0, 'dropped': 0, 'retries': 0, 'disabled': 0}
+        self.lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._worker = None
+
+    def start(self):
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def dispatch_email(self, recipients: List[str], subject: str, message: str, image_path: str = None,
+                       image_ready: Optional[Future] = None) -> bool:
+        """Queue one message for all recipients (one SMTP session)"""
+        if not recipients:
+            return False
+        if not getattr(self.email_notifier, 'enabled', True):
+            self._count('disabled')
+            return False
+
+        def send():
+            # Evidence is written in the background; attach it once it is on disk
+            if image_ready is not None:
+                try:
+                    image_ready.result(timeout=30)
+                except Exception as e:
+                    print(f"⚠️ Evidence not ready, sending without it: {e}")
+            return self.email_notifier.send_batch(recipients, subject, message, image_path, raise_errors=True)
+
+        return self._enqueue('email', send)
+
+    def dispatch_sms(self, camera_name: str, alert_type: str, location: str, confidence: float) -> bool:
+        return self._enqueue('sms', lambda: self.sms_notifier.send_alert(
+            camera_name=camera_name,
+            alert_type=alert_type,
+            location=location,
+            confidence=confidence,
+            simulate_on_failure=False,
+            raise_errors=True
+        ))
+
+    def _count(self, stat: str):
+        with self.lock:
+            self.stats[stat] += 1
+
+    def _enqueue(self, channel: str, send: Callable[[], bool]) -> bool:
+        try:
+            self.queue.put_nowait((channel, send, time.time()))
+            self._count('queued')
+            return True
+        except queue.Full:
+            # Never block the video loop; shed the alert and count it
+            self._count('dropped')
+            print(f"⚠️ Alert queue full - {channel} alert dropped")
+            return False
+
+    def _run(self):
+        while True:
+            try:
+                job = self.queue.get(timeout=self.smtp_idle_timeout)
+            except queue.Empty:
+                # Don't hold an idle SMTP session open indefinitely
+                self.email_notifier.close()
+                continue
+
+            if job is None:
+                break
+            self._deliver(*job)
+
+        self.email_notifier.close()
+
+    def _deliver(self, channel: str, send: Callable[[], bool], queued_at: float):
+        for attempt in range(self.max_retries + 1):
+            try:
+                ok = send()
+            except Exception as e:
+                print(f"❌ {channel} dispatch error: {e}")
+                if is_permanent_error(e):
+                    self._count('failed')
+                    print(f"❌ {channel} alert failed permanently - not retrying")
+                    return
+                ok = False
+
+            if ok:
+                self._count('sent')
+                if self.metrics is not None:
+                    # Queue wait, evidence wait, retries and delivery
+                    self.metrics.observe('alert_dispatch_seconds', time.time() - queued_at, channel=channel)
+                print(f"📨 {channel} alert delivered ({time.time() - queued_at:.1f}s after queueing)")
+                return
+
+            if attempt < self.max_retries:
+                self._count('retries')
+                # Exponential backoff, cut short on shutdown
+                if self._stop_event.wait(self.retry_backoff * (2 ** attempt)):
+                    break
+
+        self._count('failed')
+        print(f"❌ {channel} alert failed after {attempt + 1} attempts")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+        stats['queue_depth'] = self.queue.qsize()
+        return stats
+
+    def stop(self, timeout: float = 10.0):
+        """Drain pending alerts (up to timeout) and stop the worker"""
+        if self._worker is None:
+            return
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            self._stop_event.set()
+        self._worker.join(timeout=timeout)
+        if self._worker.is_alive():
+            # Abort any pending backoff so the daemon thread can exit
+            self._stop_event.set()
+        self._worker = None
@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from utils.alert_store import AlertStore
+
+
+class AlertStats:
+    """
+    Running alert counters kept in step with the alert log
+
+    Counters are updated from newly appended records only, so reads are O(1)
+    no matter how long the history is. A snapshot with the covered log offset
+    is saved next to the log so restarts only catch up on the tail; it is
+    written at most every snapshot_interval seconds or snapshot_every new
+    records, and once more on close(). The log's inode (and its mtime when
+    nothing was appended) tells a replaced log apart from a grown one.
+    """
+
+    def __init__(self, store: AlertStore, snapshot_path: str = None, persist: bool = True,
+                 snapshot_interval: float = 30.0, snapshot_every: int = 50):
+        self.store = store
+        self.snapshot_path = snapshot_path or os.path.splitext(store.path)[0] + ".stats.json"
+        self.persist = persist
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_every = snapshot_every
+        self.unsaved = 0
+        self.last_saved = time.monotonic()
+        self.lock = threading.Lock()
+        self._reset()
+        self._load_snapshot()
+
+    def _reset(self):
+        self.offset = 0
+        # (device, inode) of the log the offset refers to, and its mtime once fully read
+        self.file_id = None
+        self.mtime_ns = None
+        self.total = 0
+        self.sms_sent = 0
+        self.emails_sent = 0
+        self.by_type: Dict[str, int] = {}
+        self.by_camera: Dict[str, int] = {}
+        self.by_day: Dict[str, int] = {}
+        self.last_alert = None
+
+    def _load_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.offset = data['offset']
+            self.total = data['total']
+            self.sms_sent = data['sms_sent']
+            self.emails_sent = data['emails_sent']
+            self.by_type = data['by_type']
+            self.by_camera = data['by_camera']
+            self.by_day = data['by_day']
+            self.last_alert = data['last_alert']
+            # Snapshots from before file tracking carry no identity
+            self.file_id = tuple(data['file_id']) if data.get('file_id') else None
+            self.mtime_ns = data.get('mtime_ns')
+        except Exception as e:
+            print(f"❌ Stats snapshot unreadable ({e}), rebuilding from log")
+            self._reset()
+
+    def _save_snapshot(self):
+        data = {
+            'offset': self.offset,
+            'total': self.total,
+            'sms_sent': self.sms_sent,
+            'emails_sent': self.emails_sent,
+            'by_type': self.by_type,
+            'by_camera': self.by_camera,
+            'by_day': self.by_day,
+            'last_alert': self.last_alert,
+            'file_id': self.file_id,
+            'mtime_ns': self.mtime_ns
+        }
+        tmp_path = self.snapshot_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception as e:
+            print(f"❌ Stats snapshot error: {e}")
+        self.unsaved = 0
+        self.last_saved = time.monotonic()
+
+    def _maybe_save_snapshot(self):
+        if not self.persist or not self.unsaved:
+            return
+        if (self.unsaved >= self.snapshot_every
+                or time.monotonic() - self.last_saved >= self.snapshot_interval):
+            self._save_snapshot()
+
+    def _replaced(self, st: os.stat_result) -> bool:
+        if self.file_id is not None and (st.st_dev, st.st_ino) != self.file_id:
+            return True
+        if st.st_size < self.offset:
+            return True
+        # Same length but rewritten since it was fully read
+        return st.st_size == self.offset and self.mtime_ns is not None and st.st_mtime_ns != self.mtime_ns
+
+    def _read_locked(self, st: os.stat_result) -> List[Dict[str, Any]]:
+        records, self.offset = self.store.read_from(self.offset)
+        self.file_id = (st.st_dev, st.st_ino)
+        # An append landing between stat() and the read would make this mtime stale
+        self.mtime_ns = st.st_mtime_ns if self.offset == st.st_size else None
+        for alert in records:
+            self._apply(alert)
+        self.unsaved += len(records)
+        return records
+
+    def _apply(self, alert: Dict[str, Any]):
+        alert_type = alert.get('alert_type', 'unknown')
+        camera = alert.get('camera_name', 'unknown')
+        day = alert.get('timestamp', '')[:10]
+
+        self.total += 1
+        self.by_type[alert_type] = self.by_type.get(alert_type, 0) + 1
+        self.by_camera[camera] = self.by_camera.get(camera, 0) + 1
+        self.by_day[day] = self.by_day.get(day, 0) + 1
+        if alert.get('sms_sent'):
+            self.sms_sent += 1
+        if alert.get('email_sent'):
+            self.emails_sent += 1
+        self.last_alert = alert
+
+    def refresh(self) -> List[Dict[str, Any]]:
+        """Fold in records appended since the last refresh and return them"""
+        with self.lock:
+            st = self.store.stat()
+            if st is None:
+                if self.offset:
+                    # Log was deleted underneath us
+                    self._rebuild_locked(None)
+                return []
+            if self._replaced(st):
+                # Log was truncated or replaced underneath us
+                self._rebuild_locked(st)
+                return []
+            if st.st_size == self.offset:
+                return []
+
+            records = self._read_locked(st)
+            self._maybe_save_snapshot()
+            return records
+
+    def rebuild(self):
+        """Recompute every counter from the full log"""
+        with self.lock:
+            self._rebuild_locked(self.store.stat())
+
+    def _rebuild_locked(self, st: Optional[os.stat_result]):
+        self._reset()
+        if st is not None:
+            self._read_locked(st)
+        if self.persist:
+            self._save_snapshot()
+
+    def flush(self):
+        """Save a snapshot now if records were folded in since the last one"""
+        with self.lock:
+            if self.persist and self.unsaved:
+                self._save_snapshot()
+
+    def close(self):
+        self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Current counters (call refresh() first to pick up new alerts)"""
+        today_str = datetime.now().strftime("%Y-%m-%d")
+        with self.lock:
+            return {
+                'total_alerts': self.total,
+                'today_alerts': self.by_day.get(today_str, 0),
+                'zone_breaches': self.by_type.get('zone_breach', 0),
+                'suspicious_actions': self.by_type.get('suspicious_action', 0),
+                'sms_sent': self.sms_sent,
+                'emails_sent': self.emails_sent,
+                'alert_breakdown': dict(self.by_type),
+                'camera_breakdown': dict(self.by_camera),
+                'last_alert': self.last_alert
+            }
@@ -0,0 +1,166 @@
+import csv
+import json
+import os
+import threading
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+
+class AlertStore:
+    """
+    Append-only JSON Lines alert log: one record per line, O(1) appends
+
+    Only the writer (AlertLogger in the core) migrates or repairs the file.
+    Readers such as the dashboard open it with readonly=True and never
+    modify it; a last line still being appended is skipped until complete.
+    """
+
+    def __init__(self, path: str = "data/alerts.jsonl", legacy_json: str = "data/alerts.json",
+                 legacy_csv: str = "data/alerts.csv", readonly: bool = False):
+        self.path = path
+        self.legacy_json = legacy_json
+        self.legacy_csv = legacy_csv
+        self.readonly = readonly
+        self.lock = threading.Lock()
+
+    def setup(self):
+        """Create the log, migrating legacy files once, and repair a torn last line"""
+        if self.readonly:
+            return
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+
+        if not os.path.exists(self.path):
+            self._migrate()
+            return
+
+        # A crash mid-write can leave a partial last record; terminate it so the
+        # next append starts on a fresh line (the partial line is skipped on read)
+        with open(self.path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+
+    def _migrate(self):
+        alerts = self._load_legacy()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for alert in alerts:
+                f.write(json.dumps(alert, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+        if alerts:
+            print(f"📦 Migrated {len(alerts)} alerts to {self.path}")
+        if os.path.exists(self.legacy_json):
+            os.replace(self.legacy_json, self.legacy_json + ".migrated")
+
+    def _load_legacy(self) -> List[Dict[str, Any]]:
+        """Alerts from the old alerts.json, falling back to the CSV export"""
+        if os.path.exists(self.legacy_json):
+            try:
+                with open(self.legacy_json, 'r', encoding='utf-8') as f:
+                    return json.load(f).get('alerts', [])
+            except Exception as e:
+                print(f"❌ Legacy JSON unreadable ({e}), trying CSV")
+
+        if os.path.exists(self.legacy_csv):
+            try:
+                with open(self.legacy_csv, 'r', newline='', encoding='utf-8') as f:
+                    alerts = list(csv.DictReader(f))
+                for alert in alerts:
+                    alert['confidence'] = float(alert.get('confidence') or 0.0)
+                    alert['sms_sent'] = alert.get('sms_sent') == 'True'
+                    alert['email_sent'] = alert.get('email_sent') == 'True'
+                return alerts
+            except Exception as e:
+                print(f"❌ Legacy CSV unreadable: {e}")
+
+        return []
+
+    def append(self, alert: Dict[str, Any]):
+        """Append one record with a single write and fsync"""
+        if self.readonly:
+            raise PermissionError(f"{self.path} is open read-only")
+        line = json.dumps(alert, ensure_ascii=False) + "\n"
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def iter_alerts(self) -> Iterator[Dict[str, Any]]:
+        """All records in write order, skipping torn or corrupt lines"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                # Unterminated last line: a record still being appended
+                if not line.endswith('\n'):
+                    break
+                record = self._parse(line)
+                if record is not None:
+                    yield record
+
+    def tail(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Last `limit` records, reading backwards from the end of the file"""
+        if limit <= 0 or not os.path.exists(self.path):
+            return []
+
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            data = b''
+            while True:
+                step = min(8192, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+
+                lines = data.splitlines()
+                if not data.endswith(b'\n'):
+                    lines = lines[:-1]  # Last record still being appended
+                if pos > 0:
+                    lines = lines[1:]  # First line is only partially read
+                records = [self._parse(line.decode('utf-8', errors='replace')) for line in lines]
+                records = [r for r in records if r is not None]
+                # Keep reading backwards if torn lines left us short
+                if len(records) >= limit or pos == 0:
+                    return records[-limit:]
+
+    def read_from(self, offset: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Complete records appended after byte `offset`, and the offset to resume from"""
+        if not os.path.exists(self.path):
+            return [], 0
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+
+        # Leave a half-written last line for the next call
+        end = data.rfind(b'\n') + 1
+        records = [self._parse(line.decode('utf-8', errors='replace')) for line in data[:end].splitlines()]
+        return [r for r in records if r is not None], offset + end
+
+    def size(self) -> int:
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def stat(self) -> Optional[os.stat_result]:
+        try:
+            return os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+    def count(self) -> int:
+        return sum(1 for _ in self.iter_alerts())
+
+    @staticmethod
+    def _parse(line: str):
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
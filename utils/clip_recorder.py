@@ -0,0 +1,227 @@
+import itertools
+import json
+import os
+import threading
+import time
+import cv2
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class ClipBuffer:
+    """Ring buffer of (timestamp, JPEG bytes) for one camera, bounded by age and size"""
+
+    def __init__(self, max_seconds: float, max_bytes: int):
+        self.max_seconds = max_seconds
+        self.max_bytes = max_bytes
+        self.frames = deque()
+        self.bytes = 0
+
+    def append(self, timestamp: float, data: bytes):
+        self.frames.append((timestamp, data))
+        self.bytes += len(data)
+        oldest = timestamp - self.max_seconds
+        while self.frames and (self.bytes > self.max_bytes or self.frames[0][0] < oldest):
+            _, dropped = self.frames.popleft()
+            self.bytes -= len(dropped)
+
+
+class ClipRecorder:
+    """
+    Pre/post-event video clips from per-camera buffers of encoded frames
+
+    Frames are downscaled and JPEG-encoded once, at `fps`, as they are
+    buffered; at 960 px wide that is roughly 40-80 KB per frame instead of
+    2.7 MB for a raw 1280x720 array. trigger() snapshots the pre-roll and
+    keeps collecting until `post_seconds` have passed, then a background
+    thread decodes the frames into an MP4. Alerts arriving while a camera's
+    clip is still recording share that clip.
+
+    Alerts record the clip's path as soon as it is triggered, like their
+    evidence image. Whether the clip was then written, dropped or failed is
+    appended to `index_file` with the IDs of the alerts it covers.
+    """
+
+    def __init__(self, directory: str = "data/clips", pre_seconds: float = 10.0, post_seconds: float = 5.0,
+                 fps: float = 5.0, max_width: int = 960, jpeg_quality: int = 70,
+                 max_buffer_mb: float = 24.0, max_pending: int = 4, index_file: Optional[str] = None):
+        self.directory = directory
+        self.index_file = index_file or os.path.join(directory, "clips.jsonl")
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.fps = fps
+        self.min_interval = 1.0 / fps if fps > 0 else 0.0
+        self.max_width = max_width
+        self.jpeg_quality = jpeg_quality
+        self.max_bytes = int(max_buffer_mb * 1024 * 1024)
+        self.max_pending = max_pending
+        self.buffers: Dict[str, ClipBuffer] = {}
+        self.last_frame: Dict[str, float] = {}
+        self.recording: Dict[str, Dict[str, Any]] = {}  # Camera -> clip still collecting post-roll
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="clips")
+        self.sequence = itertools.count(1)
+        self.lock = threading.Lock()
+        self.index_lock = threading.Lock()
+        self.pending = 0
+        self.stats = {'triggered': 0, 'written': 0, 'failed': 0, 'dropped': 0, 'bytes': 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def add_frame(self, camera_name: str, frame: np.ndarray, timestamp: Optional[float] = None) -> bool:
+        """Buffer a raw (unannotated) frame if it is due; returns whether it was encoded"""
+        timestamp = time.time() if timestamp is None else timestamp
+        last = self.last_frame.get(camera_name)
+        if last is not None and timestamp - last < self.min_interval:
+            return False
+        self.last_frame[camera_name] = timestamp
+
+        h, w = frame.shape[:2]
+        if self.max_width and w > self.max_width:
+            frame = cv2.resize(frame, (self.max_width, h * self.max_width // w), interpolation=cv2.INTER_AREA)
+        ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            return False
+        data = encoded.tobytes()
+
+        buffer = self.buffers.get(camera_name)
+        if buffer is None:
+            buffer = self.buffers[camera_name] = ClipBuffer(self.pre_seconds, self.max_bytes)
+        buffer.append(timestamp, data)
+
+        clip = self.recording.get(camera_name)
+        if clip is not None:
+            clip['frames'].append((timestamp, data))
+            clip['bytes'] += len(data)
+            # Post-roll is held on top of the buffer, so it gets the same cap
+            if timestamp >= clip['end'] or clip['bytes'] > self.max_bytes:
+                self._finish(camera_name)
+        return True
+
+    def trigger(self, camera_name: str, alert_type: str, timestamp: Optional[float] = None) -> str:
+        """Start a clip around an alert (or join the one recording); returns the path it will be written to"""
+        timestamp = time.time() if timestamp is None else timestamp
+        clip = self.recording.get(camera_name)
+        if clip is not None and timestamp >= clip['end']:
+            # Post-roll ran out while the camera delivered no frames
+            self._finish(camera_name)
+            clip = None
+        if clip is None:
+            buffer = self.buffers.get(camera_name)
+            clip = self.recording[camera_name] = {
+                'camera': camera_name,
+                'path': self.make_path(camera_name, alert_type),
+                'end': timestamp + self.post_seconds,
+                'frames': list(buffer.frames) if buffer is not None else [],
+                # Pre-roll bytes are shared with the buffer; only post-roll counts
+                'bytes': 0,
+                'alert_ids': []
+            }
+            with self.lock:
+                self.stats['triggered'] += 1
+        return clip['path']
+
+    def add_alert(self, camera_name: str, alert_id: str):
+        """Attach a logged alert to the camera's recording clip, for the clip index"""
+        clip = self.recording.get(camera_name)
+        if clip is not None:
+            clip['alert_ids'].append(alert_id)
+
+    def tick(self, timestamp: Optional[float] = None):
+        """Finish clips whose post-roll has passed, e.g. because their camera stopped delivering frames"""
+        timestamp = time.time() if timestamp is None else timestamp
+        for camera_name in [name for name, clip in self.recording.items() if timestamp >= clip['end']]:
+            self._finish(camera_name)
+
+    def make_path(self, camera_name: str, alert_type: str) -> str:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        camera = camera_name.replace(os.sep, '-')
+        return os.path.join(self.directory, f"{camera}_{alert_type}_{timestamp}_{next(self.sequence):04d}.mp4")
+
+    def _finish(self, camera_name: str):
+        clip = self.recording.pop(camera_name)
+        with self.lock:
+            dropped = self.pending >= self.max_pending
+            if dropped:
+                self.stats['dropped'] += 1
+            else:
+                self.pending += 1
+        if dropped:
+            print(f"⚠️ Clip queue full - clip for {', '.join(clip['alert_ids']) or camera_name} dropped")
+            self._record(clip, 'dropped')
+            return
+        self.executor.submit(self._write, clip)
+
+    def _record(self, clip: Dict[str, Any], status: str):
+        """Append a clip's outcome to the index"""
+        entry = {'camera': clip['camera'], 'alert_ids': clip['alert_ids'], 'status': status,
+                 'path': clip['path'], 'timestamp': datetime.now().isoformat()}
+        try:
+            with self.index_lock, open(self.index_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
+        except Exception as e:
+            print(f"❌ Clip index error: {e}")
+
+    def _write(self, clip: Dict[str, Any]) -> bool:
+        frames, path = clip['frames'], clip['path']
+        # Hidden while being written; VideoWriter picks the container from the extension
+        tmp_path = os.path.join(os.path.dirname(path), "." + os.path.basename(path))
+        writer = None
+        try:
+            if not frames:
+                raise ValueError("no frames buffered")
+            size = None
+            for _, data in frames:
+                image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if image is None:
+                    continue
+                if writer is None:
+                    size = (image.shape[1], image.shape[0])
+                    writer = cv2.VideoWriter(tmp_path, cv2.VideoWriter_fourcc(*'mp4v'), self.fps or 5.0, size)
+                    if not writer.isOpened():
+                        raise ValueError("video writer could not be opened")
+                elif (image.shape[1], image.shape[0]) != size:
+                    # Camera resolution changed mid-clip
+                    image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+                writer.write(image)
+            if writer is None:
+                raise ValueError("no decodable frames")
+            writer.release()
+            writer = None
+            os.replace(tmp_path, path)
+            ok = True
+        except Exception as e:
+            print(f"❌ Clip write error ({path}): {e}")
+            ok = False
+        finally:
+            if writer is not None:
+                writer.release()
+            if not ok and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        with self.lock:
+            self.pending -= 1
+            if ok:
+                self.stats['written'] += 1
+                self.stats['bytes'] += os.path.getsize(path)
+            else:
+                self.stats['failed'] += 1
+        self._record(clip, 'written' if ok else 'failed')
+        return ok
+
+    def buffered_bytes(self) -> Dict[str, int]:
+        return {camera: buffer.bytes for camera, buffer in self.buffers.items()}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+            stats['pending'] = self.pending
+        stats['recording'] = len(self.recording)
+        return stats
+
+    def close(self, wait: bool = True):
+        """Write clips still collecting post-roll with what they have, then stop"""
+        for camera_name in list(self.recording):
+            self._finish(camera_name)
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,88 @@
+import queue
+import socket
+import threading
+from typing import Iterable, List, Optional
+
+from utils import local_socket
+
+
+class ControlServer:
+    """
+    Local line-based control socket, the headless stand-in for keyboard controls
+
+    Each line a client sends is one command name, e.g.
+    `echo screenshot | nc -U data/dstps.sock`. Commands are queued and
+    executed by the processing loop through poll(), never on the socket
+    thread.
+
+    Commands include `quit` and `test_sms`, so access is restricted: where
+    AF_UNIX exists the socket is a file only its owner can open (0600).
+    The TCP fallback (Windows, or no path configured) refuses to start
+    without a shared token; when a token is set, a connection's first line
+    must be that token.
+    """
+
+    def __init__(self, commands: Iterable[str], host: str = "127.0.0.1", port: int = 5557,
+                 path: Optional[str] = None, token: Optional[str] = None):
+        self.commands = set(commands)
+        self.host = host
+        self.port = port
+        self.path = path if path and local_socket.unix_sockets_available() else None
+        self.token = token or None
+        self.pending = queue.Queue()
+        self.running = False
+        self.server = None
+
+    def start(self) -> bool:
+        try:
+            self.server, where = local_socket.listen(self.path, self.host, self.port, self.token)
+        except OSError as e:
+            print(f"❌ Control socket disabled: {e}")
+            self.server = None
+            return False
+
+        self.running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        print(f"🎮 Control socket on {where} ({', '.join(sorted(self.commands))})")
+        return True
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: socket.socket):
+        try:
+            with conn, conn.makefile('r', encoding='utf-8') as lines:
+                if self.token is not None:
+                    supplied = lines.readline().strip()
+                    if not local_socket.token_matches(supplied, self.token):
+                        conn.sendall(b"unauthorized\n")
+                        return
+                for line in lines:
+                    command = line.strip().lower()
+                    if not command:
+                        continue
+                    if command in self.commands:
+                        self.pending.put(command)
+                        conn.sendall(b"ok\n")
+                    else:
+                        conn.sendall(f"unknown command, expected one of: {', '.join(sorted(self.commands))}\n".encode('utf-8'))
+        except OSError:
+            pass
+
+    def poll(self) -> List[str]:
+        """Commands received since the last call, oldest first"""
+        commands = []
+        while True:
+            try:
+                commands.append(self.pending.get_nowait())
+            except queue.Empty:
+                return commands
+
+    def close(self):
+        self.running = False
+        local_socket.close(self.server, self.path)
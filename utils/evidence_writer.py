@@ -0,0 +1,116 @@
+import itertools
+import json
+import os
+import threading
+import time
+import cv2
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+
+def landmarks_path(image_path: str) -> str:
+    """Sidecar file holding the pose landmarks of an evidence image"""
+    return os.path.splitext(image_path)[0] + ".landmarks.json"
+
+
+def write_landmarks(image_path: str, landmarks: np.ndarray):
+    """(33, 4) pose array (x, y in pixels, z, visibility) next to the evidence image"""
+    path = landmarks_path(image_path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'columns': ['x', 'y', 'z', 'visibility'],
+                   'landmarks': np.round(landmarks, 3).tolist()}, f)
+    os.replace(tmp_path, path)
+
+
+class EvidenceWriter:
+    """
+    Encodes and writes evidence JPEGs on a small thread pool
+
+    save() only reserves a unique file name and queues the image, so slow
+    disks (NAS hiccups) never stall the detection loop. At most
+    `max_pending` images wait in memory; beyond that new evidence is dropped
+    and counted instead of blocking.
+    """
+
+    def __init__(self, directory: str = "data/evidence", workers: int = 2, max_pending: int = 32,
+                 jpeg_quality: int = 90, max_width: int = 1920):
+        self.directory = directory
+        self.max_pending = max_pending
+        self.jpeg_quality = jpeg_quality
+        self.max_width = max_width
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="evidence")
+        self.sequence = itertools.count(1)
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.stats = {'queued': 0, 'written': 0, 'failed': 0, 'dropped': 0,
+                      'max_pending': 0, 'bytes': 0, 'last_write_ms': 0.0, 'max_write_ms': 0.0}
+        os.makedirs(directory, exist_ok=True)
+
+    def make_path(self, camera_name: str, alert_type: str) -> str:
+        # Microseconds plus a process-wide sequence number: never reused within a run
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        camera = camera_name.replace(os.sep, '-')
+        return os.path.join(self.directory, f"{camera}_{alert_type}_{timestamp}_{next(self.sequence):04d}.jpg")
+
+    def save(self, image: np.ndarray, camera_name: str, alert_type: str,
+             landmarks: Optional[np.ndarray] = None) -> Tuple[Optional[str], Optional[Future]]:
+        """Queue an image (and its landmark sidecar); returns its final path and a future resolving once written"""
+        with self.lock:
+            if self.pending >= self.max_pending:
+                self.stats['dropped'] += 1
+                print(f"⚠️ Evidence queue full ({self.pending} pending) - image dropped")
+                return None, None
+            self.pending += 1
+            self.stats['queued'] += 1
+            self.stats['max_pending'] = max(self.stats['max_pending'], self.pending)
+
+        path = self.make_path(camera_name, alert_type)
+        return path, self.executor.submit(self._write, image, path, landmarks)
+
+    def _write(self, image: np.ndarray, path: str, landmarks: Optional[np.ndarray] = None) -> bool:
+        started = time.perf_counter()
+        try:
+            h, w = image.shape[:2]
+            if self.max_width and w > self.max_width:
+                image = cv2.resize(image, (self.max_width, h * self.max_width // w), interpolation=cv2.INTER_AREA)
+
+            ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not ok:
+                raise ValueError("JPEG encoding failed")
+
+            # Readers (dashboard, email) only ever see complete files
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(buffer.tobytes())
+            os.replace(tmp_path, path)
+            if landmarks is not None:
+                write_landmarks(path, landmarks)
+            ok = True
+        except Exception as e:
+            print(f"❌ Evidence write error ({path}): {e}")
+            ok = False
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self.lock:
+            self.pending -= 1
+            if ok:
+                self.stats['written'] += 1
+                self.stats['bytes'] += len(buffer)
+                self.stats['last_write_ms'] = round(elapsed_ms, 1)
+                self.stats['max_write_ms'] = round(max(self.stats['max_write_ms'], elapsed_ms), 1)
+            else:
+                self.stats['failed'] += 1
+        return ok
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+            stats['pending'] = self.pending
+        return stats
+
+    def close(self, wait: bool = True):
+        """Finish queued writes (unless wait=False) and stop the pool"""
+        self.executor.shutdown(wait=wait)
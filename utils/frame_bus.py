@@ -0,0 +1,251 @@
+import select
+import socket
+import struct
+import threading
+import time
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from utils import local_socket
+
+# Per message: camera name length, JPEG length, then both payloads
+_HEADER = struct.Struct('!HI')
+
+
+class FrameBusPublisher:
+    """
+    Local socket bus the core publishes annotated frames on
+
+    Each frame is JPEG-encoded once, and only while a subscriber is connected.
+    Every subscriber is sent the newest frame per camera; frames it was too
+    slow to receive are skipped rather than queued.
+
+    Like the control socket, the bus is an owner-only (0600) Unix socket
+    where available; the TCP fallback needs a shared token, sent by the
+    subscriber as its first line.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 5555, max_fps: float = 10.0,
+                 jpeg_quality: int = 80, path: Optional[str] = None, token: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.path = path if path and local_socket.unix_sockets_available() else None
+        self.token = token or None
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.jpeg_quality = jpeg_quality
+        self.latest: Dict[str, Tuple[int, bytes]] = {}
+        self.last_publish: Dict[str, float] = {}
+        self.subscribers = 0
+        self.cond = threading.Condition()
+        self.running = False
+        self.server = None
+
+    def start(self) -> bool:
+        # Frames from a previous run must not reach the first viewer
+        with self.cond:
+            self.latest.clear()
+            self.last_publish.clear()
+        try:
+            self.server, where = local_socket.listen(self.path, self.host, self.port, self.token)
+        except OSError as e:
+            print(f"❌ Frame bus disabled: {e}")
+            self.server = None
+            return False
+
+        self.running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        print(f"📡 Frame bus on {where}")
+        return True
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                break
+            if conn.family == socket.AF_INET:
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _authorized(self, conn: socket.socket) -> bool:
+        if self.token is None:
+            return True
+        conn.settimeout(2.0)
+        supplied = bytearray()
+        try:
+            while not supplied.endswith(b"\n") and len(supplied) < 1024:
+                chunk = conn.recv(1)
+                if not chunk:
+                    return False
+                supplied += chunk
+        except OSError:
+            return False
+        conn.settimeout(None)
+        return local_socket.token_matches(supplied.decode('utf-8', 'replace'), self.token)
+
+    def _serve(self, conn: socket.socket):
+        if not self._authorized(conn):
+            conn.close()
+            return
+        with self.cond:
+            self.subscribers += 1
+        sent: Dict[str, int] = {}
+
+        def has_new():
+            return not self.running or any(sent.get(cam) != seq for cam, (seq, _) in self.latest.items())
+
+        try:
+            while self.running:
+                with self.cond:
+                    self.cond.wait_for(has_new, timeout=1.0)
+                    pending = [(cam, seq, data) for cam, (seq, data) in self.latest.items()
+                               if sent.get(cam) != seq]
+
+                # Notice a departed subscriber promptly so encoding can stop
+                if not pending and self._peer_closed(conn):
+                    break
+
+                for camera_name, seq, data in pending:
+                    name = camera_name.encode('utf-8')
+                    conn.sendall(_HEADER.pack(len(name), len(data)) + name + data)
+                    sent[camera_name] = seq
+        except OSError:
+            pass
+        finally:
+            with self.cond:
+                self.subscribers -= 1
+                if not self.subscribers:
+                    # Nothing is encoded while unwatched; the next viewer starts fresh
+                    self.latest.clear()
+                    self.last_publish.clear()
+            conn.close()
+
+    @staticmethod
+    def _peer_closed(conn: socket.socket) -> bool:
+        # select + MSG_PEEK rather than MSG_DONTWAIT, which Windows lacks
+        try:
+            readable, _, _ = select.select([conn], [], [], 0)
+            return bool(readable) and conn.recv(1, socket.MSG_PEEK) == b''
+        except OSError:
+            return True
+
+    def publish(self, camera_name: str, frame: np.ndarray) -> bool:
+        """Encode and publish a frame; a no-op without subscribers or above max_fps"""
+        if not self.subscribers:
+            return False
+
+        now = time.time()
+        if now - self.last_publish.get(camera_name, 0.0) < self.min_interval:
+            return False
+        self.last_publish[camera_name] = now
+
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            return False
+
+        with self.cond:
+            seq = self.latest.get(camera_name, (0, b''))[0] + 1
+            self.latest[camera_name] = (seq, buffer.tobytes())
+            self.cond.notify_all()
+        return True
+
+    def close(self):
+        self.running = False
+        with self.cond:
+            self.cond.notify_all()
+        local_socket.close(self.server, self.path)
+
+
+class FrameBusSubscriber:
+    """
+    Dashboard side of the bus: keeps the newest JPEG per camera for all viewers
+
+    The connection to the core is only held open while at least one viewer is
+    watching, so the core does no encoding when nobody is looking. Frames
+    are dropped whenever that connection ends, so a viewer never gets one
+    from an earlier session; sequence numbers keep rising across sessions.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 5555, path: Optional[str] = None,
+                 token: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.token = token or None
+        self.latest: Dict[str, Tuple[int, bytes]] = {}
+        self.seq = 0
+        self.viewers = 0
+        self.cond = threading.Condition()
+        self._reader = None
+
+    def add_viewer(self):
+        with self.cond:
+            self.viewers += 1
+            if self._reader is None:
+                self._reader = threading.Thread(target=self._run, daemon=True)
+                self._reader.start()
+
+    def remove_viewer(self):
+        with self.cond:
+            self.viewers -= 1
+
+    def _run(self):
+        while True:
+            with self.cond:
+                if self.viewers <= 0:
+                    self.latest.clear()
+                    self._reader = None
+                    return
+            try:
+                with local_socket.connect(self.path, self.host, self.port, self.token, timeout=2.0) as sock:
+                    sock.settimeout(1.0)
+                    self._receive(sock)
+            except OSError:
+                # Core not running (yet); retry while someone is watching
+                if self.viewers > 0:
+                    time.sleep(2.0)
+            finally:
+                # Whatever was received belongs to the connection that just ended
+                with self.cond:
+                    self.latest.clear()
+
+    def _receive(self, sock: socket.socket):
+        while self.viewers > 0:
+            name_len, data_len = _HEADER.unpack(self._recv_exact(sock, _HEADER.size))
+            camera_name = self._recv_exact(sock, name_len).decode('utf-8')
+            data = self._recv_exact(sock, data_len)
+
+            with self.cond:
+                self.seq += 1
+                self.latest[camera_name] = (self.seq, data)
+                self.cond.notify_all()
+
+    def _recv_exact(self, sock: socket.socket, size: int) -> bytes:
+        buffer = bytearray()
+        while len(buffer) < size:
+            try:
+                chunk = sock.recv(size - len(buffer))
+            except socket.timeout:
+                # Periodic wake-up to drop the connection once viewers leave
+                if self.viewers <= 0:
+                    raise ConnectionError("no viewers")
+                continue
+            if not chunk:
+                raise ConnectionError("frame bus closed")
+            buffer += chunk
+        return bytes(buffer)
+
+    def cameras(self) -> List[str]:
+        with self.cond:
+            return list(self.latest.keys())
+
+    def wait_for_frame(self, camera_name: str, last_seq: int, timeout: float = 5.0) -> Optional[Tuple[int, bytes]]:
+        """Newest frame newer than last_seq; intermediate frames are skipped"""
+        def ready():
+            return self.latest.get(camera_name, (0, b''))[0] > last_seq
+
+        with self.cond:
+            if not self.cond.wait_for(ready, timeout=timeout):
+                return None
+            return self.latest[camera_name]
@@ -0,0 +1,81 @@
+import hmac
+import os
+import socket
+import stat
+from typing import Optional, Tuple
+
+
+def unix_sockets_available() -> bool:
+    return hasattr(socket, 'AF_UNIX')
+
+
+def listen(path: Optional[str], host: str, port: int, token: Optional[str]) -> Tuple[socket.socket, str]:
+    """
+    Listening socket for a local-only service, and where it listens
+
+    An owner-only (0600) Unix socket at `path` where AF_UNIX exists;
+    otherwise TCP on host:port, which needs a shared token because any
+    local user or process can connect to it. Raises OSError when neither
+    can be set up.
+    """
+    if path and unix_sockets_available():
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # A socket file left behind by a crashed run would make bind() fail
+        if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Created owner-only, never briefly world-accessible
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(path)
+            server.listen()
+        except OSError:
+            server.close()
+            raise
+        finally:
+            os.umask(old_umask)
+        os.chmod(path, 0o600)
+        return server, path
+
+    if not token:
+        raise OSError("TCP needs a shared token (no Unix socket available or configured)")
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    try:
+        server.bind((host, port))
+        server.listen()
+    except OSError:
+        server.close()
+        raise
+    return server, f"{host}:{port}"
+
+
+def connect(path: Optional[str], host: str, port: int, token: Optional[str],
+            timeout: Optional[float] = None) -> socket.socket:
+    """Client side of listen(); sends the token line first when one is set"""
+    if path and unix_sockets_available():
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(path)
+        except OSError:
+            sock.close()
+            raise
+    else:
+        sock = socket.create_connection((host, port), timeout=timeout)
+    if token:
+        sock.sendall(token.encode('utf-8') + b"\n")
+    return sock
+
+
+def token_matches(supplied: str, token: str) -> bool:
+    return hmac.compare_digest(supplied.strip().encode('utf-8'), token.encode('utf-8'))
+
+
+def close(server: Optional[socket.socket], path: Optional[str]):
+    if server is None:
+        return
+    server.close()
+    if server.family == getattr(socket, 'AF_UNIX', None) and path and os.path.exists(path):
+        os.unlink(path)
@@ -2,25 +2,35 @@ import json
 import csv
 import time
 import os
+import secrets
 from datetime import datetime
 from typing import Dict, Any, List
+from utils.alert_store import AlertStore
+from utils.alert_stats import AlertStats
 
 
 class AlertLogger:
-    def __init__(self, log_file: str = "data/alerts.json", csv_file: str = "data/alerts.csv"):
+    def __init__(self, log_file: str = "data/alerts.jsonl", csv_file: str = "data/alerts.csv",
+                 legacy_json_file: str = "data/alerts.json"):
         self.log_file = log_file
         self.csv_file = csv_file
+        self.store = AlertStore(log_file, legacy_json=legacy_json_file, legacy_csv=csv_file)
         self.setup_logging()
-        self.alert_count = 0
+        # Running counters; only alerts appended since the last snapshot are read
+        self.stats = AlertStats(self.store)
+        self.stats.refresh()
+        # Continue numbering across restarts; the count alone is not unique when
+        # several processes (e.g. analyze.py next to the live core) share the log,
+        # so IDs also carry the time and a per-logger token
+        self.alert_count = self.stats.total
+        self.instance = secrets.token_hex(3)
 
     def setup_logging(self):
         """Create log files and directories"""
         os.makedirs('data', exist_ok=True)
 
-        # Initialize JSON log file
-        if not os.path.exists(self.log_file):
-            with open(self.log_file, 'w') as f:
-                json.dump({"alerts": [], "system_info": {"version": "2.0", "created": self.get_timestamp()}}, f)
+        # Initialize append-only JSON Lines log (migrates alerts.json/alerts.csv once)
+        self.store.setup()
 
         # Initialize CSV log file with enhanced headers
         if not os.path.exists(self.csv_file):
@@ -35,11 +45,16 @@ class AlertLogger:
     def log_alert(self, camera_name: str, zone: tuple, confidence: float,
                   image_path: str = "", alert_type: str = "zone_breach",
                   action_type: str = "normal", location: str = "Unknown Location",
-                  sms_sent: bool = False, email_sent: bool = True):
-        """Enhanced alert logging with all new parameters"""
+                  sms_sent: bool = False, email_sent: bool = True,
+                  timestamp: str = None, extra: Dict[str, Any] = None):
+        """Enhanced alert logging with all new parameters
+
+        timestamp overrides the current time (e.g. footage time for offline
+        analysis); extra fields are stored in the JSON log only.
+        """
         self.alert_count += 1
-        alert_id = f"ALT{self.alert_count:06d}"
-        timestamp = self.get_timestamp()
+        alert_id = f"ALT{datetime.now():%Y%m%d%H%M%S}-{self.instance}-{self.alert_count:06d}"
+        timestamp = timestamp or self.get_timestamp()
 
         alert_data = {
             'alert_id': alert_id,
@@ -54,6 +69,8 @@ class AlertLogger:
             'sms_sent': sms_sent,
             'email_sent': email_sent
         }
+        if extra:
+            alert_data.update(extra)
 
         # Log to JSON
         self._log_to_json(alert_data)
@@ -65,13 +82,10 @@ class AlertLogger:
         return alert_id
 
     def _log_to_json(self, alert_data: Dict[str, Any]):
-        """Log alert to JSON file"""
+        """Append alert to the JSON Lines log"""
         try:
-            with open(self.log_file, 'r+', encoding='utf-8') as f:
-                data = json.load(f)
-                data['alerts'].append(alert_data)
-                f.seek(0)
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            self.store.append(alert_data)
+            self.stats.refresh()
         except Exception as e:
             print(f"❌ JSON log error: {e}")
 
@@ -99,33 +113,29 @@ class AlertLogger:
     def get_recent_alerts(self, limit: int = 10) -> List[Dict]:
         """Get recent alerts for dashboard"""
         try:
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data['alerts'][-limit:]
+            return self.store.tail(limit)
         except:
             return []
 
     def get_alert_stats(self) -> Dict[str, Any]:
         """Get alert statistics"""
         try:
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                alerts = data['alerts']
-
-                stats = {
-                    'total_alerts': len(alerts),
-                    'today_alerts': len(
-                        [a for a in alerts if a['timestamp'].startswith(datetime.now().strftime("%Y-%m-%d"))]),
-                    'zone_breaches': len([a for a in alerts if a['alert_type'] == 'zone_breach']),
-                    'suspicious_actions': len([a for a in alerts if a['alert_type'] == 'suspicious_action']),
-                    'sms_sent': len([a for a in alerts if a['sms_sent']]),
-                    'emails_sent': len([a for a in alerts if a['email_sent']])
-                }
-                return stats
+            self.stats.refresh()
+            stats = self.stats.get_stats()
+            return {key: stats[key] for key in ('total_alerts', 'today_alerts', 'zone_breaches',
+                                                'suspicious_actions', 'sms_sent', 'emails_sent')}
         except:
             return {'total_alerts': 0, 'today_alerts': 0, 'zone_breaches': 0,
                     'suspicious_actions': 0, 'sms_sent': 0, 'emails_sent': 0}
 
+    def rebuild_stats(self):
+        """Recompute statistics from the full alert log"""
+        self.stats.rebuild()
+
+    def close(self):
+        """Save the stats snapshot held back by the write throttle"""
+        self.stats.close()
+
     def get_timestamp(self):
         return datetime.now().isoformat()
 
@@ -148,4 +158,5 @@ if __name__ == "__main__":
     )
 
     print(f"✅ Test alert logged: {test_id}")
-    print(f" Stats: {logger.get_alert_stats()}")
\ No newline at end of file
+    print(f" Stats: {logger.get_alert_stats()}")
+    logger.close()
\ No newline at end of file
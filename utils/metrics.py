@@ -0,0 +1,175 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, Tuple
+
+# Seconds; frame stages sit in the low buckets, disk/network work in the high ones
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels_text(labels: Tuple[Tuple[str, str], ...], le: str = None) -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in labels]
+    if le is not None:
+        parts.append(f'le="{le}"')
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Metrics:
+    """
+    In-process metrics registry with Prometheus text output
+
+    Recording is a dict lookup plus a few additions (about 2 us per timed
+    stage), far below 1% of a frame's budget. Each series is written by one thread (the
+    processing loop, or the dispatcher for delivery latency); render() only
+    reads. Gauges for state owned by other components are callbacks
+    evaluated at scrape time, so they cost nothing per frame.
+    """
+
+    def __init__(self, prefix: str = "dstps"):
+        self.prefix = prefix
+        self.histograms: Dict[tuple, Histogram] = {}
+        self.counters: Dict[tuple, float] = {}
+        self.gauge_callbacks: Dict[str, Callable[[], Iterable[Tuple[Dict[str, str], float]]]] = {}
+        self.help: Dict[str, Tuple[str, str]] = {}
+        self.started = time.time()
+
+    def describe(self, name: str, kind: str, text: str):
+        self.help[name] = (kind, text)
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(labels.items()))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = (name, tuple(labels.items()))
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def gauge(self, name: str, text: str, callback: Callable[[], Iterable[Tuple[Dict[str, str], float]]]):
+        """Register a gauge computed at scrape time; callback yields (labels, value)"""
+        self.describe(name, 'gauge', text)
+        self.gauge_callbacks[name] = callback
+
+    def counter(self, name: str, text: str, callback: Callable[[], Iterable[Tuple[Dict[str, str], float]]]):
+        """Like gauge(), for a monotonic count another component keeps; name should end in _total"""
+        self.describe(name, 'counter', text)
+        self.gauge_callbacks[name] = callback
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def _header(self, lines, name: str, default_kind: str):
+        kind, text = self.help.get(name, (default_kind, name))
+        lines.append(f"# HELP {self.prefix}_{name} {text}")
+        lines.append(f"# TYPE {self.prefix}_{name} {kind}")
+
+    def render(self) -> str:
+        lines = []
+        seen = set()
+
+        for (name, labels), value in sorted(list(self.counters.items())):
+            if name not in seen:
+                self._header(lines, name, 'counter')
+                seen.add(name)
+            lines.append(f"{self.prefix}_{name}{_labels_text(labels)} {value}")
+
+        for (name, labels), histogram in sorted(list(self.histograms.items()), key=lambda item: item[0]):
+            if name not in seen:
+                self._header(lines, name, 'histogram')
+                seen.add(name)
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f"{self.prefix}_{name}_bucket{_labels_text(labels, bound)} {cumulative}")
+            lines.append(f"{self.prefix}_{name}_bucket{_labels_text(labels, '+Inf')} {histogram.count}")
+            lines.append(f"{self.prefix}_{name}_sum{_labels_text(labels)} {histogram.sum:.6f}")
+            lines.append(f"{self.prefix}_{name}_count{_labels_text(labels)} {histogram.count}")
+
+        for name, callback in list(self.gauge_callbacks.items()):
+            try:
+                samples = list(callback())
+            except Exception as e:
+                print(f"❌ Metrics gauge {name} failed: {e}")
+                continue
+            self._header(lines, name, 'gauge')
+            for labels, value in samples:
+                lines.append(f"{self.prefix}_{name}{_labels_text(tuple(labels.items()))} {value}")
+
+        self._header(lines, 'uptime_seconds', 'gauge')
+        lines.append(f"{self.prefix}_uptime_seconds {time.time() - self.started:.1f}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serves a Metrics registry as Prometheus text on http://host:port/metrics"""
+
+    def __init__(self, metrics: Metrics, host: str = "127.0.0.1", port: int = 9108):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.server = None
+
+    def start(self) -> bool:
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError as e:
+            print(f"❌ Metrics endpoint disabled: {e}")
+            self.server = None
+            return False
+
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"📈 Metrics on http://{self.host}:{self.port}/metrics")
+        return True
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
@@ -5,6 +5,7 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.image import MIMEImage
 from dotenv import load_dotenv
 from datetime import datetime
+from typing import List
 
 # Load environment variables
 load_dotenv()
@@ -15,17 +16,23 @@ class EmailNotifier:
     Working Gmail notifier with proper configuration
     """
 
-    def __init__(self):
-        self.smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
-        self.port = int(os.getenv('SMTP_PORT', '587'))
-        self.email = os.getenv('SMTP_EMAIL')
-        self.password = os.getenv('SMTP_PASSWORD')
+    def __init__(self, smtp_server: str = None, port: int = None, email: str = None,
+                 password: str = None, use_tls: bool = True, timeout: float = 30.0):
+        self.smtp_server = smtp_server or os.getenv('SMTP_SERVER', 'smtp.gmail.com')
+        self.port = int(port or os.getenv('SMTP_PORT', '587'))
+        self.email = email or os.getenv('SMTP_EMAIL')
+        self.password = password if password is not None else os.getenv('SMTP_PASSWORD')
+        self.use_tls = use_tls
+        self.timeout = timeout
+        # Persistent SMTP session, reused across alerts until it drops
+        self.server = None
 
         print("🔧 Email Notifier Configuration:")
         print(f"   Email: {self.email}")
         print(f"   Server: {self.smtp_server}:{self.port}")
 
-        if not self.email or not self.password:
+        # A local relay without TLS (e.g. a test SMTP server) needs no password
+        if not self.email or (self.use_tls and not self.password):
             print("❌ Email not configured in .env file")
             print("💡 Create .env file with SMTP_EMAIL and SMTP_PASSWORD")
             self.enabled = False
@@ -35,17 +42,27 @@ class EmailNotifier:
 
     def send_alert(self, to_email: str, subject: str, message: str, image_path: str = None):
         """Send real email alert"""
+        return self.send_batch([to_email], subject, message, image_path)
+
+    def send_batch(self, recipients: List[str], subject: str, message: str, image_path: str = None,
+                   raise_errors: bool = False):
+        """Send one alert message to all recipients in a single SMTP session
+
+        raise_errors re-raises the SMTP error after reporting it, so callers
+        that retry can tell a dropped connection from bad credentials.
+        """
         if not self.enabled:
             print("❌ Email not enabled - check .env configuration")
             return False
 
+        to_list = ", ".join(recipients)
         try:
-            print(f" Attempting to send email to {to_email}...")
+            print(f" Attempting to send email to {to_list}...")
 
             # Create message
             msg = MIMEMultipart()
             msg['From'] = self.email
-            msg['To'] = to_email
+            msg['To'] = to_list
             msg['Subject'] = f"🚨 DSTPS Alert: {subject}"
 
             # Create email body
@@ -53,7 +70,7 @@ class EmailNotifier:
  DSTPS SECURITY ALERT SYSTEM
 
  ALERT DETAILS:
-• Camera: {to_email}
+• Camera: {to_list}
 • Incident: {subject}
 • Description: {message}
 • Timestamp: {self.get_timestamp()}
@@ -78,20 +95,15 @@ This is an automated alert from your DSTPS security system.
                 print(f"    Attaching evidence: {image_path}")
 
             # Send email
-            print("    Connecting to SMTP server...")
-            server = smtplib.SMTP(self.smtp_server, self.port)
-            server.starttls()
-            print("    Logging in...")
-            server.login(self.email, self.password)
             print("    Sending message...")
-            server.send_message(msg)
-            server.quit()
+            self._send(msg, recipients)
 
-            print(f"✅ Email successfully sent to {to_email}")
+            print(f"✅ Email successfully sent to {to_list}")
             return True
 
         except Exception as e:
             print(f"❌ Email failed: {str(e)}")
+            self.close()
 
             # Helpful error messages
             if "535" in str(e):
@@ -104,8 +116,42 @@ This is an automated alert from your DSTPS security system.
             else:
                 print("💡 Check your .env file and Gmail settings")
 
+            if raise_errors:
+                raise
             return False
 
+    def _connect(self) -> smtplib.SMTP:
+        print("    Connecting to SMTP server...")
+        server = smtplib.SMTP(self.smtp_server, self.port, timeout=self.timeout)
+        if self.use_tls:
+            server.starttls()
+        if self.password:
+            print("    Logging in...")
+            server.login(self.email, self.password)
+        return server
+
+    def _send(self, msg, recipients: List[str]):
+        """Send on the open session, reconnecting once if the server dropped it"""
+        for attempt in range(2):
+            if self.server is None:
+                self.server = self._connect()
+            try:
+                self.server.send_message(msg, to_addrs=recipients)
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                self.close()
+                if attempt:
+                    raise
+
+    def close(self):
+        """Close the persistent SMTP session"""
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                pass
+            self.server = None
+
     def get_timestamp(self):
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
@@ -114,4 +160,11 @@ This is an automated alert from your DSTPS security system.
 class ConsoleNotifier:
     def send_alert(self, to_email: str, subject: str, message: str, image_path: str = None):
         print(f" [CONSOLE] Alert for {to_email}: {subject}")
-        return True
\ No newline at end of file
+        return True
+
+    def send_batch(self, recipients: List[str], subject: str, message: str, image_path: str = None,
+                   raise_errors: bool = False):
+        return self.send_alert(", ".join(recipients), subject, message, image_path)
+
+    def close(self):
+        pass
\ No newline at end of file
@@ -0,0 +1,82 @@
+import os
+import time
+from typing import Dict, Optional
+
+
+class InferenceScheduler:
+    """
+    Per-camera inference budget driven by activity and machine load
+
+    Idle cameras run the detector at `idle_fps`; a camera with people in view
+    runs at `active_fps` (0 = every frame) for `active_hold` seconds after the
+    last detection. When the load average per core exceeds `cpu_target`, idle
+    cameras are slowed first and active ones only under heavy overload.
+    """
+
+    def __init__(self, idle_fps: float = 2.0, active_fps: float = 0.0, active_hold: float = 5.0,
+                 cpu_target: float = 0.85, min_fps: float = 0.5, load_interval: float = 2.0):
+        self.idle_fps = idle_fps
+        self.active_fps = active_fps
+        self.active_hold = active_hold
+        self.cpu_target = cpu_target
+        self.min_fps = min_fps
+        self.load_interval = load_interval
+        self.cpu_count = os.cpu_count() or 1
+        self.last_run: Dict[str, float] = {}
+        self.active_until: Dict[str, float] = {}
+        self.load = 0.0
+        self.degrade = 1.0
+        self._load_checked = 0.0
+        self._cpu_sample = (time.time(), time.process_time())
+
+    def _update_load(self, now: float):
+        if now - self._load_checked < self.load_interval:
+            return
+        self._load_checked = now
+
+        try:
+            # System-wide, so detection worker processes are included
+            self.load = os.getloadavg()[0] / self.cpu_count
+        except (AttributeError, OSError):
+            # No load average (Windows): fall back to this process's CPU share
+            wall, cpu = time.time(), time.process_time()
+            last_wall, last_cpu = self._cpu_sample
+            self._cpu_sample = (wall, cpu)
+            if wall > last_wall:
+                self.load = (cpu - last_cpu) / (wall - last_wall) / self.cpu_count
+
+        self.degrade = min(1.0, self.cpu_target / self.load) if self.load > 0 else 1.0
+
+    def is_active(self, camera_name: str, now: Optional[float] = None) -> bool:
+        now = now or time.time()
+        return self.active_until.get(camera_name, 0.0) > now
+
+    def get_rate(self, camera_name: str, now: Optional[float] = None) -> float:
+        """Current inference budget in fps (0 = every frame)"""
+        now = now or time.time()
+        if self.is_active(camera_name, now):
+            # Active cameras keep full rate unless the box is badly overloaded
+            if self.degrade >= 1.0 / 1.5:
+                return self.active_fps
+            rate = self.active_fps or 30.0
+            return max(self.min_fps, rate * self.degrade)
+        return max(self.min_fps, self.idle_fps * self.degrade)
+
+    def should_run(self, camera_name: str) -> bool:
+        """True when the camera's next inference is due"""
+        now = time.time()
+        self._update_load(now)
+
+        rate = self.get_rate(camera_name, now)
+        if rate > 0 and now - self.last_run.get(camera_name, 0.0) < 1.0 / rate:
+            return False
+        self.last_run[camera_name] = now
+        return True
+
+    def report_detections(self, camera_name: str, count: int):
+        if count:
+            self.active_until[camera_name] = time.time() + self.active_hold
+
+    def get_rates(self) -> Dict[str, float]:
+        now = time.time()
+        return {name: self.get_rate(name, now) for name in self.last_run}
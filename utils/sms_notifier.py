@@ -7,7 +7,7 @@ load_dotenv()
 
 
 class SMSNotifier:
-    def __init__(self):
+    def __init__(self, client=None):
         self.account_sid = os.getenv('TWILIO_ACCOUNT_SID')
         self.auth_token = os.getenv('TWILIO_AUTH_TOKEN')
         self.twilio_number = os.getenv('TWILIO_PHONE_NUMBER')
@@ -19,8 +19,12 @@ class SMSNotifier:
         print(f"   Twilio Number: {'✅ ' + self.twilio_number if self.twilio_number else '❌ Missing'}")
         print(f"   Your Number: {'✅ ' + self.your_number if self.your_number else '❌ Missing'}")
 
+        # An injected client (e.g. a fake for testing) skips Twilio setup
+        if client is not None:
+            self.client = client
+            self.enabled = True
         # Check if all credentials are present
-        if all([self.account_sid, self.auth_token, self.twilio_number, self.your_number]):
+        elif all([self.account_sid, self.auth_token, self.twilio_number, self.your_number]):
             try:
                 self.client = Client(self.account_sid, self.auth_token)
                 self.enabled = True
@@ -32,8 +36,13 @@ class SMSNotifier:
             self.enabled = False
             print("🔶 SMS Simulation Mode - Configure .env for real SMS")
 
-    def send_alert(self, camera_name: str, alert_type: str, location: str, confidence: float):
-        """Send SMS alert (real or simulation)"""
+    def send_alert(self, camera_name: str, alert_type: str, location: str, confidence: float,
+                   simulate_on_failure: bool = True, raise_errors: bool = False):
+        """Send SMS alert (real or simulation)
+
+        raise_errors re-raises a failed send instead of returning False
+        (ignored when simulate_on_failure is set).
+        """
         message_body = self._create_message(camera_name, alert_type, location, confidence)
 
         if self.enabled:
@@ -49,6 +58,10 @@ class SMSNotifier:
                 return True
             except Exception as e:
                 print(f"❌ Real SMS failed: {e}")
+                if not simulate_on_failure:
+                    if raise_errors:
+                        raise
+                    return False
                 # Fall back to simulation
                 return self._simulate_sms(message_body)
         else:
@@ -1,50 +1,221 @@
 import cv2
+import threading
 import numpy as np
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Dict, Any
+from utils.zones import zone_polygon, zones_key
+
+
+class ZoneOverlay:
+    """
+    Restricted-zone overlay rasterized once per zone set and frame size
+
+    All zones are merged into one layer over their union bounding box: a
+    per-pixel weight from how many zone fills cover the pixel (k blends at
+    alpha keep (1 - alpha)^k of the original), zero under borders and labels
+    so they stay solid tint. Each frame then costs one blend and one masked
+    copy, whatever the number of zones. Overlaps are rounded once rather
+    than after each zone, so they can differ from drawing the zones one by
+    one by a single intensity level.
+    """
+
+    def __init__(self, color: Tuple[int, int, int] = (0, 0, 255), alpha: float = 0.3):
+        self.color = color
+        self.alpha = alpha
+        self.key = None
+        self.layer = None
+
+    def _build(self, shape, zones: list):
+        h, w = shape[:2]
+        self.layer = None
+        count = np.zeros((h, w), dtype=np.uint8)
+        edges = np.zeros((h, w), dtype=np.uint8)
+        fill = np.empty((h, w), dtype=np.uint8)
+        for zone in zones:
+            polygon = zone_polygon(zone)
+            fill[:] = 0
+            cv2.fillPoly(fill, [polygon], 1)
+            cv2.add(count, fill, dst=count)
+            cv2.polylines(edges, [polygon], True, 255, 2)
+            # Label above the topmost vertex
+            x, y = polygon[np.argmin(polygon[:, 1])]
+            cv2.putText(edges, "RESTRICTED", (int(x), int(y) - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, 255, 2)
+
+        mask = cv2.bitwise_or(cv2.compare(count, 0, cv2.CMP_GT), edges)
+        nonzero = cv2.findNonZero(mask)
+        if nonzero is None:
+            return
+        x, y, rw, rh = cv2.boundingRect(nonzero)
+        roi = (slice(y, y + rh), slice(x, x + rw))
+
+        # Weight of the original pixel left after the blends; borders and labels
+        # are solid tint, which later blends of tint over tint keep
+        keep = np.power(np.float32(1.0 - self.alpha), count[roi]).astype(np.float32)
+        keep[edges[roi] > 0] = 0.0
+        keep = cv2.merge([keep] * 3)
+        self.layer = (
+            roi,
+            mask[roi].copy(),
+            keep,
+            (1.0 - keep) * np.array(self.color, dtype=np.float32),
+            np.empty((rh, rw, 3), dtype=np.float32),
+            np.empty((rh, rw, 3), dtype=np.uint8)
+        )
+
+    def draw(self, frame: np.ndarray, zones: list) -> np.ndarray:
+        """Blend the zones into frame in place; rebuilt only when zones or frame size change"""
+        key = (frame.shape, zones_key(zones))
+        if key != self.key:
+            self._build(frame.shape, zones)
+            self.key = key
+
+        if self.layer is None:
+            return frame
+        roi_slices, mask, keep, tint, scratch, blended = self.layer
+        roi = frame[roi_slices]
+        # roi * keep + tint, rounded back to 8 bits
+        cv2.multiply(roi, keep, dst=scratch, dtype=cv2.CV_32F)
+        cv2.add(scratch, tint, dst=blended, dtype=cv2.CV_8U)
+        # Masked copy writes straight into the frame's ROI view
+        cv2.copyTo(blended, mask, roi)
+        return frame
+
+
+class FrameRingBuffer:
+    """Fixed number of preallocated frame slots; the writer overwrites the oldest"""
+
+    def __init__(self, capacity: int = 2):
+        # Two slots minimum so the writer never fills the slot being read
+        self.capacity = max(2, capacity)
+        self.slots = None
+        self.write_seq = 0
+        self.read_seq = 0
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+    def put(self, frame: np.ndarray):
+        if self.slots is None or self.slots.shape[1:] != frame.shape:
+            with self.lock:
+                self.slots = np.empty((self.capacity,) + frame.shape, dtype=frame.dtype)
+                self.write_seq = self.read_seq = 0
+
+        # Copy outside the lock: this slot is never the one handed to readers
+        np.copyto(self.slots[self.write_seq % self.capacity], frame)
+        with self.lock:
+            self.write_seq += 1
+
+    def get_latest(self) -> Optional[np.ndarray]:
+        """Newest unseen frame (copied out), or None if nothing new arrived"""
+        with self.lock:
+            if self.write_seq == self.read_seq:
+                return None
+            # Frames written since the last read but never returned are stale
+            self.dropped += self.write_seq - self.read_seq - 1
+            self.read_seq = self.write_seq
+            return self.slots[(self.write_seq - 1) % self.capacity].copy()
 
 
 class VideoHandler:
-    def __init__(self, stream_url: str):
+    def __init__(self, stream_url: str, threaded: bool = False, buffer_size: int = 2,
+                 reconnect_after: int = 50):
         self.stream_url = stream_url
         self.cap = None
+        self.threaded = threaded
+        self.buffer = FrameRingBuffer(buffer_size) if threaded else None
+        self.reconnect_after = reconnect_after
+        self.zone_overlay = None
+        # Written by the reader thread, read by get_stats() on the main thread
+        self.stats_lock = threading.Lock()
+        self.frames_captured = 0
+        self.read_failures = 0
+        self._reader = None
+        self._stop_event = threading.Event()
 
     def start_stream(self) -> bool:
         """Initialize video capture"""
         try:
             # If stream_url is a number, convert to int (for webcam)
-            if self.stream_url.isdigit():
+            if isinstance(self.stream_url, str) and self.stream_url.isdigit():
                 self.stream_url = int(self.stream_url)
 
             self.cap = cv2.VideoCapture(self.stream_url)
-            return self.cap.isOpened()
+            if not self.cap.isOpened():
+                return False
+
+            if self.threaded:
+                self._reader = threading.Thread(target=self._capture_loop, daemon=True)
+                self._reader.start()
+            return True
         except Exception as e:
             print(f"Error starting stream: {e}")
             return False
 
+    def _capture_loop(self):
+        """Background reader: keeps only the newest frames in the ring buffer"""
+        failures = 0
+        while not self._stop_event.is_set():
+            ret, frame = self.cap.read()
+            if not ret:
+                failures += 1
+                with self.stats_lock:
+                    self.read_failures += 1
+                if failures >= self.reconnect_after:
+                    print(f"🔄 Reconnecting stream {self.stream_url}...")
+                    self.cap.release()
+                    self.cap = cv2.VideoCapture(self.stream_url)
+                    failures = 0
+                # Back off so a dead stream does not spin a core
+                self._stop_event.wait(min(0.05 * failures, 1.0))
+                continue
+
+            failures = 0
+            with self.stats_lock:
+                self.frames_captured += 1
+            self.buffer.put(frame)
+
     def read_frame(self) -> Optional[np.ndarray]:
         """Read a single frame from the stream"""
+        if self.threaded:
+            # Never blocks: returns None when the camera has nothing new
+            return self.buffer.get_latest()
+
         if self.cap is None or not self.cap.isOpened():
             return None
 
         ret, frame = self.cap.read()
-        if ret:
-            return frame
-        return None
+        with self.stats_lock:
+            if ret:
+                self.frames_captured += 1
+            else:
+                self.read_failures += 1
+        return frame if ret else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Capture counters for monitoring"""
+        with self.stats_lock:
+            frames_captured, read_failures = self.frames_captured, self.read_failures
+        frames_dropped = 0
+        if self.buffer:
+            with self.buffer.lock:
+                frames_dropped = self.buffer.dropped
+        return {
+            'threaded': self.threaded,
+            'alive': self._reader.is_alive() if self._reader else self.cap is not None,
+            'frames_captured': frames_captured,
+            'frames_dropped': frames_dropped,
+            'read_failures': read_failures
+        }
 
     def release(self):
         """Release video capture resources"""
+        self._stop_event.set()
+        if self._reader is not None:
+            # A hung RTSP read must not block shutdown
+            self._reader.join(timeout=2.0)
         if self.cap is not None:
             self.cap.release()
 
     def draw_restricted_zones(self, frame, zones: list):
         """Draw restricted zones on the frame"""
-        for zone in zones:
-            x1, y1, x2, y2 = zone
-            # Draw semi-transparent red rectangle
-            overlay = frame.copy()
-            cv2.rectangle(overlay, (x1, y1), (x2, y2), (0, 0, 255), -1)
-            cv2.addWeighted(overlay, 0.3, frame, 0.7, 0, frame)
-            # Draw border
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 255), 2)
-            cv2.putText(frame, "RESTRICTED", (x1, y1 - 10),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
\ No newline at end of file
+        if self.zone_overlay is None:
+            self.zone_overlay = ZoneOverlay()
+        self.zone_overlay.draw(frame, zones)
\ No newline at end of file
@@ -0,0 +1,77 @@
+import cv2
+import numpy as np
+from typing import List, Dict, Any
+
+BREACH_MODES = ("foot", "center", "overlap")
+
+
+def zone_polygon(zone) -> np.ndarray:
+    """(N, 2) int32 vertices for a zone given as (x1, y1, x2, y2) or a list of (x, y) points"""
+    if len(zone) == 4 and all(np.isscalar(v) for v in zone):
+        x1, y1, x2, y2 = zone
+        return np.array([(x1, y1), (x2, y1), (x2, y2), (x1, y2)], dtype=np.int32)
+    return np.asarray(zone, dtype=np.int32).reshape(-1, 2)
+
+
+def zones_key(zones: list) -> tuple:
+    """Hashable snapshot of a zone list, to notice config changes"""
+    return tuple(tuple(map(tuple, zone_polygon(zone).tolist())) for zone in zones)
+
+
+class ZoneMap:
+    """
+    A camera's restricted zones rasterized once into a mask
+
+    Breach checks for every detection in a frame are then one fancy-indexing
+    lookup (foot or center points) or four integral-image lookups (bbox
+    overlap), independent of the number of zones and their shape.
+    """
+
+    def __init__(self, mode: str = "center", min_overlap: float = 0.3):
+        if mode not in BREACH_MODES:
+            raise ValueError(f"breach mode must be one of {BREACH_MODES}, got {mode!r}")
+        self.mode = mode
+        self.min_overlap = min_overlap
+        self.key = None
+        self.mask = None
+        self.integral = None
+
+    def _build(self, shape, zones: list):
+        h, w = shape[:2]
+        self.mask = np.zeros((h, w), dtype=np.uint8)
+        if zones:
+            cv2.fillPoly(self.mask, [zone_polygon(zone) for zone in zones], 1)
+        self.integral = cv2.integral(self.mask) if self.mode == "overlap" else None
+
+    def breaches(self, detections: List[Dict[str, Any]], zones: list, frame_shape) -> np.ndarray:
+        """Boolean breach flag per detection"""
+        if not detections or not zones:
+            return np.zeros(len(detections), dtype=bool)
+
+        key = (frame_shape[:2], zones_key(zones))
+        if key != self.key:
+            self._build(frame_shape, zones)
+            self.key = key
+
+        h, w = self.mask.shape
+        boxes = np.array([d['bbox'] for d in detections], dtype=np.int64).reshape(-1, 4)
+
+        if self.mode == "overlap":
+            x1, x2 = np.clip(boxes[:, 0], 0, w), np.clip(boxes[:, 2], 0, w)
+            y1, y2 = np.clip(boxes[:, 1], 0, h), np.clip(boxes[:, 3], 0, h)
+            ii = self.integral
+            inside = ii[y2, x2] - ii[y1, x2] - ii[y2, x1] + ii[y1, x1]
+            area = np.maximum((boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1]), 1)
+            return inside / area >= self.min_overlap
+
+        if self.mode == "center":
+            points = np.array([d['center'] for d in detections], dtype=np.int64).reshape(-1, 2)
+            xs, ys = points[:, 0], points[:, 1]
+        else:
+            # Foot point: bottom center of the box, where the person stands
+            xs, ys = (boxes[:, 0] + boxes[:, 2]) // 2, boxes[:, 3] - 1
+
+        inside_frame = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+        result = np.zeros(len(boxes), dtype=bool)
+        result[inside_frame] = self.mask[ys[inside_frame], xs[inside_frame]] > 0
+        return result